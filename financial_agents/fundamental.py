@@ -1,11 +1,11 @@
 from agents import Agent, WebSearchTool, ModelSettings
-from utils import compose_agent_prompt, make_yahoo_mcp_server
+from utils import compose_agent_prompt, shared_yahoo_mcp_server
 from settings import DEFAULT_MODEL, DEFAULT_SEARCH_CONTEXT
 
 
 def build_fundamental_agent():
     prompt = compose_agent_prompt("fundamental_base.md")
-    yahoo_mcp_server = make_yahoo_mcp_server()
+    yahoo_mcp_server = shared_yahoo_mcp_server()
 
     return Agent(
         name="Fundamental Analysis Agent",
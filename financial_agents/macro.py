@@ -1,5 +1,5 @@
 from agents import Agent, WebSearchTool, ModelSettings
-from tools.get_fred_series import get_fred_series
+from tools.get_fred_series import get_fred_series, get_fred_series_batch
 from utils import compose_agent_prompt
 from settings import DEFAULT_MODEL, DEFAULT_SEARCH_CONTEXT
 
@@ -12,6 +12,7 @@ def build_macro_agent():
         tools=[
             WebSearchTool(search_context_size=DEFAULT_SEARCH_CONTEXT),
             get_fred_series,
+            get_fred_series_batch,
         ],
         model=DEFAULT_MODEL,
         model_settings=ModelSettings(parallel_tool_calls=True, temperature=0),
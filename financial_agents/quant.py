@@ -1,21 +1,45 @@
 from agents import Agent, ModelSettings
 from tools.run_code_interpreter import run_code_interpreter
-from tools.get_fred_series import get_fred_series
+from tools.get_fred_series import get_fred_series, get_fred_series_batch
 from tools.read_file import read_file
 from tools.list_output_files import list_output_files
-from utils import compose_agent_prompt, make_yahoo_mcp_server
+from tools.quant_analytics import (
+    compute_correlation_matrix,
+    compute_return_statistics,
+    compute_rolling_volatility,
+)
+from tools.run_scenario_simulation import run_scenario_simulation
+from tools.fit_volatility_models import fit_volatility_models
+from tools.portfolio_optimization import optimize_portfolio
+from tools.event_study import run_event_study
+from tools.align_series import align_series
+from utils import compose_agent_prompt, shared_yahoo_mcp_server
 from settings import DEFAULT_MODEL
 
 
 def build_quant_agent():
     prompt = compose_agent_prompt("quant_base.md")
-    yahoo_mcp_server = make_yahoo_mcp_server()
+    yahoo_mcp_server = shared_yahoo_mcp_server()
 
     return Agent(
         name="Quantitative Analysis Agent",
         instructions=prompt,
         mcp_servers=[yahoo_mcp_server],
-        tools=[run_code_interpreter, get_fred_series, read_file, list_output_files],
+        tools=[
+            run_code_interpreter,
+            get_fred_series,
+            get_fred_series_batch,
+            read_file,
+            list_output_files,
+            compute_return_statistics,
+            compute_rolling_volatility,
+            compute_correlation_matrix,
+            run_scenario_simulation,
+            fit_volatility_models,
+            optimize_portfolio,
+            run_event_study,
+            align_series,
+        ],
         model=DEFAULT_MODEL,
         model_settings=ModelSettings(parallel_tool_calls=True, temperature=0),
     )
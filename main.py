@@ -3,7 +3,7 @@ import datetime
 import argparse
 from dotenv import load_dotenv
 
-from research_workflow import run_research_async
+from research_workflow import close_mcp_servers, run_research_async
 from utils import ensure_env_vars
 
 # Load local .env if present (safe no-op in production)
@@ -53,6 +53,8 @@ async def run_workflow():
     except asyncio.TimeoutError:
         print("\n❌ Workflow timed out after 20 minutes.")
         return
+    finally:
+        await close_mcp_servers()
 
     print(
         f"Workflow Completed Response from Agent: {final_output}, investment report created: {report_path if report_path else '[unknown]'}"
@@ -4,13 +4,164 @@ from __future__ import annotations
 
 import asyncio
 import json
+import logging
 import os
-from contextlib import AsyncExitStack
+import threading
+from contextlib import asynccontextmanager
 from typing import Optional, Tuple
 
 from agents import Runner
 from financial_agents.config import build_financial_agents
-from utils import output_file
+from settings import AGENT_POOL_SIZE, CODE_INTERPRETER_BACKEND, MCP_HEALTHCHECK_TIMEOUT
+from tools.output_retention import schedule_collection
+from utils import begin_run, find_output
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Long-lived MCP server connections
+# ---------------------------------------------------------------------------
+# Each connected server is owned by a holder task that connects it, waits for
+# shutdown and cleans it up again, so the MCP client's context managers are
+# entered and exited in the same task even though many runs use the server.
+
+_held_servers: dict[
+    int, tuple[asyncio.AbstractEventLoop, asyncio.Event, asyncio.Task]
+] = {}
+
+# Per-server connect locks, so concurrent runs share one connect attempt
+_connect_locks: dict[int, tuple[asyncio.AbstractEventLoop, asyncio.Lock]] = {}
+
+
+async def _hold_server(server, ready: asyncio.Future, stop: asyncio.Event) -> None:
+    try:
+        await server.connect()
+    except BaseException as e:
+        ready.set_exception(e)
+        return
+    ready.set_result(None)
+    try:
+        await stop.wait()
+    finally:
+        await server.cleanup()
+
+
+async def _closed(server) -> bool:
+    """Whether the server's session is gone (a slow ping does not count)."""
+    session = getattr(server, "session", None)
+    if session is None:
+        return True
+    try:
+        await asyncio.wait_for(session.send_ping(), timeout=MCP_HEALTHCHECK_TIMEOUT)
+    except asyncio.TimeoutError:
+        # Busy, not dead: other runs may be using the connection right now
+        logger.warning(f"MCP server {server.name} was slow to answer a ping")
+        return False
+    except Exception as e:
+        logger.warning(f"MCP server {server.name} failed health check: {e}")
+        return True
+    return False
+
+
+def _connect_lock(server, loop: asyncio.AbstractEventLoop) -> asyncio.Lock:
+    held = _connect_locks.get(id(server))
+    if held is None or held[0] is not loop:
+        held = _connect_locks[id(server)] = (loop, asyncio.Lock())
+    return held[1]
+
+
+async def _connect_one(server, loop: asyncio.AbstractEventLoop) -> None:
+    async with _connect_lock(server, loop):
+        held = _held_servers.get(id(server))
+        if held is not None and held[0] is loop and not held[2].done():
+            if not await _closed(server):
+                return
+            # Lazy reconnect: drop the dead connection and open a new one
+            held[1].set()
+            await asyncio.gather(held[2], return_exceptions=True)
+        ready = loop.create_future()
+        stop = asyncio.Event()
+        task = loop.create_task(_hold_server(server, ready, stop))
+        _held_servers[id(server)] = (loop, stop, task)
+        try:
+            await ready
+        except BaseException:
+            _held_servers.pop(id(server), None)
+            raise
+
+
+async def connect_mcp_servers(servers) -> None:
+    """Connect *servers* concurrently on the running loop.
+
+    Servers that are already connected are health-checked with a ping and
+    reconnected only if their connection is closed.  Concurrent callers wait
+    for a connect in progress instead of starting their own.
+    """
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(_connect_one(server, loop) for server in servers))
+
+
+async def close_mcp_servers() -> None:
+    """Disconnect every server connected on the running loop."""
+    loop = asyncio.get_running_loop()
+    tasks = []
+    for key, (held_loop, stop, task) in list(_held_servers.items()):
+        if held_loop is loop:
+            stop.set()
+            tasks.append(task)
+            del _held_servers[key]
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _agent_mcp_servers(bundle) -> list:
+    servers = {}
+    for agent in [
+        getattr(bundle, "fundamental", None),
+        getattr(bundle, "quant", None),
+    ]:
+        for server in getattr(agent, "mcp_servers", None) or []:
+            servers[id(server)] = server
+    return list(servers.values())
+
+
+# ---------------------------------------------------------------------------
+# Warm agent bundle pool
+# ---------------------------------------------------------------------------
+
+
+class AgentBundlePool:
+    """Reusable, pre-built agent bundles.
+
+    Agents are stateless between runs, so building them (and re-reading every
+    prompt file) once per question is wasted work.  Idle bundles are kept for
+    reuse; when every bundle is busy a new one is built rather than waiting.
+    """
+
+    def __init__(self, size: int = AGENT_POOL_SIZE):
+        self.size = size
+        self._idle: list = []
+
+    async def warm(self) -> None:
+        """Build bundles up to the pool size and connect their MCP servers."""
+        while len(self._idle) < self.size:
+            self._idle.append(build_financial_agents())
+        servers = {}
+        for bundle in self._idle:
+            servers.update({id(s): s for s in _agent_mcp_servers(bundle)})
+        await connect_mcp_servers(list(servers.values()))
+
+    @asynccontextmanager
+    async def acquire(self):
+        bundle = self._idle.pop() if self._idle else build_financial_agents()
+        try:
+            await connect_mcp_servers(_agent_mcp_servers(bundle))
+            yield bundle
+        finally:
+            if len(self._idle) < self.size:
+                self._idle.append(bundle)
+
+
+_bundle_pool = AgentBundlePool()
 
 
 async def run_research_async(
@@ -40,24 +191,16 @@ async def run_research_async(
             "OPENAI_API_KEY not set — set it as an environment variable before running."
         )
 
-    bundle = build_financial_agents()
+    # Tools key per-run state (e.g. Code Interpreter containers and the run's
+    # outputs/runs/<run_id>/ workspace) off this id
+    begin_run()
+    # Old run workspaces and unused shared files are collected in the background
+    schedule_collection()
 
-    async def _execute() -> str:
-        return await Runner.run(bundle.head_pm, question, max_turns=max_turns)
-
-    # Connect MCP servers (Yahoo Finance) while the workflow runs
-    async with AsyncExitStack() as stack:
-        for agent in [
-            getattr(bundle, "fundamental", None),
-            getattr(bundle, "quant", None),
-        ]:
-            if agent is None:
-                continue
-            for server in getattr(agent, "mcp_servers", []):
-                await server.connect()
-                await stack.enter_async_context(server)
-
-        result = await _execute()
+    # Bundles come pre-built from the pool with their (shared, long-lived)
+    # MCP servers already connected, so the PM agent starts immediately.
+    async with _bundle_pool.acquire() as bundle:
+        result = await Runner.run(bundle.head_pm, question, max_turns=max_turns)
 
     # ------------------------------------------------------------------
     # Parse result to locate generated report file (if any)
@@ -69,7 +212,7 @@ async def run_research_async(
             if isinstance(output, str):
                 data = json.loads(output)
                 if isinstance(data, dict) and "file" in data:
-                    report_path = str(output_file(data["file"]))
+                    report_path = str(find_output(data["file"]))
         final_output_str = (
             result.final_output if hasattr(result, "final_output") else str(result)
         )
@@ -80,7 +223,39 @@ async def run_research_async(
     return report_path, final_output_str
 
 
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _research_loop() -> asyncio.AbstractEventLoop:
+    """Return a persistent background event loop shared by all synchronous callers."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="research-loop", daemon=True
+            ).start()
+    return _loop
+
+
+def warm_research_pool() -> None:
+    """Pre-build agent bundles and connect MCP servers before the first question."""
+    asyncio.run_coroutine_threadsafe(_bundle_pool.warm(), _research_loop()).result()
+    if CODE_INTERPRETER_BACKEND == "local":
+        # Start the local code workers (and their library imports) ahead of time
+        from tools.run_code_interpreter import local_runner
+
+        local_runner().warm()
+
+
 def run_research_sync(question: str):
-    """Blocking wrapper around ``run_research_async`` suitable for Streamlit or CLIs."""
+    """Blocking wrapper around ``run_research_async`` suitable for Streamlit or CLIs.
+
+    Runs on a persistent background loop rather than ``asyncio.run`` so that MCP
+    server connections survive from one question to the next.
+    """
 
-    return asyncio.run(run_research_async(question))
+    return asyncio.run_coroutine_threadsafe(
+        run_research_async(question), _research_loop()
+    ).result()
@@ -20,8 +20,126 @@ DEFAULT_SEARCH_CONTEXT: str = os.getenv("DEFAULT_SEARCH_CONTEXT", "medium")
 # Timeout (seconds) for Yahoo Finance MCP server sessions
 YAHOO_MCP_TIMEOUT: int = int(os.getenv("YAHOO_MCP_TIMEOUT", "300"))
 
+# How agents reach the shared Yahoo Finance MCP server: "stdio" spawns one
+# subprocess per Python process; "http" uses a long-lived local server over
+# streamable HTTP (started on first use, or YAHOO_MCP_URL if set).
+YAHOO_MCP_TRANSPORT: str = os.getenv("YAHOO_MCP_TRANSPORT", "stdio")
+YAHOO_MCP_HOST: str = os.getenv("YAHOO_MCP_HOST", "127.0.0.1")
+YAHOO_MCP_PORT: int = int(os.getenv("YAHOO_MCP_PORT", "8765"))
+YAHOO_MCP_URL: str = os.getenv("YAHOO_MCP_URL", "")
+
 # ---------------------------------------------------------------------------
 # Agent runtime defaults
 # ---------------------------------------------------------------------------
 # Safety cap for agent reasoning turns
 DEFAULT_MAX_TURNS: int = int(os.getenv("DEFAULT_MAX_TURNS", "75"))
+# Pre-built agent bundles kept warm between questions
+AGENT_POOL_SIZE: int = int(os.getenv("AGENT_POOL_SIZE", "2"))
+# Ping timeout (seconds) when checking a long-lived MCP connection
+MCP_HEALTHCHECK_TIMEOUT: float = float(os.getenv("MCP_HEALTHCHECK_TIMEOUT", "5"))
+
+# ---------------------------------------------------------------------------
+# Local caches
+# ---------------------------------------------------------------------------
+# Directory (relative to the repository root) for persistent caches
+CACHE_DIR: str = os.getenv("CACHE_DIR", ".cache")
+
+# Persistent Yahoo Finance response cache
+MARKET_CACHE_ENABLED: bool = os.getenv("MARKET_CACHE_ENABLED", "1") != "0"
+MARKET_CACHE_MAX_MB: int = int(os.getenv("MARKET_CACHE_MAX_MB", "512"))
+# Freshness (seconds) per data type
+MARKET_CACHE_TTLS: dict[str, int] = {
+    "quotes": int(os.getenv("MARKET_CACHE_TTL_QUOTES", "300")),
+    "news": int(os.getenv("MARKET_CACHE_TTL_NEWS", "900")),
+    "options": int(os.getenv("MARKET_CACHE_TTL_OPTIONS", "900")),
+    "actions": int(os.getenv("MARKET_CACHE_TTL_ACTIONS", "86400")),
+    "recommendations": int(os.getenv("MARKET_CACHE_TTL_RECOMMENDATIONS", "86400")),
+    "statements": int(os.getenv("MARKET_CACHE_TTL_STATEMENTS", "259200")),
+    "holders": int(os.getenv("MARKET_CACHE_TTL_HOLDERS", "604800")),
+}
+
+# Ticker existence index (replaces a per-call existence request to Yahoo)
+TICKER_INDEX_VALID_TTL: int = int(os.getenv("TICKER_INDEX_VALID_TTL", "2592000"))
+TICKER_INDEX_INVALID_TTL: int = int(os.getenv("TICKER_INDEX_INVALID_TTL", "86400"))
+# Optional local symbol list (one symbol per line, or CSV with a Symbol column)
+TICKER_SYMBOLS_FILE: str = os.getenv("TICKER_SYMBOLS_FILE", "")
+
+# Yahoo Finance MCP server: worker threads, per-call timeout (seconds),
+# concurrent requests per host and request rate (requests/second, burst)
+YAHOO_MAX_WORKERS: int = int(os.getenv("YAHOO_MAX_WORKERS", "8"))
+YAHOO_TOOL_TIMEOUT: float = float(os.getenv("YAHOO_TOOL_TIMEOUT", "30"))
+YAHOO_MAX_PER_HOST: int = int(os.getenv("YAHOO_MAX_PER_HOST", "4"))
+YAHOO_RATE_LIMIT: float = float(os.getenv("YAHOO_RATE_LIMIT", "5"))
+YAHOO_RATE_BURST: int = int(os.getenv("YAHOO_RATE_BURST", "10"))
+
+# Local FRED series store: refresh stale series with a delta fetch after
+# FRED_REFRESH_AFTER seconds, and refetch in full (to pick up revisions)
+# every FRED_FULL_REFRESH_AFTER seconds
+FRED_REFRESH_AFTER: int = int(os.getenv("FRED_REFRESH_AFTER", "3600"))
+FRED_FULL_REFRESH_AFTER: int = int(os.getenv("FRED_FULL_REFRESH_AFTER", "604800"))
+# Concurrent FRED requests made by the batch series tool
+FRED_MAX_WORKERS: int = int(os.getenv("FRED_MAX_WORKERS", "6"))
+
+# Code Interpreter uploads are cached by content hash and reused for this long
+# (seconds); uploads not in the cache are sent with this many parallel requests
+CODE_INTERPRETER_UPLOAD_TTL: int = int(
+    os.getenv("CODE_INTERPRETER_UPLOAD_TTL", "86400")
+)
+CODE_INTERPRETER_UPLOAD_WORKERS: int = int(
+    os.getenv("CODE_INTERPRETER_UPLOAD_WORKERS", "4")
+)
+# Code Interpreter containers are reused within a research run and expire
+# after this many idle minutes; failed calls are retried with exponential
+# back-off starting at CODE_INTERPRETER_BACKOFF seconds
+CODE_INTERPRETER_CONTAINER_IDLE_MINUTES: int = int(
+    os.getenv("CODE_INTERPRETER_CONTAINER_IDLE_MINUTES", "20")
+)
+CODE_INTERPRETER_MAX_RETRIES: int = int(os.getenv("CODE_INTERPRETER_MAX_RETRIES", "3"))
+CODE_INTERPRETER_BACKOFF: float = float(os.getenv("CODE_INTERPRETER_BACKOFF", "1"))
+
+# Where run_code_interpreter executes analyses: "cloud" (OpenAI Code
+# Interpreter) or "local" (the model writes a script that runs in a worker
+# pool on this machine as the current user, without isolation; see
+# tools/local_code_runner.py)
+CODE_INTERPRETER_BACKEND: str = os.getenv("CODE_INTERPRETER_BACKEND", "cloud")
+# Local backend: worker processes, wall-clock/CPU seconds per script, memory
+# cap per worker (MB, 0 = unlimited) and scripts tried per request
+LOCAL_CODE_WORKERS: int = int(os.getenv("LOCAL_CODE_WORKERS", "2"))
+LOCAL_CODE_TIMEOUT: float = float(os.getenv("LOCAL_CODE_TIMEOUT", "120"))
+LOCAL_CODE_MEMORY_MB: int = int(os.getenv("LOCAL_CODE_MEMORY_MB", "4096"))
+LOCAL_CODE_ATTEMPTS: int = int(os.getenv("LOCAL_CODE_ATTEMPTS", "2"))
+
+# ---------------------------------------------------------------------------
+# Local quant analytics
+# ---------------------------------------------------------------------------
+# Worker processes for CPU-bound tools (Monte Carlo, model fitting); 1 runs inline
+QUANT_PROCESS_WORKERS: int = int(
+    os.getenv("QUANT_PROCESS_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+# Monte Carlo paths simulated per chunk (bounds memory per worker)
+MC_CHUNK_PATHS: int = int(os.getenv("MC_CHUNK_PATHS", "1000"))
+
+# ---------------------------------------------------------------------------
+# Outputs
+# ---------------------------------------------------------------------------
+# Seconds between rescans of outputs/ for files written outside the tools
+# (the manifest is otherwise kept current by the tools that write files)
+OUTPUT_MANIFEST_RESCAN: int = int(os.getenv("OUTPUT_MANIFEST_RESCAN", "60"))
+# Format of the tables written by the Yahoo Finance tools: "csv", or "parquet"
+# (typed columns, memory-mapped reads; requires pyarrow).  Parquet files are
+# exported to CSV on demand for the hosted Code Interpreter
+OUTPUT_TABLE_FORMAT: str = os.getenv("OUTPUT_TABLE_FORMAT", "csv").lower()
+# Register Yahoo Finance tables as memory-mapped Arrow files in the cache dir
+# (see tools/dataset_registry.py) and only write the file in outputs/ when a
+# tool needs one; requires pyarrow
+DATASET_REGISTRY: bool = os.getenv("DATASET_REGISTRY", "0") != "0"
+# Retention of outputs/ (run workspaces and shared files): anything unused for
+# OUTPUT_RETENTION_DAYS is deleted, then the least recently used until the
+# folder fits in OUTPUT_RETENTION_MAX_MB (0 disables either limit).  Anything
+# used in the last OUTPUT_RETENTION_MIN_AGE seconds is kept.  Collection runs
+# in the background when a research run starts, at most every
+# OUTPUT_RETENTION_INTERVAL seconds
+OUTPUT_RETENTION_DAYS: float = float(os.getenv("OUTPUT_RETENTION_DAYS", "14"))
+OUTPUT_RETENTION_MAX_MB: int = int(os.getenv("OUTPUT_RETENTION_MAX_MB", "2048"))
+OUTPUT_RETENTION_MIN_AGE: int = int(os.getenv("OUTPUT_RETENTION_MIN_AGE", "3600"))
+OUTPUT_RETENTION_INTERVAL: int = int(os.getenv("OUTPUT_RETENTION_INTERVAL", "3600"))
@@ -5,7 +5,7 @@ import json
 from dotenv import load_dotenv
 from utils import output_file
 
-from research_workflow import run_research_sync
+from research_workflow import run_research_sync, warm_research_pool
 from utils import ensure_env_vars
 
 # ---------------------------------------------------------------------------
@@ -60,6 +60,20 @@ st.markdown(
 )
 st.title("📈 Portfolio Research Assistant")
 
+
+@st.cache_resource(show_spinner=False)
+def _warm_agents() -> bool:
+    """Build agents and connect MCP servers once per Streamlit process."""
+    try:
+        warm_research_pool()
+        return True
+    except Exception:
+        # Not fatal: the first question will build and connect lazily
+        return False
+
+
+_warm_agents()
+
 # Input area
 user_question = st.text_area(
     "Enter your investment question:",
@@ -106,9 +120,15 @@ if st.button("Run Research"):
         try:
             data = json.loads(raw_output) if isinstance(raw_output, str) else {}
             if isinstance(data, dict) and "pdf_file" in data:
-                pdf_path_candidate = output_file(data["pdf_file"])
-                if pdf_path_candidate.exists():
-                    pdf_path = str(pdf_path_candidate)
+                # The PDF is written to the run's workspace, next to the report
+                if report_path:
+                    pdf_path_candidate = os.path.join(
+                        os.path.dirname(report_path), data["pdf_file"]
+                    )
+                else:
+                    pdf_path_candidate = str(output_file(data["pdf_file"]))
+                if os.path.exists(pdf_path_candidate):
+                    pdf_path = pdf_path_candidate
         except Exception:
             pass
 
@@ -0,0 +1,186 @@
+"""As-of alignment of price histories with macro series in one merged file.
+
+Price files define the calendar (their trading days, outer-joined); every
+other series is attached with a backward as-of join, so each row only sees
+the latest observation available on that date.  The merged frame can then be
+resampled, lagged and differenced, and is written once.  Results are cached
+by a hash of the input files and parameters, so asking for the same
+alignment again returns the existing file without recomputing it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+from agents import function_tool
+from tools.dataset_registry import dataset_digest
+from tools.quant_analytics import (
+    load_price_frame,
+    load_series_frame,
+    save_analysis_csv,
+)
+from tools.upload_cache import file_digest
+from utils import cache_file, compact_stem, find_output, output_file
+
+RESAMPLE_RULES = {"D": None, "W": "W-FRI", "M": "ME", "Q": "QE"}
+
+
+def asof_join(
+    base: pd.DataFrame,
+    series: pd.DataFrame,
+    delay_days: int = 0,
+    max_staleness_days: int = 0,
+) -> pd.DataFrame:
+    """Attach *series* to *base* rows by the latest observation on or before each date.
+
+    *delay_days* treats each observation as known only that many days after its
+    date (e.g. a monthly average published the following month);
+    *max_staleness_days* leaves rows empty when the latest observation is older.
+    """
+    right = series.sort_index()
+    right.index = right.index.astype("datetime64[ns]") + pd.Timedelta(days=delay_days)
+    left = base.copy()
+    left.index = left.index.astype("datetime64[ns]")
+    merged = pd.merge_asof(
+        left,
+        right,
+        left_index=True,
+        right_index=True,
+        direction="backward",
+        tolerance=pd.Timedelta(days=max_staleness_days) if max_staleness_days else None,
+    )
+    merged.index.name = "Date"
+    return merged
+
+
+def _cache_key(names: list[str], params: dict) -> str:
+    h = hashlib.sha256(json.dumps(params, sort_keys=True).encode())
+    for name in names:
+        h.update(name.encode())
+        # Registered datasets are hashed without writing them out
+        digest = dataset_digest(name) or file_digest(find_output(name))
+        h.update(digest.encode())
+    return h.hexdigest()[:32]
+
+
+@function_tool
+def align_series(
+    price_files: List[str],
+    series_files: List[str],
+    frequency: str = "D",
+    delay_days: int = 0,
+    max_staleness_days: int = 0,
+    lags: Optional[List[int]] = None,
+    add_changes: bool = False,
+) -> str:
+    """Aligns price histories with macro/FRED series into one merged CSV using as-of joins.
+
+    Each row holds the closing prices ({T}_Close) on that date and the latest
+    value of every series known on that date (no look-ahead).
+
+    Args:
+        price_files: Price files in outputs/ whose trading days form the calendar
+            (single-ticker histories or batch price files).
+        series_files: Files in outputs/ to attach by as-of join (e.g. FRED downloads);
+            every numeric column is attached, prefixed with the file name if its
+            name is already taken.
+        frequency: Output frequency: "D" (trading days), "W", "M" or "Q"; the last
+            row of each period is kept.
+        delay_days: Days after its date that a series observation becomes known
+            (e.g. 30 for a monthly average released the next month).
+        max_staleness_days: Leave a series empty when its latest observation is
+            older than this many days (0 for no limit).
+        lags: Optional lags in output periods; adds {S}_lag{k} columns for every series.
+        add_changes: Add {T}_Return columns for prices and {S}_Change columns
+            (period differences) for series.
+
+    Returns:
+        str: JSON with the merged file name, date range, row count, columns and
+        missing values per column.
+    """
+    try:
+        frequency = frequency.strip().upper()
+        if frequency not in RESAMPLE_RULES:
+            return json.dumps(
+                {"error": f"Invalid frequency '{frequency}'. Use D, W, M or Q"}
+            )
+        if not price_files:
+            return json.dumps({"error": "At least one price file is required"})
+        lags = sorted({int(k) for k in lags or [] if int(k) > 0})
+        params = {
+            "price_files": price_files,
+            "series_files": series_files,
+            "frequency": frequency,
+            "delay_days": delay_days,
+            "max_staleness_days": max_staleness_days,
+            "lags": lags,
+            "add_changes": add_changes,
+        }
+        record_path = cache_file(
+            f"aligned/{_cache_key(price_files + series_files, params)}.json"
+        )
+        if record_path.exists():
+            record = json.loads(record_path.read_text())
+            out = find_output(record["file"])
+            if out.exists() and file_digest(out) == record.pop("digest"):
+                return json.dumps({**record, "cached": True})
+
+        prices = load_price_frame(price_files)
+        tickers = list(prices.columns)
+        merged = prices.add_suffix("_Close")
+        series_columns = []
+        for name in series_files:
+            series = load_series_frame(name)
+            # Prefix with the file stem only where a column name is already taken
+            taken = set(merged) | {c.removesuffix("_Close") for c in merged}
+            series = series.rename(
+                columns=lambda c: f"{Path(name).stem}_{c}" if c in taken else c
+            )
+            series_columns += list(series.columns)
+            merged = asof_join(merged, series, delay_days, max_staleness_days)
+
+        if RESAMPLE_RULES[frequency]:
+            merged = merged.resample(RESAMPLE_RULES[frequency]).last()
+            merged = merged.dropna(how="all")
+        extra = {}
+        if add_changes:
+            for t in tickers:
+                extra[f"{t}_Return"] = merged[f"{t}_Close"].pct_change(fill_method=None)
+            for c in series_columns:
+                extra[f"{c}_Change"] = merged[c].diff()
+        for k in lags:
+            for c in series_columns:
+                extra[f"{c}_lag{k}"] = merged[c].shift(k)
+        if extra:
+            merged = pd.concat([merged, pd.DataFrame(extra)], axis=1)
+
+        names = tickers + [c for c in series_columns if c not in tickers]
+        file_name = save_analysis_csv(
+            merged,
+            f"{compact_stem(names)}_aligned_{frequency}.csv",
+            tool="align_series",
+        )
+        result = {
+            "file": file_name,
+            "frequency": frequency,
+            "rows": int(len(merged)),
+            "start": str(merged.index[0].date()) if len(merged) else None,
+            "end": str(merged.index[-1].date()) if len(merged) else None,
+            "columns": list(merged.columns),
+            "missing": {c: int(n) for c, n in merged.isna().sum().items() if n > 0},
+        }
+        tmp = record_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps({**result, "digest": file_digest(output_file(file_name))})
+        )
+        os.replace(tmp, record_path)
+        return json.dumps({**result, "cached": False})
+    except Exception as e:
+        return json.dumps(
+            {"error": str(e), "files": list(price_files) + list(series_files)}
+        )
@@ -0,0 +1,59 @@
+"""Previews of in-memory Arrow tables, mirroring :mod:`tools.csv_reader`.
+
+Used by ``read_file`` for datasets held in the dataset registry: the table is
+already mapped, so slicing and filtering work on its buffers without parsing
+or copying anything but the rows returned.
+"""
+
+from __future__ import annotations
+
+import pandas as pd
+
+from tools.csv_reader import check_columns, parse_conditions
+from tools.parquet_reader import column_summary, filter_expression
+
+
+def _to_pandas(table) -> pd.DataFrame:
+    return table.to_pandas().reset_index(drop=True)
+
+
+def _project(table, columns: list[str] | None):
+    check_columns(table.schema.names, columns)
+    return table.select(columns) if columns else table
+
+
+def read_header(table) -> list[str]:
+    return list(table.schema.names)
+
+
+def head(table, n: int, columns: list[str] | None = None, start: int = 0):
+    return _to_pandas(_project(table, columns).slice(start, n))
+
+
+def tail(table, n: int, columns: list[str] | None = None) -> pd.DataFrame:
+    return _to_pandas(_project(table, columns).slice(max(table.num_rows - n, 0)))
+
+
+def select(
+    table,
+    where: str,
+    n: int,
+    columns: list[str] | None = None,
+    from_end: bool = False,
+) -> tuple[pd.DataFrame, int]:
+    """First (or last) *n* rows matching *where*, and the total number of matches."""
+    conditions = parse_conditions(where)
+    check_columns(table.schema.names, (columns or []) + [c for c, _, _ in conditions])
+    hits = table.filter(filter_expression(table.schema, conditions))
+    matched = hits.num_rows
+    hits = hits.slice(max(matched - n, 0)) if from_end else hits.slice(0, n)
+    return _to_pandas(_project(hits, columns)), matched
+
+
+def summarize(table, columns: list[str] | None = None) -> dict:
+    check_columns(table.schema.names, columns)
+    out = {
+        name: column_summary(table.column(name))
+        for name in columns or table.schema.names
+    }
+    return {"rows": table.num_rows, "columns": out}
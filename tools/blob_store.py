@@ -0,0 +1,132 @@
+"""Content-addressed storage for files written to ``outputs/``.
+
+Each distinct payload is stored once under ``outputs/.blobs/<sha256>`` and
+exposed under its friendly name as a hard link, so re-fetching identical
+data is a no-op write: the friendly file already links to the blob and
+nothing is touched.  When a friendly name is taken by different content,
+the new file gets a suffix derived from its hash rather than a random one,
+so the same data always lands under the same name and downstream caches keyed
+on name and digest keep hitting.
+
+Hard links are used instead of symlinks so uploads, copies and the manifest
+see ordinary files.  Writers must therefore replace files (write-then-rename)
+rather than rewrite them in place, as every tool here already does.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from tools.upload_cache import file_digest
+
+BLOBS_DIR = ".blobs"
+
+# Hex digits of the content hash used to disambiguate a taken friendly name
+SUFFIX_LENGTH = 8
+
+
+def _tmp_path(path: Path) -> Path:
+    # Unique per process and thread: the MCP server writes from a thread pool
+    return path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+
+
+def _atomic_write(path: Path, payload: bytes) -> None:
+    tmp = _tmp_path(path)
+    tmp.write_bytes(payload)
+    os.replace(tmp, path)
+
+
+def _link(blob: Path, path: Path) -> None:
+    """Point *path* at *blob*, replacing whatever is there atomically."""
+    tmp = _tmp_path(path)
+    try:
+        os.link(blob, tmp)
+    except OSError:
+        # No hard links on this filesystem: fall back to a private copy
+        shutil.copyfile(blob, tmp)
+    os.replace(tmp, path)
+
+
+def _holds(path: Path, blob: Path, digest: str, size: int) -> bool:
+    """Whether *path* already has the content of *blob*."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return False
+    if blob.exists() and os.path.samestat(stat, blob.stat()):
+        return True
+    # Files written before the store existed (or copies) are compared by content
+    return stat.st_size == size and file_digest(path) == digest
+
+
+def _touch(path: Path) -> None:
+    """Mark *path* as used (access time only, so the manifest sees no change)."""
+    os.utime(path, ns=(time.time_ns(), path.stat().st_mtime_ns))
+
+
+def _release(root: Path, digest: str) -> None:
+    """Drop the blob for *digest* once no friendly name links to it any more."""
+    blob = root / BLOBS_DIR / digest
+    try:
+        if blob.stat().st_nlink == 1:
+            blob.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def store(
+    root: str | Path, base_name: str, suffix: str, payload: bytes, overwrite=False
+) -> tuple[Path, bool]:
+    """Store *payload* under ``<root>/<base_name><suffix>`` and return ``(path, written)``.
+
+    *written* is False when a file with identical content already existed
+    under the friendly name (or its hash-suffixed variant) and nothing was
+    written.  With *overwrite*, a friendly name holding different content is
+    relinked to the new payload; otherwise the payload is exposed as
+    ``<base_name>_<hash prefix><suffix>``.
+    """
+    root = Path(root)
+    digest = hashlib.sha256(payload).hexdigest()
+    blob = root / BLOBS_DIR / digest
+    path = root / f"{base_name}{suffix}"
+    if _holds(path, blob, digest, len(payload)):
+        _touch(path)
+        return path, False
+    previous = None
+    if path.exists():
+        if overwrite:
+            previous = file_digest(path)
+        else:
+            path = root / f"{base_name}_{digest[:SUFFIX_LENGTH]}{suffix}"
+            if _holds(path, blob, digest, len(payload)):
+                _touch(path)
+                return path, False
+
+    if not blob.exists():
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(blob, payload)
+    _link(blob, path)
+    if previous:
+        _release(root, previous)
+    return path, True
+
+
+def prune(root: str | Path) -> int:
+    """Delete blobs no friendly name links to any more; returns how many."""
+    blobs = Path(root) / BLOBS_DIR
+    if not blobs.is_dir():
+        return 0
+    removed = 0
+    for blob in blobs.iterdir():
+        try:
+            if blob.suffix != ".tmp" and blob.stat().st_nlink == 1:
+                blob.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
@@ -0,0 +1,140 @@
+"""Per-run Code Interpreter containers and streamed artifact downloads.
+
+Every research run gets a small pool of containers.  A ``run_code_interpreter``
+call borrows an idle container (or creates one), so follow-up analyses reuse
+its Python session and the files already copied into it; parallel calls get
+separate containers so their outputs never mix.  Generated files are streamed
+to ``outputs/`` in chunks, concurrently, and each container remembers which
+artifacts it has already handed out.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+# Bytes per chunk when streaming container files to disk
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class Container:
+    id: str
+    file_ids: set[str] = field(default_factory=set)
+    # (container file id, size) of user uploads and artifacts already downloaded
+    seen: set[tuple[str, int]] = field(default_factory=set)
+    last_used: float = field(default_factory=time.time)
+
+
+class ContainerPool:
+    """Code Interpreter containers belonging to one research run."""
+
+    def __init__(self, client, *, name: str, idle_minutes: int):
+        self.client = client
+        self.name = name
+        self.idle_minutes = idle_minutes
+        self._idle: list[Container] = []
+        self._created = 0
+        self.last_used = time.time()
+
+    def _expired(self, container: Container) -> bool:
+        # Leave a minute of slack before OpenAI's idle expiry kicks in
+        return time.time() - container.last_used > self.idle_minutes * 60 - 60
+
+    async def _create(self, file_ids: list[str]) -> Container:
+        self._created += 1
+        created = await self.client.containers.create(
+            name=f"{self.name}-{self._created}",
+            expires_after={"anchor": "last_active_at", "minutes": self.idle_minutes},
+            file_ids=file_ids,
+        )
+        logger.info(f"Created code interpreter container {created.id}")
+        return Container(id=created.id, file_ids=set(file_ids))
+
+    async def _add_files(self, container: Container, file_ids: list[str]) -> None:
+        missing = [f for f in file_ids if f not in container.file_ids]
+        await asyncio.gather(
+            *(
+                self.client.containers.files.create(container.id, file_id=f)
+                for f in missing
+            )
+        )
+        container.file_ids.update(missing)
+
+    @asynccontextmanager
+    async def acquire(self, file_ids: list[str]):
+        """Borrow a container holding *file_ids*; it is returned to the pool on success.
+
+        A container whose call failed is dropped, since it may have expired or
+        been left in an unknown state.
+        """
+        self.last_used = time.time()
+        container = None
+        while self._idle and container is None:
+            candidate = self._idle.pop()
+            if not self._expired(candidate):
+                container = candidate
+        if container is None:
+            container = await self._create(file_ids)
+        else:
+            await self._add_files(container, file_ids)
+        yield container
+        container.last_used = self.last_used = time.time()
+        self._idle.append(container)
+
+    async def download_new_files(self, container: Container, dest) -> list[str]:
+        """Stream artifacts created since the last call to ``dest(filename)`` paths."""
+        new = []
+        async for f in self.client.containers.files.list(container.id):
+            key = (f.id, f.bytes or 0)
+            if key in container.seen:
+                continue
+            container.seen.add(key)
+            # Only download files not from user (i.e., generated)
+            if f.source != "user":
+                new.append(f)
+        return list(
+            await asyncio.gather(*(self._download(container, f, dest) for f in new))
+        )
+
+    async def _download(self, container: Container, f, dest) -> str:
+        out_path = dest(f.path.split("/")[-1])
+        tmp = out_path.with_name(f".{out_path.name}.{os.getpid()}.part")
+        async with self.client.containers.files.content.with_streaming_response.retrieve(
+            f.id, container_id=container.id
+        ) as resp:
+            # Write-then-rename so readers never see a partial file
+            with open(tmp, "wb") as out:
+                async for chunk in resp.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    out.write(chunk)
+        os.replace(tmp, out_path)
+        return str(out_path)
+
+
+_pools: dict[tuple[str, int], ContainerPool] = {}
+
+
+def container_pool(
+    client_factory, run_id: str | None, idle_minutes: int
+) -> ContainerPool:
+    """Return the container pool for *run_id* on the running event loop.
+
+    Pools idle for longer than their containers live are forgotten.
+    """
+    now = time.time()
+    for key, pool in list(_pools.items()):
+        if now - pool.last_used > idle_minutes * 60:
+            del _pools[key]
+    key = (run_id or "default", id(asyncio.get_running_loop()))
+    pool = _pools.get(key)
+    if pool is None:
+        pool = _pools[key] = ContainerPool(
+            client_factory(), name=f"research-{key[0]}", idle_minutes=idle_minutes
+        )
+    return pool
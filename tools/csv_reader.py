@@ -0,0 +1,199 @@
+"""Bounded-memory CSV access for ``read_file``.
+
+Previews never parse more of a file than they need: tails are read by seeking
+backwards from the end of the file, heads and row ranges stop after the rows
+requested, and filters and summary statistics stream the file in chunks.
+"""
+
+from __future__ import annotations
+
+import io
+import math
+import operator
+import re
+from collections import deque
+from pathlib import Path
+
+import pandas as pd
+
+CHUNK_ROWS = 50_000
+_BLOCK_BYTES = 64 * 1024
+
+_OPERATORS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "!=": operator.ne,
+    "==": operator.eq,
+    ">": operator.gt,
+    "<": operator.lt,
+    "=": operator.eq,
+}
+_CONDITION = re.compile(r"^\s*(.+?)\s*(>=|<=|!=|==|>|<|=)\s*(.+?)\s*$")
+
+
+def read_header(path: Path) -> list[str]:
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def check_columns(header: list[str], columns: list[str] | None) -> None:
+    missing = [c for c in columns or [] if c not in header]
+    if missing:
+        raise ValueError(f"Unknown columns {missing}; available columns are {header}")
+
+
+def _tail_lines(path: Path, n: int) -> bytes:
+    """The last *n* lines of *path*, read backwards in blocks."""
+    with open(path, "rb") as f:
+        f.seek(0, io.SEEK_END)
+        pos = f.tell()
+        data = b""
+        # One extra newline for the line break ending the file
+        while pos > 0 and data.count(b"\n") <= n:
+            step = min(_BLOCK_BYTES, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+        # The first line is partial, or the header when the whole file was read
+        lines = data.splitlines(keepends=True)[1:]
+        return b"".join(lines[-n:])
+
+
+def parse_conditions(where: str) -> list[tuple[str, str, str]]:
+    """Split ``"Close > 100 and Date >= 2024-01-01"`` into (column, op, value) triples."""
+    conditions = []
+    for part in re.split(r"\s+and\s+", where.strip(), flags=re.IGNORECASE):
+        if not part:
+            continue
+        match = _CONDITION.match(part)
+        if not match:
+            raise ValueError(
+                f"Cannot parse condition '{part}'; use e.g. 'Close > 100' or "
+                "'Date >= 2024-01-01', joined with 'and'"
+            )
+        column, op, value = match.groups()
+        conditions.append((column.strip("`\"'"), op, value.strip("\"'")))
+    return conditions
+
+
+def _mask(chunk: pd.DataFrame, conditions: list[tuple[str, str, str]]) -> pd.Series:
+    mask = pd.Series(True, index=chunk.index)
+    for column, op, value in conditions:
+        series = chunk[column]
+        if pd.api.types.is_numeric_dtype(series):
+            target = float(value)
+        else:
+            # ISO dates and plain strings compare correctly as text
+            series, target = series.astype(str), value
+        mask &= _OPERATORS[op](series, target).fillna(False)
+    return mask
+
+
+def _chunks(path: Path, usecols: list[str] | None):
+    return pd.read_csv(path, usecols=usecols, chunksize=CHUNK_ROWS)
+
+
+def head(path: Path, n: int, columns: list[str] | None = None, start: int = 0):
+    """Rows ``start`` to ``start + n`` (0-based, excluding the header)."""
+    check_columns(read_header(path), columns)
+    skip = range(1, start + 1) if start else None
+    return pd.read_csv(path, usecols=columns, skiprows=skip, nrows=n)
+
+
+def tail(path: Path, n: int, columns: list[str] | None = None) -> pd.DataFrame:
+    header = read_header(path)
+    check_columns(header, columns)
+    raw = _tail_lines(path, n)
+    with open(path, "rb") as f:
+        header_line = f.readline()
+    try:
+        df = pd.read_csv(io.BytesIO(header_line + raw), usecols=columns)
+    except (pd.errors.ParserError, UnicodeDecodeError):
+        # Quoted fields with embedded newlines: fall back to streaming
+        last = deque(maxlen=n)
+        for chunk in _chunks(path, columns):
+            last.append(chunk.tail(n))
+        df = pd.concat(last).tail(n) if last else pd.DataFrame(columns=header)
+    return df.reset_index(drop=True)
+
+
+def select(
+    path: Path,
+    where: str,
+    n: int,
+    columns: list[str] | None = None,
+    from_end: bool = False,
+) -> tuple[pd.DataFrame, int]:
+    """First (or last) *n* rows matching *where*, and the total number of matches."""
+    header = read_header(path)
+    conditions = parse_conditions(where)
+    check_columns(header, (columns or []) + [c for c, _, _ in conditions])
+    usecols = None
+    if columns:
+        usecols = list(dict.fromkeys(columns + [c for c, _, _ in conditions]))
+    kept, matched = deque(), 0
+    for chunk in _chunks(path, usecols):
+        hits = chunk[_mask(chunk, conditions)]
+        matched += len(hits)
+        kept.append(hits)
+        if from_end:
+            # Only the last n matches can end up in the result
+            while len(kept) > 1 and sum(len(k) for k in kept) - len(kept[0]) >= n:
+                kept.popleft()
+        elif sum(len(k) for k in kept) >= n:
+            # Keep counting matches without holding their rows
+            kept = deque([pd.concat(kept).head(n)])
+    result = pd.concat(kept) if kept else pd.DataFrame(columns=usecols or header)
+    result = result.tail(n) if from_end else result.head(n)
+    return result[columns or list(result.columns)].reset_index(drop=True), matched
+
+
+def summarize(path: Path, columns: list[str] | None = None) -> dict:
+    """Per-column statistics accumulated chunk by chunk."""
+    check_columns(read_header(path), columns)
+    stats: dict[str, dict] = {}
+    rows = 0
+    for chunk in _chunks(path, columns):
+        rows += len(chunk)
+        for name, series in chunk.items():
+            s = stats.setdefault(
+                name,
+                dict(
+                    count=0,
+                    missing=0,
+                    numeric=True,
+                    sum=0.0,
+                    sumsq=0.0,
+                    min=None,
+                    max=None,
+                ),
+            )
+            valid = series.dropna()
+            s["count"] += len(valid)
+            s["missing"] += len(series) - len(valid)
+            if valid.empty:
+                continue
+            if s["numeric"] and not pd.api.types.is_numeric_dtype(valid):
+                # Mixed column: report it as text from here on
+                s["numeric"] = False
+                if s["min"] is not None:
+                    s["min"], s["max"] = str(s["min"]), str(s["max"])
+            if s["numeric"]:
+                values = valid.astype(float)
+                s["sum"] += float(values.sum())
+                s["sumsq"] += float((values**2).sum())
+                lo, hi = float(values.min()), float(values.max())
+            else:
+                text = valid.astype(str)
+                lo, hi = text.min(), text.max()
+            s["min"] = lo if s["min"] is None else min(s["min"], lo)
+            s["max"] = hi if s["max"] is None else max(s["max"], hi)
+    out = {}
+    for name, s in stats.items():
+        entry = {"count": s["count"], "missing": s["missing"]}
+        if s["numeric"] and s["count"]:
+            mean = s["sum"] / s["count"]
+            var = (s["sumsq"] - s["count"] * mean**2) / max(s["count"] - 1, 1)
+            entry.update(mean=round(mean, 6), std=round(math.sqrt(max(var, 0.0)), 6))
+        entry.update(min=s["min"], max=s["max"])
+        out[name] = entry
+    return {"rows": rows, "columns": out}
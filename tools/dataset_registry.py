@@ -0,0 +1,264 @@
+"""Registry of tables shared between tools as memory-mapped Arrow files.
+
+With ``DATASET_REGISTRY`` enabled, the Yahoo Finance tools register the
+tables they fetch here instead of writing them to ``outputs/``.  A table is
+registered under the output name the tool returns (``AAPL_5y_1d_historical.csv``)
+and stored once per distinct content as an uncompressed Arrow IPC file in the
+cache dir.  Every process that opens it maps the same pages, so ``read_file``
+previews and the local analytics tools work on those buffers directly, without
+parsing or copying.
+
+The CSV (or Parquet) file in ``outputs/`` is only written when something needs
+a real file, such as the code interpreter or a download.  In that case
+:func:`utils.find_output` calls :meth:`DatasetRegistry.materialize`.  The
+output manifest lists registered tables like any other output.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    name TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    tool TEXT,
+    tickers TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+"""
+
+# Hex digits of the content hash used to disambiguate a taken name
+SUFFIX_LENGTH = 8
+
+
+@functools.lru_cache(maxsize=64)
+def _map(path: str):
+    """The table in the Arrow IPC file *path*, backed by a memory map (no copy)."""
+    import pyarrow as pa
+
+    return pa.ipc.open_file(pa.memory_map(path)).read_all()
+
+
+def to_table(df):
+    """Convert *df* to an Arrow table (string column names, no index)."""
+    import pyarrow as pa
+
+    return pa.Table.from_pandas(df.rename(columns=str), preserve_index=False)
+
+
+def _ipc_bytes(table) -> bytes:
+    import pyarrow as pa
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+class DatasetRegistry:
+    """SQLite index of ``name -> Arrow IPC file`` shared by every process."""
+
+    def __init__(self, root: str | Path, outputs: str | Path):
+        self.root = Path(root)
+        self.outputs = Path(outputs)
+        self._local = threading.local()
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.root / "registry.sqlite", timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _path(self, digest: str) -> Path:
+        return self.root / f"{digest}.arrow"
+
+    def _row(self, name: str) -> sqlite3.Row | None:
+        return (
+            self._conn()
+            .execute("SELECT * FROM datasets WHERE name = ?", (name,))
+            .fetchone()
+        )
+
+    def has(self, name: str) -> bool:
+        return self._row(name) is not None
+
+    def digest(self, name: str) -> str | None:
+        """Content hash of the table registered as *name* (of its Arrow file)."""
+        row = self._row(name)
+        return row["digest"] if row is not None else None
+
+    def put(
+        self,
+        table,
+        name: str,
+        *,
+        tool: str | None = None,
+        tickers: list[str] | None = None,
+        overwrite: bool = False,
+    ) -> tuple[str, bool]:
+        """Register *table* under *name*; returns ``(name, written)``.
+
+        As with files in the shared store, identical content is a no-op and a
+        name holding different content either moves to the new table
+        (*overwrite*) or the table is registered as ``<stem>_<hash prefix>``.
+        """
+        payload = _ipc_bytes(table)
+        digest = hashlib.sha256(payload).hexdigest()
+        row = self._row(name)
+        if row is not None and row["digest"] == digest:
+            self._touch(name)
+            return name, False
+        taken = row is not None or (self.outputs / name).exists()
+        if taken and not overwrite:
+            stem, suffix = os.path.splitext(name)
+            name = f"{stem}_{digest[:SUFFIX_LENGTH]}{suffix}"
+            row = self._row(name)
+            if row is not None and row["digest"] == digest:
+                self._touch(name)
+                return name, False
+        path = self._path(digest)
+        if not path.exists():
+            tmp = path.with_name(f".{path.name}.{os.getpid()}-{threading.get_ident()}")
+            tmp.write_bytes(payload)
+            os.replace(tmp, path)
+        conn = self._conn()
+        with conn:
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO datasets "
+                "(name, digest, tool, tickers, size, created_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (name, digest, tool, json.dumps(tickers or []), len(payload), now, now),
+            )
+        # A file materialized from the previous content is now stale
+        (self.outputs / name).unlink(missing_ok=True)
+        self._index(name, digest, tool, tickers)
+        return name, True
+
+    def _touch(self, name: str) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "UPDATE datasets SET used_at = ? WHERE name = ?", (time.time(), name)
+            )
+
+    def _index(self, name, digest, tool, tickers) -> None:
+        from tools.output_manifest import default_output_manifest
+
+        path = self._path(digest)
+        try:
+            default_output_manifest().record_table(
+                name, _map(str(path)), tool, tickers, digest, path.stat()
+            )
+        except Exception as e:
+            logger.warning("Could not index dataset %s: %s", name, e)
+
+    def open(self, name: str):
+        """The registered table *name*, mapped from its Arrow file, or None."""
+        row = self._row(name)
+        if row is None:
+            return None
+        path = self._path(row["digest"])
+        if not path.exists():
+            return None
+        self._touch(name)
+        return _map(str(path))
+
+    def materialize(self, name: str) -> Path | None:
+        """Write the registered table *name* to ``outputs/`` and return its path."""
+        from tools import blob_store
+        from tools.output_manifest import record_output
+
+        row = self._row(name)
+        if row is None:
+            return None
+        table = self.open(name)
+        stem, suffix = os.path.splitext(name)
+        if suffix == ".parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            sink = pa.BufferOutputStream()
+            pq.write_table(table, sink)
+            payload = sink.getvalue().to_pybytes()
+        else:
+            payload = table.to_pandas().to_csv(index=False).encode()
+        path, written = blob_store.store(
+            self.outputs, stem, suffix, payload, overwrite=True
+        )
+        if written:
+            record_output(path, row["tool"], json.loads(row["tickers"]))
+        return path
+
+    def prune(self, max_age: float) -> int:
+        """Forget tables unused for *max_age* seconds and delete unreferenced files."""
+        conn = self._conn()
+        with conn:
+            removed = conn.execute(
+                "DELETE FROM datasets WHERE used_at < ?", (time.time() - max_age,)
+            ).rowcount
+        live = {
+            row["digest"]
+            for row in conn.execute("SELECT DISTINCT digest FROM datasets")
+        }
+        for path in self.root.glob("*.arrow"):
+            if path.stem not in live:
+                path.unlink(missing_ok=True)
+        return removed
+
+
+@functools.lru_cache(maxsize=None)
+def default_dataset_registry() -> DatasetRegistry:
+    """Return the process-wide registry under the shared cache dir."""
+    from utils import cache_dir, outputs_dir
+
+    return DatasetRegistry(cache_dir() / "datasets", outputs_dir())
+
+
+def _lookup(name: str | Path) -> tuple[DatasetRegistry, str] | None:
+    """The registry and the key of output *name* (a name or a path in the shared
+    outputs/ directory), unless the registry is disabled or the current run has
+    its own file *name* (which shadows shared outputs, see
+    :func:`utils.find_output`)."""
+    from settings import DATASET_REGISTRY
+    from utils import run_dir, shared_output_name
+
+    shared = shared_output_name(name) if DATASET_REGISTRY else None
+    if shared is None:
+        return None
+    workspace = run_dir()
+    if not Path(name).is_absolute() and workspace is not None:
+        if (workspace / shared).exists():
+            return None
+    return default_dataset_registry(), shared
+
+
+def open_dataset(name: str | Path):
+    """The mapped table registered as output *name*, or None."""
+    found = _lookup(name)
+    return found[0].open(found[1]) if found is not None else None
+
+
+def dataset_digest(name: str | Path) -> str | None:
+    """Content hash of the table registered as output *name*, or None."""
+    found = _lookup(name)
+    return found[0].digest(found[1]) if found is not None else None
@@ -0,0 +1,259 @@
+"""Event studies of asset returns and volume around dated events.
+
+All events, window offsets and tickers are handled at once: event positions
+on the trading calendar plus a vector of offsets index the (time x ticker)
+return array into an (events x offsets x tickers) block, and expected returns
+are estimated the same way over a pre-event window.  There are no per-event
+loops, so hundreds of events across hundreds of tickers take one call.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from agents import function_tool
+from tools.quant_analytics import load_price_frame, save_analysis_csv, simple_returns
+from utils import compact_stem
+
+EVENT_TYPES = ("cut", "hike", "change")
+
+
+def events_from_series(
+    series: pd.Series, event_type: str, threshold: float
+) -> pd.DatetimeIndex:
+    """Dates on which *series* moved down ("cut"), up ("hike") or either way by at least *threshold*."""
+    diff = series.dropna().diff()
+    if event_type == "cut":
+        hit = diff <= -threshold
+    elif event_type == "hike":
+        hit = diff >= threshold
+    else:
+        hit = diff.abs() >= threshold
+    return pd.DatetimeIndex(diff.index[hit.to_numpy()])
+
+
+def event_positions(
+    index: pd.DatetimeIndex, dates: pd.DatetimeIndex, first: int, last: int
+) -> tuple[np.ndarray, pd.DatetimeIndex]:
+    """Row of the first bar on or after each date, keeping events whose rows
+    ``pos + first`` to ``pos + last`` all lie inside *index*."""
+    pos = index.searchsorted(dates)
+    keep = (pos + first >= 0) & (pos + last < len(index))
+    pos, dates = pos[keep], dates[keep]
+    # Several dates can map to the same bar (e.g. over a weekend); count it once
+    pos, unique = np.unique(pos, return_index=True)
+    return pos, dates[unique]
+
+
+def window_block(values: np.ndarray, pos: np.ndarray, offsets: np.ndarray):
+    """``values`` rows at ``pos + offset`` for every event and offset: (events, offsets, ...)."""
+    return values[pos[:, None] + offsets[None, :]]
+
+
+def expected_returns(
+    est: np.ndarray, est_market: np.ndarray | None, window_market: np.ndarray | None
+) -> np.ndarray:
+    """Expected returns in the event window from the estimation window.
+
+    *est* is (events, days, tickers).  With a market series this is the market
+    model alpha + beta * market per event and ticker; otherwise the
+    estimation-window mean (constant-mean model).
+    """
+    if est_market is None:
+        return np.nanmean(est, axis=1, keepdims=True)
+    m = np.broadcast_to(est_market[:, :, None], est.shape)
+    mask = ~(np.isnan(est) | np.isnan(m))
+    n = mask.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_mean = np.where(mask, est, 0.0).sum(axis=1, keepdims=True) / n
+        m_mean = np.where(mask, m, 0.0).sum(axis=1, keepdims=True) / n
+        rc = np.where(mask, est - r_mean, 0.0)
+        mc = np.where(mask, m - m_mean, 0.0)
+        beta = (rc * mc).sum(axis=1, keepdims=True) / (mc**2).sum(axis=1, keepdims=True)
+    alpha = r_mean - beta * m_mean
+    return alpha + beta * window_market[:, :, None]
+
+
+def _num(x) -> float | None:
+    return None if x is None or not np.isfinite(x) else round(float(x), 6)
+
+
+@function_tool
+def run_event_study(
+    files: List[str],
+    event_dates: Optional[List[str]] = None,
+    event_series_file: str = "",
+    event_type: str = "cut",
+    threshold: float = 0.1,
+    window_pre: int = 5,
+    window_post: int = 20,
+    estimation_days: int = 120,
+    benchmark: str = "",
+) -> str:
+    """Measures abnormal and cumulative abnormal returns (and volume) around events for every ticker in the files.
+
+    Events are either given as dates or derived from a FRED series file (e.g.
+    FEDFUNDS): every observation where the series fell ("cut"), rose ("hike")
+    or moved either way ("change") by at least *threshold*.
+
+    Args:
+        files: Price files in outputs/ (single-ticker histories or batch price files).
+        event_dates: Event dates as YYYY-MM-DD.
+        event_series_file: FRED file in outputs/ to derive events from, used when
+            *event_dates* is empty.
+        event_type: "cut", "hike" or "change" for events derived from the series.
+        threshold: Minimum change in the series' units (e.g. 0.1 = 10bp for rates).
+        window_pre: Trading days before each event in the window.
+        window_post: Trading days after each event in the window.
+        estimation_days: Trading days before the window used to estimate normal returns.
+        benchmark: Optional market ticker in *files* (e.g. "SPY"); abnormal returns
+            then use a market model, otherwise the estimation-window mean.
+
+    Returns:
+        str: JSON with per-ticker mean cumulative abnormal return (CAR) over the
+        window and around the event day, t-statistics, share of positive CARs
+        and abnormal volume, the events used, and the names of a CSV with the
+        average CAR / abnormal volume path by day relative to the event and a
+        CSV with each event's CAR.
+    """
+    try:
+        if event_dates:
+            dates = pd.DatetimeIndex(pd.to_datetime(event_dates)).sort_values()
+            source = "dates"
+        elif event_series_file:
+            event_type = event_type.strip().lower()
+            if event_type not in EVENT_TYPES:
+                return json.dumps(
+                    {"error": f"event_type must be one of {list(EVENT_TYPES)}"}
+                )
+            series = load_price_frame([event_series_file]).iloc[:, 0]
+            dates = events_from_series(series, event_type, threshold)
+            source = f"{series.name} {event_type} >= {threshold}"
+        else:
+            return json.dumps({"error": "Provide event_dates or an event_series_file"})
+        if window_pre < 0 or window_post < 0 or estimation_days < 10:
+            return json.dumps(
+                {
+                    "error": "Windows must be non-negative and estimation_days at least 10"
+                }
+            )
+
+        prices = load_price_frame(files)
+        benchmark = benchmark.strip().upper()
+        if benchmark and benchmark not in prices.columns:
+            return json.dumps(
+                {
+                    "error": f"Benchmark {benchmark} not found in files",
+                    "tickers": list(prices.columns),
+                }
+            )
+        tickers = [t for t in prices.columns if t != benchmark]
+        rets = simple_returns(prices.to_numpy())
+        market = rets[:, prices.columns.get_loc(benchmark)] if benchmark else None
+        rets = rets[:, [prices.columns.get_loc(t) for t in tickers]]
+
+        offsets = np.arange(-window_pre, window_post + 1)
+        est_offsets = np.arange(-window_pre - estimation_days, -window_pre)
+        # Row 0 has no return, so windows may start at row 1 at the earliest
+        pos, used = event_positions(
+            prices.index, dates, est_offsets[0] - 1, offsets[-1]
+        )
+        if pos.size == 0:
+            return json.dumps(
+                {
+                    "error": "No event has enough price history around it",
+                    "events_requested": len(dates),
+                    "price_range": [
+                        str(prices.index[0].date()),
+                        str(prices.index[-1].date()),
+                    ],
+                }
+            )
+
+        window = window_block(rets, pos, offsets)
+        est = window_block(rets, pos, est_offsets)
+        if market is not None:
+            expected = expected_returns(
+                est,
+                window_block(market, pos, est_offsets),
+                window_block(market, pos, offsets),
+            )
+        else:
+            expected = expected_returns(est, None, None)
+        abnormal = window - expected
+        car = np.nancumsum(abnormal, axis=1)
+        final = car[:, -1, :]
+        # CAR over the event day and the day after, from the cumulative sums
+        day0 = window_pre
+        short = car[:, min(day0 + 1, len(offsets) - 1), :] - (
+            car[:, day0 - 1, :] if day0 > 0 else 0.0
+        )
+
+        columns = {}
+        volume = None
+        try:
+            volume = load_price_frame(files, column="Volume")
+            volume = volume.reindex(prices.index)[tickers].to_numpy()
+        except (KeyError, ValueError):
+            pass
+        if volume is not None:
+            with np.errstate(divide="ignore"):
+                log_vol = np.log(np.where(volume > 0, volume, np.nan))
+            normal_vol = np.nanmean(window_block(log_vol, pos, est_offsets), axis=1)
+            abnormal_vol = window_block(log_vol, pos, offsets) - normal_vol[:, None, :]
+            avg_volume = np.nanmean(abnormal_vol, axis=0)
+
+        avg_ar = np.nanmean(abnormal, axis=0)
+        avg_car = np.nanmean(car, axis=0)
+        n_events = pos.size
+        summary = {}
+        for j, ticker in enumerate(tickers):
+            columns[f"{ticker}_AR"] = avg_ar[:, j]
+            columns[f"{ticker}_CAR"] = avg_car[:, j]
+            sd = np.nanstd(final[:, j], ddof=1) if n_events > 1 else np.nan
+            summary[ticker] = {
+                "mean_car": _num(np.nanmean(final[:, j])),
+                "median_car": _num(np.nanmedian(final[:, j])),
+                "t_stat": _num(np.nanmean(final[:, j]) / (sd / np.sqrt(n_events))),
+                "share_positive": _num(np.mean(final[:, j] > 0)),
+                "mean_car_day0_to_1": _num(np.nanmean(short[:, j])),
+            }
+            if volume is not None:
+                columns[f"{ticker}_AbnormalLogVolume"] = avg_volume[:, j]
+                summary[ticker]["mean_abnormal_log_volume_day0_to_5"] = _num(
+                    np.nanmean(avg_volume[day0 : day0 + 6, j])
+                )
+
+        stem = f"{compact_stem(tickers)}_event_study_{window_pre}_{window_post}"
+        path_file = save_analysis_csv(
+            pd.DataFrame(columns, index=pd.Index(offsets, name="DaysFromEvent")),
+            f"{stem}.csv",
+            tool="run_event_study",
+        )
+        events_file = save_analysis_csv(
+            pd.DataFrame(
+                final, index=pd.Index(used, name="EventDate"), columns=tickers
+            ).add_suffix("_CAR"),
+            f"{stem}_events.csv",
+            tool="run_event_study",
+        )
+        return json.dumps(
+            {
+                "file": path_file,
+                "events_file": events_file,
+                "event_source": source,
+                "model": (
+                    f"market model ({benchmark})" if benchmark else "constant mean"
+                ),
+                "events_used": n_events,
+                "events_dropped": int(len(dates) - n_events),
+                "event_dates": [str(d.date()) for d in used[:50]],
+                "window": [-window_pre, window_post],
+                "results": summary,
+            }
+        )
+    except Exception as e:
+        return json.dumps({"error": str(e), "files": files})
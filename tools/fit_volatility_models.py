@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+from typing import List
+
+import numpy as np
+import pandas as pd
+from agents import function_tool
+from settings import QUANT_PROCESS_WORKERS
+from tools.garch import MODELS, VolatilitySpec, fit_volatility_model, persistence
+from tools.process_pool import process_pool
+from tools.quant_analytics import load_price_frame, log_returns, save_analysis_csv
+from utils import cache_file, compact_stem
+
+# Fewest returns a model is fitted to
+MIN_OBSERVATIONS = 100
+
+
+def _params_path(returns: np.ndarray, spec: VolatilitySpec):
+    """Cache file for fitted parameters, keyed by the return data and model spec."""
+    h = hashlib.sha256(returns.tobytes())
+    h.update(spec.key().encode())
+    return cache_file(f"garch/{h.hexdigest()[:32]}.json")
+
+
+def _load_params(returns: np.ndarray, spec: VolatilitySpec) -> dict | None:
+    path = _params_path(returns, spec)
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _store_params(returns: np.ndarray, spec: VolatilitySpec, params: dict) -> None:
+    path = _params_path(returns, spec)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(params))
+    os.replace(tmp, path)
+
+
+def _long_run_variance(spec: VolatilitySpec, params: dict, rho: float) -> float:
+    omega = params["omega"]
+    if spec.model == "egarch":
+        return float(np.exp(omega / (1 - rho))) if rho < 1 else np.nan
+    return omega / (1 - rho) if rho < 1 else np.nan
+
+
+def _num(x) -> float | None:
+    return None if x is None or not np.isfinite(x) else round(float(x), 6)
+
+
+@function_tool
+def fit_volatility_models(
+    files: List[str],
+    model: str = "garch",
+    p: int = 1,
+    q: int = 1,
+    dist: str = "t",
+    horizon_days: int = 21,
+    periods_per_year: int = 252,
+) -> str:
+    """Fits a GARCH-family volatility model to every ticker in the files and forecasts volatility.
+
+    Fits run in parallel across tickers; fitted parameters are cached, so
+    re-running on unchanged data is immediate.
+
+    Args:
+        files: Price files in outputs/ (single-ticker histories or batch price files).
+        model: "garch", "gjr" (GARCH with a leverage term) or "egarch".
+        p: Order of the shock (ARCH) terms.
+        q: Order of the lagged variance (GARCH) terms.
+        dist: Innovation distribution: "normal", "t" or "skewt".
+        horizon_days: Number of periods to forecast.
+        periods_per_year: Bars per year used to annualize (252 for daily data).
+
+    Returns:
+        str: JSON with per-ticker parameters, persistence, half-life, long-run,
+        latest and forecast annualized volatility, plus the names of a CSV with
+        the conditional volatility series ({T}_CondVol columns) and a CSV with
+        the forecast per step.
+    """
+    try:
+        model = model.strip().lower()
+        dist = dist.strip().lower()
+        if model not in MODELS:
+            return json.dumps({"error": f"model must be one of {list(MODELS)}"})
+        if dist not in ("normal", "t", "skewt"):
+            return json.dumps({"error": "dist must be 'normal', 't' or 'skewt'"})
+        if min(p, q) < 1 or horizon_days < 1:
+            return json.dumps({"error": "p, q and horizon_days must be positive"})
+        spec = VolatilitySpec(model=model, p=p, q=q, dist=dist)
+
+        prices = load_price_frame(files)
+        rets = log_returns(prices.to_numpy()) * 100
+        jobs, summary = {}, {}
+        for j, ticker in enumerate(prices.columns):
+            valid = np.flatnonzero(~np.isnan(rets[:, j]))
+            if valid.size < MIN_OBSERVATIONS:
+                summary[ticker] = {
+                    "error": f"fewer than {MIN_OBSERVATIONS} returns to fit"
+                }
+                continue
+            series = np.ascontiguousarray(rets[valid, j])
+            jobs[ticker] = (valid, series, _load_params(series, spec))
+
+        args = [
+            (series, spec, horizon_days, params) for _, series, params in jobs.values()
+        ]
+        if QUANT_PROCESS_WORKERS > 1 and len(args) > 1:
+            results = list(process_pool().map(fit_volatility_model, *zip(*args)))
+        else:
+            results = [fit_volatility_model(*a) for a in args]
+
+        scale = np.sqrt(periods_per_year) / 100
+        cond_vol = pd.DataFrame(index=prices.index)
+        forecasts = {}
+        for (ticker, (valid, series, cached)), fit in zip(jobs.items(), results):
+            if cached is None and fit["converged"]:
+                _store_params(series, spec, fit["params"])
+            column = np.full(len(prices.index), np.nan)
+            column[valid] = fit["conditional_volatility"] * scale
+            cond_vol[f"{ticker}_CondVol"] = column
+            forecast_vol = np.sqrt(fit["forecast_variance"]) * scale
+            forecasts[ticker] = forecast_vol
+
+            rho = persistence(spec, fit["params"])
+            summary[ticker] = {
+                "params": {k: _num(v) for k, v in fit["params"].items()},
+                "converged": fit["converged"],
+                "cached": cached is not None,
+                "observations": int(series.size),
+                "persistence": _num(rho),
+                "half_life_days": (
+                    _num(np.log(0.5) / np.log(rho)) if 0 < rho < 1 else None
+                ),
+                "long_run_volatility": _num(
+                    np.sqrt(_long_run_variance(spec, fit["params"], rho)) * scale
+                ),
+                "latest_volatility": _num(column[valid[-1]]),
+                "latest_date": str(prices.index[valid[-1]].date()),
+                "next_day_forecast": _num(forecast_vol[0]),
+                "horizon_average_forecast": _num(
+                    np.sqrt(np.mean(fit["forecast_variance"])) * scale
+                ),
+            }
+
+        if not forecasts:
+            return json.dumps(
+                {"error": "No ticker could be fitted", "tickers": summary}
+            )
+        stem = f"{compact_stem(list(forecasts))}_{model}{p}{q}"
+        cond_file = save_analysis_csv(
+            cond_vol, f"{stem}_conditional_vol.csv", tool="fit_volatility_models"
+        )
+        forecast_file = save_analysis_csv(
+            pd.DataFrame(
+                forecasts, index=pd.RangeIndex(1, horizon_days + 1, name="Step")
+            ).add_suffix("_ForecastVol"),
+            f"{stem}_forecast_{horizon_days}.csv",
+            tool="fit_volatility_models",
+        )
+        return json.dumps(
+            {
+                "conditional_volatility_file": cond_file,
+                "forecast_file": forecast_file,
+                "model": model,
+                "p": p,
+                "q": q,
+                "dist": dist,
+                "horizon_days": horizon_days,
+                "volatility": summary,
+            }
+        )
+    except Exception as e:
+        return json.dumps({"error": str(e), "files": files})
@@ -0,0 +1,160 @@
+"""Local store of FRED observation series with incremental refresh.
+
+Each series is kept on disk in full together with a small metadata record.
+Requests for any ``start``/``end`` window are answered by slicing the stored
+series; once it is stale only observations from the last stored date onwards
+are downloaded.  A periodic full refetch picks up revisions to older values.
+One ``Fred`` client is shared by every call.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# fredapi is optional; callers check ``Fred is None`` before using the store.
+try:
+    from fredapi import Fred  # type: ignore
+except ImportError:  # pragma: no cover – optional dependency
+    Fred = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+class FredSeriesStore:
+    """On-disk FRED series, refreshed with delta fetches."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        *,
+        refresh_after: int = 3600,
+        full_refresh_after: int = 7 * 86400,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.refresh_after = refresh_after
+        self.full_refresh_after = full_refresh_after
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        # series_id -> timing information for the most recent network fetch
+        self._timings: dict[str, dict] = {}
+
+    # ------------------------------------------------------------------
+    # Client & storage
+    # ------------------------------------------------------------------
+
+    def client(self):
+        """Return the shared ``Fred`` client, creating it on first use."""
+        with self._client_lock:
+            if self._client is None:
+                self._client = Fred(api_key=os.getenv("FRED_API_KEY"))
+            return self._client
+
+    def _paths(self, series_id: str) -> tuple[Path, Path]:
+        stem = series_id.strip().upper()
+        return self.root / f"{stem}.pkl", self.root / f"{stem}.json"
+
+    def _lock(self, series_id: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(series_id.strip().upper(), threading.Lock())
+
+    def load(self, series_id: str) -> tuple[pd.Series | None, dict]:
+        data_path, meta_path = self._paths(series_id)
+        if not data_path.exists() or not meta_path.exists():
+            return None, {}
+        try:
+            return pd.read_pickle(data_path), json.loads(meta_path.read_text())
+        except Exception:
+            return None, {}
+
+    def _save(self, series_id: str, data: pd.Series, meta: dict) -> None:
+        data_path, meta_path = self._paths(series_id)
+        # Write-then-rename so concurrent readers never see a partial file
+        tmp = data_path.with_suffix(f".{os.getpid()}.tmp")
+        data.to_pickle(tmp)
+        os.replace(tmp, data_path)
+        tmp = meta_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, meta_path)
+
+    # ------------------------------------------------------------------
+    # Fetching
+    # ------------------------------------------------------------------
+
+    def _fetch(self, series_id: str, start: pd.Timestamp | None) -> pd.Series:
+        began = time.perf_counter()
+        data = self.client().get_series(series_id, observation_start=start)
+        elapsed = time.perf_counter() - began
+        self._timings[series_id.strip().upper()] = {
+            "mode": "full" if start is None else "delta",
+            "seconds": round(elapsed, 3),
+            "observations": len(data),
+            "at": time.time(),
+        }
+        logger.info(
+            f"Fetched {len(data)} {series_id} observations "
+            f"({'full' if start is None else f'from {start.date()}'}) in {elapsed:.2f}s"
+        )
+        if data.empty:
+            return data.astype(float)
+        data.index = pd.DatetimeIndex(data.index)
+        return data.sort_index()
+
+    def refresh(self, series_id: str) -> pd.Series:
+        """Bring the stored series up to date and return it in full."""
+        with self._lock(series_id):
+            data, meta = self.load(series_id)
+            now = time.time()
+            if (
+                data is not None
+                and now - meta.get("fetched_at", 0) < self.refresh_after
+            ):
+                return data
+            if (
+                data is None
+                or data.empty
+                or (now - meta.get("full_at", 0) >= self.full_refresh_after)
+            ):
+                data = self._fetch(series_id, None)
+                meta = {"full_at": now}
+            else:
+                # Refetch the last stored observation too: it may be revised.
+                delta = self._fetch(series_id, data.index.max())
+                data = pd.concat([data, delta])
+                data = data[~data.index.duplicated(keep="last")].sort_index()
+            meta["fetched_at"] = now
+            data.name = series_id
+            self._save(series_id, data, meta)
+            return data
+
+    def get(
+        self, series_id: str, start: str | None = None, end: str | None = None
+    ) -> pd.Series:
+        """Return observations of *series_id* between *start* and *end* (inclusive)."""
+        data = self.refresh(series_id)
+        return data.loc[start:end] if not data.empty else data
+
+    def stats(self) -> dict:
+        """Return the most recent fetch timings per series."""
+        return dict(self._timings)
+
+
+def default_fred_store() -> FredSeriesStore:
+    """Return a store configured from ``settings.py`` under the shared cache dir."""
+    from settings import FRED_FULL_REFRESH_AFTER, FRED_REFRESH_AFTER
+    from utils import cache_dir
+
+    return FredSeriesStore(
+        cache_dir() / "fred",
+        refresh_after=FRED_REFRESH_AFTER,
+        full_refresh_after=FRED_FULL_REFRESH_AFTER,
+    )
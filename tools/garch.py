@@ -0,0 +1,91 @@
+"""GARCH-family volatility fits for one return series.
+
+Kept free of agent and network imports so ``fit_volatility_model`` can run in
+the shared process pool (see ``tools/process_pool.py``).  Returns are expected
+in percent, the scale ``arch`` optimizes best at.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+# Volatility processes by model name, as (arch ``vol`` argument, asymmetric order)
+MODELS = {"garch": ("GARCH", 0), "gjr": ("GARCH", 1), "egarch": ("EGARCH", 1)}
+
+# Paths used for simulated multi-step forecasts (EGARCH has no analytic form)
+FORECAST_SIMULATIONS = 2000
+
+
+@dataclass(frozen=True)
+class VolatilitySpec:
+    model: str = "garch"  # key of MODELS
+    p: int = 1
+    q: int = 1
+    dist: str = "t"  # "normal", "t" or "skewt"
+
+    def key(self) -> str:
+        return "-".join(str(v) for v in asdict(self).values())
+
+
+def _arch_model(returns: np.ndarray, spec: VolatilitySpec, seed: int):
+    from arch import arch_model
+
+    vol, o = MODELS[spec.model]
+    model = arch_model(
+        returns, mean="Constant", vol=vol, p=spec.p, o=o, q=spec.q, dist=spec.dist
+    )
+    # Seeded innovations make simulated forecasts reproducible
+    model.distribution = type(model.distribution)(seed=seed)
+    return model
+
+
+def persistence(spec: VolatilitySpec, params: dict[str, float]) -> float:
+    """Decay rate of a variance shock per period."""
+    betas = sum(v for k, v in params.items() if k.startswith("beta["))
+    if spec.model == "egarch":
+        return betas
+    alphas = sum(v for k, v in params.items() if k.startswith("alpha["))
+    gammas = sum(v for k, v in params.items() if k.startswith("gamma["))
+    return alphas + gammas / 2 + betas
+
+
+def fit_volatility_model(
+    returns: np.ndarray,
+    spec: VolatilitySpec,
+    horizon: int,
+    params: dict[str, float] | None = None,
+    seed: int = 0,
+) -> dict:
+    """Fit *spec* to *returns* (or apply known *params*) and forecast *horizon* steps.
+
+    Returns a dict with ``params``, the in-sample ``conditional_volatility``
+    (per period, percent), per-step ``forecast_variance`` for the horizon, the
+    log-likelihood and whether the optimizer converged.  Passing ``params``
+    skips the optimization, which is how cached fits are reused.
+    """
+    model = _arch_model(returns, spec, seed)
+    if params is None:
+        result = model.fit(disp="off", show_warning=False)
+        converged = result.convergence_flag == 0
+    else:
+        # Stored in the order of ``result.params``: mean, volatility, distribution
+        result = model.fix(np.array(list(params.values())))
+        converged = True
+    if spec.model == "egarch" and horizon > 1:
+        forecast = result.forecast(
+            horizon=horizon,
+            reindex=False,
+            method="simulation",
+            simulations=FORECAST_SIMULATIONS,
+        )
+    else:
+        forecast = result.forecast(horizon=horizon, reindex=False)
+    return {
+        "params": {k: float(v) for k, v in result.params.items()},
+        "conditional_volatility": np.asarray(result.conditional_volatility),
+        "forecast_variance": forecast.variance.to_numpy()[-1],
+        "loglikelihood": float(result.loglikelihood),
+        "converged": bool(converged),
+    }
@@ -1,7 +1,9 @@
 import json
+import os
 from pathlib import Path
 from agents import function_tool
-from utils import output_file
+from tools.output_manifest import record_output
+from utils import find_output, output_file
 
 
 @function_tool
@@ -23,7 +25,7 @@ def generate_pdf(markdown_filename: str) -> str:
     if not markdown_filename.endswith(".md"):
         markdown_filename += ".md"
 
-    md_path = output_file(markdown_filename, make_parents=False)
+    md_path = find_output(markdown_filename)
     if not md_path.exists():
         return json.dumps({"error": "file not found", "file": markdown_filename})
 
@@ -43,7 +45,11 @@ def generate_pdf(markdown_filename: str) -> str:
         pdf.add_section(Section(text, root=str(output_file(""))))
         pdf_filename = markdown_filename.replace(".md", ".pdf")
         pdf_path = output_file(pdf_filename)
-        pdf.save(str(pdf_path))
+        # Write-then-rename so readers never see a partial file
+        tmp_path = pdf_path.with_name(f".{pdf_path.name}.{os.getpid()}.part")
+        pdf.save(str(tmp_path))
+        os.replace(tmp_path, pdf_path)
+        record_output(pdf_path, "generate_pdf")
         return json.dumps({"pdf_file": pdf_filename, "file": pdf_filename})
     except Exception as e:
         return json.dumps({"error": str(e)})
@@ -1,13 +1,24 @@
-import os
+import functools
 import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+import pandas as pd
 from agents import function_tool
-from utils import output_file
+from settings import FRED_MAX_WORKERS
+from tools import blob_store
+from utils import compact_stem, outputs_dir
+
+# fredapi is optional; ``Fred`` is None if it isn't installed.
+from tools.fred_store import Fred, default_fred_store
+from tools.output_manifest import record_output
 
-# fredapi is optional; fall back gracefully if it isn't installed.
-try:
-    from fredapi import Fred  # type: ignore
-except ImportError:  # pragma: no cover – optional dependency
-    Fred = None  # type: ignore
+
+@functools.lru_cache(maxsize=None)
+def fred_store():
+    """Return the process-wide FRED series store (created on first use)."""
+    return default_fred_store()
 
 
 @function_tool
@@ -44,11 +55,8 @@ def get_fred_series(
         )
 
     try:
-        fred_api_key = os.getenv("FRED_API_KEY")
-        fred = Fred(api_key=fred_api_key)
-        data = fred.get_series(
-            series_id, observation_start=start_date, observation_end=end_date
-        )
+        # Served from the local store; only new observations hit the network
+        data = fred_store().get(series_id, start_date, end_date)
         if data is None or data.empty:
             return json.dumps(
                 {"error": "Series not found or empty", "series_id": series_id}
@@ -77,9 +85,16 @@ def get_fred_series(
             date_range = f"{start_str}_{end_str}".replace("-", "")
             file_name = f"{series_id}_{date_range}.csv"
 
-            # Save under outputs/
-            csv_path = output_file(file_name)
-            df.to_csv(csv_path, index=False)
+            # Save to the shared store under outputs/ (unchanged data is not rewritten)
+            csv_path, written = blob_store.store(
+                outputs_dir(),
+                Path(file_name).stem,
+                ".csv",
+                df.to_csv(index=False).encode(),
+                overwrite=True,
+            )
+            if written:
+                record_output(csv_path, "get_fred_series", [series_id])
 
             # Add file metadata to summary
             summary["file"] = file_name
@@ -88,3 +103,175 @@ def get_fred_series(
         return json.dumps(summary)
     except Exception as e:
         return json.dumps({"error": str(e), "series_id": series_id})
+
+
+# Target frequencies for the batch tool (labels follow FRED: period start dates)
+FREQUENCY_RULES = {"D": "D", "W": "W-FRI", "M": "MS", "Q": "QS", "A": "YS"}
+AGGREGATIONS = ("last", "mean", "first", "sum")
+
+
+def _align(series: pd.Series, frequency: str, aggregation: str, fill: str):
+    """Resample one series to *frequency*.
+
+    Higher-frequency series are reduced with *aggregation*; lower-frequency
+    series are upsampled and, with ``fill="ffill"``, forward-filled between
+    their own observations (never beyond the last one).
+    """
+    aligned = series.resample(FREQUENCY_RULES[frequency]).agg(aggregation)
+    if aggregation == "sum":
+        # sum() of an empty bucket is 0, not a missing observation
+        counts = series.resample(FREQUENCY_RULES[frequency]).count()
+        aligned = aligned.where(counts > 0)
+    if fill == "ffill":
+        aligned = aligned.ffill(limit_area="inside")
+    return aligned
+
+
+def _bucket(date: str | None, frequency: str) -> pd.Timestamp | None:
+    """Label of the *frequency* bucket that contains *date*."""
+    if not date:
+        return None
+    stamp = pd.Series([0], index=[pd.Timestamp(date)])
+    return stamp.resample(FREQUENCY_RULES[frequency]).first().index[0]
+
+
+@function_tool
+def get_fred_series_batch(
+    series_ids: List[str],
+    start_date: str,
+    end_date: str,
+    frequency: str = "M",
+    aggregation: str = "last",
+    fill: str = "ffill",
+) -> str:
+    """Fetches several FRED series at once and aligns them into one CSV.
+
+    Parameters
+    ----------
+    series_ids : list[str]
+        FRED series identifiers, e.g. ["FEDFUNDS", "CPIAUCSL", "UNRATE", "DGS10", "GDP"].
+    start_date : str
+        ISO date string (YYYY-MM-DD); empty for the full history.
+    end_date : str
+        ISO date string (YYYY-MM-DD); empty for the latest observation.
+    frequency : str
+        Common frequency: "D", "W" (weeks ending Friday), "M", "Q" or "A".
+        Rows are labelled with the period start date, as on FRED.
+    aggregation : str
+        How higher-frequency series are reduced to *frequency*:
+        "last", "mean", "first" or "sum".
+    fill : str
+        "ffill" forward-fills lower-frequency series (e.g. quarterly GDP on a
+        monthly grid) between their observations; "none" leaves gaps as NaN.
+
+    Returns
+    -------
+    str
+        JSON string with the output file name, schema, per-series summary
+        statistics on the aligned grid and any series that failed.
+    """
+    start_date = start_date or None  # type: ignore
+    end_date = end_date or None  # type: ignore
+    series_ids = list(dict.fromkeys(s.strip().upper() for s in series_ids if s.strip()))
+    frequency = frequency.strip().upper()
+
+    if Fred is None:
+        return json.dumps(
+            {
+                "error": "fredapi not installed. returning stub result",
+                "series_ids": series_ids,
+            }
+        )
+    if not series_ids:
+        return json.dumps({"error": "No series_ids given"})
+    if frequency not in FREQUENCY_RULES:
+        return json.dumps(
+            {
+                "error": f"Invalid frequency '{frequency}'. Use one of {list(FREQUENCY_RULES)}"
+            }
+        )
+    if aggregation not in AGGREGATIONS:
+        return json.dumps(
+            {
+                "error": f"Invalid aggregation '{aggregation}'. Use one of {list(AGGREGATIONS)}"
+            }
+        )
+    if fill not in ("ffill", "none"):
+        return json.dumps({"error": f"Invalid fill '{fill}'. Use 'ffill' or 'none'"})
+
+    store = fred_store()
+
+    def _fetch(series_id):
+        try:
+            return series_id, store.get(series_id, start_date, end_date), None
+        except Exception as e:
+            return series_id, None, str(e)
+
+    try:
+        with ThreadPoolExecutor(
+            max_workers=min(FRED_MAX_WORKERS, len(series_ids))
+        ) as pool:
+            results = list(pool.map(_fetch, series_ids))
+
+        columns, errors = {}, {}
+        for series_id, data, error in results:
+            if error is not None or data is None or data.empty:
+                errors[series_id] = error or "Series not found or empty"
+                continue
+            columns[series_id] = _align(data, frequency, aggregation, fill)
+        if not columns:
+            return json.dumps({"error": "No series returned data", "failed": errors})
+
+        df = pd.DataFrame(columns).sort_index()
+        # Trim by bucket: the labels of partial first/last periods lie outside the range
+        df = df.loc[_bucket(start_date, frequency) : _bucket(end_date, frequency)]
+        df = df.dropna(how="all")
+        df.index.name = "Date"
+
+        summaries = {}
+        for series_id, col in df.items():
+            values = col.dropna()
+            if values.empty:
+                summaries[series_id] = {"observations": 0}
+                continue
+            summaries[series_id] = {
+                "observations": int(values.size),
+                "first_date": str(values.index.min().date()),
+                "latest_date": str(values.index.max().date()),
+                "latest": float(values.iloc[-1]),
+                "mean": float(values.mean()),
+                "min": float(values.min()),
+                "max": float(values.max()),
+                "change": float(values.iloc[-1] - values.iloc[0]),
+            }
+
+        start_str = start_date if start_date else str(df.index.min().date())
+        end_str = end_date if end_date else str(df.index.max().date())
+        date_range = f"{start_str}_{end_str}".replace("-", "")
+        file_name = f"{compact_stem(list(columns))}_{frequency}_{date_range}.csv"
+        csv_path, written = blob_store.store(
+            outputs_dir(),
+            Path(file_name).stem,
+            ".csv",
+            df.reset_index().to_csv(index=False).encode(),
+            overwrite=True,
+        )
+        if written:
+            record_output(csv_path, "get_fred_series_batch", list(columns))
+
+        return json.dumps(
+            {
+                "file": file_name,
+                "schema": ["Date", *columns],
+                "frequency": frequency,
+                "aggregation": aggregation,
+                "fill": fill,
+                "rows": len(df),
+                "start": str(df.index.min().date()),
+                "end": str(df.index.max().date()),
+                "series": summaries,
+                "failed": errors,
+            }
+        )
+    except Exception as e:
+        return json.dumps({"error": str(e), "series_ids": series_ids})
@@ -1,17 +1,55 @@
 import json
+import time
+from typing import Optional
+
 from agents import function_tool
-from utils import outputs_dir
+from tools.output_manifest import default_output_manifest
+from utils import current_run_id
 
 
 @function_tool
-def list_output_files(extension: str = None) -> str:
+def list_output_files(
+    extension: Optional[str] = None,
+    ticker: Optional[str] = None,
+    tool: Optional[str] = None,
+    name_contains: Optional[str] = None,
+    modified_within_hours: Optional[float] = None,
+    limit: int = 100,
+) -> str:
     """
-    List all files in the outputs directory. Optionally filter by file extension (e.g., 'png', 'csv', 'md').
-    Returns a JSON list of filenames.
+    List files in the outputs directory, most recently modified first, with what each contains.
+
+    Covers the shared data files (market and FRED downloads) and the files written
+    during the current research run.
+
+    Each entry has the file name, type, tickers/series it covers, the tool that produced it,
+    row count, columns (CSV) or top-level keys (JSON), first and last date, size and
+    modification time, so you can pick the right file without reading candidates.
+
+    Args:
+        extension: Only files with this extension (e.g. 'png', 'csv', 'md').
+        ticker: Only files covering this ticker or FRED series id (e.g. 'AAPL', 'FEDFUNDS').
+        tool: Only files produced by this tool (e.g. 'get_historical_stock_prices', 'run_code_interpreter').
+        name_contains: Only files whose name contains this text (case-insensitive).
+        modified_within_hours: Only files modified in the last this many hours.
+        limit: Maximum number of files to return.
+
+    Returns a JSON object {"files": [{"name": ..., "type": ..., ...}, ...]}.
     """
-    out_dir = outputs_dir()
-    if extension:
-        files = [f.name for f in out_dir.glob(f"*.{extension}") if f.is_file()]
-    else:
-        files = [f.name for f in out_dir.iterdir() if f.is_file()]
-    return json.dumps({"files": files})
+    try:
+        files = default_output_manifest().query(
+            kind=extension,
+            ticker=ticker,
+            tool=tool,
+            name_contains=name_contains,
+            modified_after=(
+                time.time() - modified_within_hours * 3600
+                if modified_within_hours
+                else None
+            ),
+            run_id=current_run_id(),
+            limit=limit,
+        )
+        return json.dumps({"files": files})
+    except Exception as e:
+        return json.dumps({"error": str(e)})
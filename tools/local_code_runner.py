@@ -0,0 +1,194 @@
+"""Pool of Python worker processes for the local code-execution backend.
+
+Each worker is a long-lived subprocess (``tools/local_code_worker.py``) that
+has already imported pandas, numpy, scipy, matplotlib and friends, so a job
+only pays for running its own code.  Workers run with a memory cap, a CPU-time
+budget per job and credential variables removed from their environment; a
+job that exceeds its wall-clock timeout has its worker killed and replaced.
+
+Jobs run in a scratch directory holding copies of their input files.  Files
+the code creates there are returned to the caller.
+
+This is not a sandbox.  Workers run as the current user with the same
+filesystem and network access, so a script can still read secrets on disk
+(such as ``.env``) and modify ``outputs/`` or ``.cache/``.  Only use the local
+backend with a model you trust, or run the app in a container or VM.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import select
+import shutil
+import subprocess
+import sys
+import threading
+import uuid
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = Path(__file__).resolve().parent / "local_code_worker.py"
+
+# Seconds a new worker may take to import its libraries
+STARTUP_TIMEOUT = 120
+
+
+def _worker_env() -> dict:
+    """Return the parent environment minus credential variables."""
+    secret_markers = ("KEY", "TOKEN", "SECRET", "PASSWORD")
+    env = {
+        k: v
+        for k, v in os.environ.items()
+        if not any(marker in k.upper() for marker in secret_markers)
+    }
+    env["MPLBACKEND"] = "Agg"
+    return env
+
+
+class LocalCodeTimeout(TimeoutError):
+    """Raised when a job exceeds its wall-clock timeout."""
+
+
+class _Worker:
+    def __init__(self, cwd: Path, memory_mb: int):
+        self.proc = subprocess.Popen(
+            [sys.executable, "-u", str(WORKER_SCRIPT), "--memory-mb", str(memory_mb)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            cwd=cwd,
+            env=_worker_env(),
+        )
+        self._read(STARTUP_TIMEOUT)
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def kill(self) -> None:
+        if self.alive():
+            self.proc.kill()
+        self.proc.wait()
+
+    def _read(self, timeout: float) -> dict:
+        ready, _, _ = select.select([self.proc.stdout], [], [], timeout)
+        if not ready:
+            self.kill()
+            raise LocalCodeTimeout(f"Code execution timed out after {timeout}s")
+        line = self.proc.stdout.readline()
+        if not line:
+            code = self.proc.wait()
+            raise RuntimeError(
+                f"Code execution worker exited with status {code} "
+                "(memory or CPU limit exceeded?)"
+            )
+        return json.loads(line)
+
+    def run(self, job: dict, timeout: float) -> dict:
+        self.proc.stdin.write(json.dumps(job) + "\n")
+        self.proc.stdin.flush()
+        return self._read(timeout)
+
+
+class LocalCodeRunner:
+    """Runs Python code on a bounded pool of pre-warmed worker processes."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        *,
+        workers: int = 2,
+        timeout: float = 120,
+        memory_mb: int = 4096,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        self._started = 0
+        self._lock = threading.Lock()
+
+    def _checkout(self) -> _Worker:
+        with self._lock:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                if self._started < self.workers:
+                    self._started += 1
+                    spawn = True
+                else:
+                    spawn = False
+        if not spawn:
+            return self._idle.get()
+        try:
+            return _Worker(self.root, self.memory_mb)
+        except BaseException:
+            with self._lock:
+                self._started -= 1
+            raise
+
+    def _checkin(self, worker: _Worker) -> None:
+        if worker.alive():
+            self._idle.put(worker)
+            return
+        with self._lock:
+            self._started -= 1
+
+    def warm(self) -> None:
+        """Start every worker now instead of on first use."""
+        spawned = [self._checkout() for _ in range(self.workers)]
+        for worker in spawned:
+            self._checkin(worker)
+
+    def run(self, code: str, input_paths: list[Path]) -> tuple[dict, Path]:
+        """Execute *code* with *input_paths* available by file name.
+
+        Returns ``(result, workdir)``; *result* has ``ok``, ``stdout``,
+        ``error`` and the names of ``files`` created in *workdir*.  The caller
+        removes *workdir* with ``cleanup`` once it has collected the files.
+        """
+        workdir = self.root / uuid.uuid4().hex
+        workdir.mkdir()
+        for path in input_paths:
+            # Copies, not links: scripts that rewrite their inputs leave outputs/ intact
+            shutil.copyfile(path, workdir / path.name)
+        try:
+            worker = self._checkout()
+            try:
+                result = worker.run(
+                    {
+                        "code": code,
+                        "workdir": str(workdir),
+                        "cpu_seconds": self.timeout,
+                    },
+                    self.timeout,
+                )
+            finally:
+                self._checkin(worker)
+        except BaseException:
+            self.cleanup(workdir)
+            raise
+        return result, workdir
+
+    @staticmethod
+    def cleanup(workdir: Path) -> None:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def default_local_runner() -> LocalCodeRunner:
+    """Return a runner configured from ``settings.py`` under the shared cache dir."""
+    from settings import LOCAL_CODE_MEMORY_MB, LOCAL_CODE_TIMEOUT, LOCAL_CODE_WORKERS
+    from utils import cache_dir
+
+    return LocalCodeRunner(
+        cache_dir() / "local_code",
+        workers=LOCAL_CODE_WORKERS,
+        timeout=LOCAL_CODE_TIMEOUT,
+        memory_mb=LOCAL_CODE_MEMORY_MB,
+    )
@@ -0,0 +1,115 @@
+"""Worker process for the local code-execution backend.
+
+Started by ``tools/local_code_runner.py``.  The worker imports the analysis
+stack once, then executes jobs read as JSON lines from stdin, one at a time,
+each in a fresh namespace with its job directory as the working directory.
+Results are written as JSON lines to the original stdout; anything the job
+code prints is captured and returned instead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import traceback
+
+try:
+    import resource
+except ImportError:  # pragma: no cover – not available on Windows
+    resource = None  # type: ignore
+
+# Libraries the generated code is expected to use; importing them up front is
+# what makes each job start in milliseconds.
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import scipy  # noqa: E402,F401
+import scipy.stats  # noqa: E402,F401
+
+for _optional in ("arch", "cvxpy", "seaborn", "statsmodels"):
+    try:
+        __import__(_optional)
+    except ImportError:
+        pass
+
+# Cap how much output a single job can return
+MAX_STDOUT_CHARS = 20000
+
+
+def _limit_memory(memory_mb: int) -> None:
+    if resource is None or memory_mb <= 0:
+        return
+    limit = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _limit_cpu(seconds: float) -> None:
+    """Allow the next job *seconds* of CPU time on top of what was used so far."""
+    if resource is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = usage.ru_utime + usage.ru_stime
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = int(used + seconds) + 1
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _run_job(job: dict) -> dict:
+    workdir = job["workdir"]
+    before = set(os.listdir(workdir))
+    buffer = io.StringIO()
+    namespace = {"__name__": "__main__", "pd": pd, "np": np, "plt": plt}
+    error = None
+    _limit_cpu(job.get("cpu_seconds", 60))
+    os.chdir(workdir)
+    try:
+        with contextlib.redirect_stdout(buffer), contextlib.redirect_stderr(buffer):
+            exec(compile(job["code"], "<analysis>", "exec"), namespace)
+    except BaseException:  # report everything, including SystemExit
+        error = traceback.format_exc(limit=5)
+    finally:
+        plt.close("all")
+        os.chdir(os.path.dirname(workdir))
+    stdout = buffer.getvalue()
+    if len(stdout) > MAX_STDOUT_CHARS:
+        stdout = stdout[:MAX_STDOUT_CHARS] + "\n... [output truncated]"
+    files = sorted(
+        name
+        for name in set(os.listdir(workdir)) - before
+        if os.path.isfile(os.path.join(workdir, name))
+    )
+    return {"ok": error is None, "stdout": stdout, "error": error, "files": files}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--memory-mb", type=int, default=0)
+    args = parser.parse_args()
+    _limit_memory(args.memory_mb)
+
+    # Keep the protocol channel private: job output must not corrupt it.
+    proto = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+
+    proto.write(json.dumps({"ready": True}) + "\n")
+    proto.flush()
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        result = _run_job(json.loads(line))
+        proto.write(json.dumps(result) + "\n")
+        proto.flush()
+
+
+if __name__ == "__main__":
+    main()
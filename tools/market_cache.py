@@ -0,0 +1,268 @@
+"""Persistent, TTL-aware cache for Yahoo Finance tool results.
+
+Entries are stored in a small SQLite database keyed by tool name plus the
+normalised call arguments.  Every entry carries a *data type* (quotes,
+statements, holders, ...) which determines how long it stays fresh.  The
+database is shared by every process that points at the same file, so the MCP
+servers spawned for different agents and runs all hit the same cache.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    tool TEXT NOT NULL,
+    data_type TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+CREATE TABLE IF NOT EXISTS stats (
+    tool TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def make_key(tool: str, **params) -> str:
+    """Return a stable cache key for *tool* called with *params*.
+
+    String values are stripped and ticker symbols upper-cased so that
+    ``"googl "`` and ``"GOOGL"`` share one entry.
+    """
+    normalised = {}
+    for name, value in params.items():
+        if isinstance(value, str):
+            value = value.strip()
+            if name == "ticker":
+                value = value.upper()
+        normalised[name] = value
+    return f"{tool}:{json.dumps(normalised, sort_keys=True, default=str)}"
+
+
+class MarketDataCache:
+    """SQLite-backed cache with per-data-type TTLs and size-bounded LRU eviction."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        ttls: dict[str, int],
+        default_ttl: int = 300,
+        max_bytes: int = 512 * 1024 * 1024,
+        enabled: bool = True,
+    ):
+        self.path = Path(path)
+        self.ttls = dict(ttls)
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._local = threading.local()
+        if self.enabled:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self._conn() as conn:
+                conn.executescript(_SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Connection handling (one connection per thread, WAL for concurrency)
+    # ------------------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def ttl_for(self, data_type: str) -> int:
+        return self.ttls.get(data_type, self.default_ttl)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, tool: str, **params) -> tuple[bool, Any]:
+        """Return ``(hit, value)`` for a fresh entry of *tool* / *params*."""
+        if not self.enabled:
+            return False, None
+        key = make_key(tool, **params)
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT payload, expires_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        hit = row is not None and row[1] > now
+        value = None
+        if hit:
+            try:
+                value = pickle.loads(row[0])
+            except Exception as e:  # corrupt or incompatible entry
+                logger.warning(f"Dropping unreadable cache entry {key}: {e}")
+                hit = False
+        with conn:
+            if hit:
+                conn.execute(
+                    "UPDATE entries SET last_access = ? WHERE key = ?", (now, key)
+                )
+            elif row is not None:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._record(conn, tool, hit)
+        return hit, value
+
+    def set(self, tool: str, data_type: str, value: Any, **params) -> None:
+        """Store *value* for *tool* / *params* using the TTL of *data_type*.
+
+        None and empty frames are not stored: yfinance returns them when it is
+        throttled or fails transiently, and they must not be served for a TTL.
+        """
+        if not self.enabled or value is None or getattr(value, "empty", False):
+            return
+        key = make_key(tool, **params)
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            return
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, tool, data_type, payload, size, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    tool,
+                    data_type,
+                    payload,
+                    len(payload),
+                    now,
+                    now + self.ttl_for(data_type),
+                    now,
+                ),
+            )
+            self._evict(conn, now)
+
+    def get_or_fetch(
+        self, tool: str, data_type: str, fetch: Callable[[], Any], **params
+    ) -> Any:
+        """Return the cached value for *tool* / *params* or call *fetch* and store it."""
+        hit, value = self.get(tool, **params)
+        if hit:
+            logger.info(f"Cache hit for {tool} {params}")
+            return value
+        value = fetch()
+        self.set(tool, data_type, value, **params)
+        return value
+
+    def invalidate(self, tool: str, **params) -> None:
+        if not self.enabled:
+            return
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "DELETE FROM entries WHERE key = ?", (make_key(tool, **params),)
+            )
+
+    def stats(self) -> dict:
+        """Return hit/miss counters per tool plus current size information."""
+        if not self.enabled:
+            return {"enabled": False}
+        conn = self._conn()
+        per_tool = {
+            tool: {"hits": hits, "misses": misses}
+            for tool, hits, misses in conn.execute(
+                "SELECT tool, hits, misses FROM stats ORDER BY tool"
+            )
+        }
+        entries, size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        hits = sum(s["hits"] for s in per_tool.values())
+        misses = sum(s["misses"] for s in per_tool.values())
+        return {
+            "enabled": True,
+            "path": str(self.path),
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            "tools": per_tool,
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _record(conn: sqlite3.Connection, tool: str, hit: bool) -> None:
+        column = "hits" if hit else "misses"
+        conn.execute(
+            f"INSERT INTO stats (tool, {column}) VALUES (?, 1) "
+            f"ON CONFLICT(tool) DO UPDATE SET {column} = {column} + 1",
+            (tool,),
+        )
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self.max_bytes:
+            return
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        # Trim least-recently-used entries down to 90% of the budget so that
+        # we do not evict again on every subsequent write.
+        target = int(self.max_bytes * 0.9)
+        if total <= target:
+            return
+        evicted = 0
+        for key, size in conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= target:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        logger.info(f"Evicted {evicted} market cache entries")
+
+
+def default_market_cache() -> MarketDataCache:
+    """Return a cache configured from ``settings.py`` under the shared cache dir."""
+    from settings import (
+        MARKET_CACHE_ENABLED,
+        MARKET_CACHE_MAX_MB,
+        MARKET_CACHE_TTLS,
+    )
+    from utils import cache_file
+
+    return MarketDataCache(
+        cache_file("market_data.sqlite"),
+        ttls=MARKET_CACHE_TTLS,
+        max_bytes=MARKET_CACHE_MAX_MB * 1024 * 1024,
+        enabled=MARKET_CACHE_ENABLED,
+    )
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    print(json.dumps(default_market_cache().stats(), indent=2))
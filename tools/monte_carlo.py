@@ -0,0 +1,88 @@
+"""Vectorized Monte Carlo simulation of correlated asset paths.
+
+Pure NumPy so that chunks can run in worker processes (see
+``tools/process_pool.py``).  Two return models are supported:
+
+* ``gbm`` – multivariate normal log returns with the historical mean vector
+  and covariance, correlated through a Cholesky factor;
+* ``bootstrap`` – historical return rows (all assets on the same date, so
+  cross-correlation is preserved) resampled in blocks of ``block_size`` days.
+
+Paths are generated in chunks of at most ``chunk_paths`` to bound memory.
+Every chunk draws from its own generator spawned from one ``SeedSequence``,
+so results for a given seed do not depend on how chunks are distributed.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class SimulationSpec:
+    model: str  # "gbm" or "bootstrap"
+    steps: int
+    weights: np.ndarray  # (assets,), sums to 1
+    mean: np.ndarray | None = None  # (assets,) per-step log-return mean (gbm)
+    chol: np.ndarray | None = None  # (assets, assets) Cholesky factor (gbm)
+    history: np.ndarray | None = None  # (days, assets) log returns (bootstrap)
+    block_size: int = 1
+    overlay: np.ndarray | None = None  # (assets,) per-step log-return shift
+
+
+def simulate_chunk(
+    spec: SimulationSpec, n_paths: int, seed: np.random.SeedSequence
+) -> tuple[np.ndarray, np.ndarray]:
+    """Simulate *n_paths* paths.
+
+    Returns ``(portfolio, terminal)``: buy-and-hold portfolio value per path
+    and step (starting from 1, shape ``(n_paths, steps)``) and each asset's
+    terminal gross return (shape ``(n_paths, assets)``).
+    """
+    rng = np.random.default_rng(seed)
+    n_assets = spec.weights.shape[0]
+    if spec.model == "gbm":
+        z = rng.standard_normal((n_paths, spec.steps, n_assets))
+        log_r = z @ spec.chol.T
+        log_r += spec.mean
+    elif spec.model == "bootstrap":
+        days = spec.history.shape[0]
+        block = max(1, min(spec.block_size, days))
+        n_blocks = -(-spec.steps // block)
+        starts = rng.integers(0, days - block + 1, size=(n_paths, n_blocks))
+        idx = (starts[:, :, None] + np.arange(block)).reshape(n_paths, -1)
+        log_r = spec.history[idx[:, : spec.steps]]
+    else:
+        raise ValueError(f"Unknown model: {spec.model}")
+    if spec.overlay is not None:
+        log_r += spec.overlay
+    growth = np.exp(np.cumsum(log_r, axis=1))
+    portfolio = growth @ spec.weights
+    return portfolio, growth[:, -1, :]
+
+
+def chunk_sizes(n_paths: int, chunk_paths: int) -> list[int]:
+    full, rest = divmod(n_paths, chunk_paths)
+    return [chunk_paths] * full + ([rest] if rest else [])
+
+
+def simulate(
+    spec: SimulationSpec,
+    n_paths: int,
+    *,
+    seed: int | None = None,
+    chunk_paths: int = 2000,
+    executor=None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Simulate *n_paths* paths in chunks, optionally on *executor* (a process pool)."""
+    sizes = chunk_sizes(n_paths, chunk_paths)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if executor is not None and len(sizes) > 1:
+        results = list(executor.map(simulate_chunk, [spec] * len(sizes), sizes, seeds))
+    else:
+        results = [simulate_chunk(spec, n, s) for n, s in zip(sizes, seeds)]
+    portfolio = np.concatenate([r[0] for r in results])
+    terminal = np.concatenate([r[1] for r in results])
+    return portfolio, terminal
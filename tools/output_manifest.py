@@ -0,0 +1,394 @@
+"""Index of the files in ``outputs/``.
+
+Every tool that writes to ``outputs/`` records the file here: its type,
+columns, row count, date range, tickers, the tool that produced it, a
+content hash and its mtime.  ``list_output_files`` answers queries from this
+index instead of listing and opening files, so agents can pick the right
+file in one call.
+
+The index is a SQLite database in the cache dir shared by every process (the
+Yahoo Finance MCP server writes to it too).  Files that appear in
+``outputs/`` without going through a writer (or that are changed or
+deleted behind its back) are reconciled by a periodic rescan.  Files of run
+workspaces (``outputs/runs/<run_id>/``) are indexed under their path relative
+to ``outputs/`` and only listed for their own run.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from tools import csv_reader, parquet_reader
+from tools.upload_cache import file_digest
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outputs (
+    name TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    tickers TEXT NOT NULL,
+    tool TEXT,
+    rows INTEGER,
+    columns TEXT,
+    start TEXT,
+    end TEXT,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outputs_mtime ON outputs (mtime_ns);
+"""
+
+_TICKER_TOKEN = re.compile(r"^[A-Z][A-Z0-9.\-=^]{0,9}$")
+
+# Columns listed per file; wide batch files can have hundreds
+MAX_COLUMNS = 40
+
+
+def _tickers_from_name(name: str) -> list[str]:
+    """Leading upper-case tokens of a file name (``GOOGL_SPY_..._x.csv``)."""
+    tickers = []
+    for token in Path(name).stem.split("_"):
+        if not _TICKER_TOKEN.match(token):
+            break
+        tickers.append(token)
+    return tickers
+
+
+def _date_bounds(first: str, last: str) -> tuple[str | None, str | None]:
+    dates = pd.to_datetime(pd.Series([first, last]), errors="coerce", format="mixed")
+    if dates.isna().any():
+        return None, None
+    lo, hi = sorted(dates)
+    return str(lo.date()), str(hi.date())
+
+
+def _count_lines(path: Path) -> int:
+    count = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            count += block.count(b"\n")
+    return count
+
+
+def describe(path: Path) -> dict:
+    """Schema, size and date range of an output file, read without parsing it whole."""
+    kind = path.suffix.lower().lstrip(".")
+    info = {"kind": kind, "rows": None, "columns": None, "start": None, "end": None}
+    tickers = _tickers_from_name(path.name)
+    try:
+        if kind == "csv":
+            header = csv_reader.read_header(path)
+            info["columns"] = header
+            info["rows"] = max(_count_lines(path) - 1, 0)
+            tickers += [c[: -len("_Close")] for c in header if c.endswith("_Close")]
+            if header and info["rows"]:
+                first = csv_reader.head(path, 1, header[:1]).iloc[0, 0]
+                last = csv_reader.tail(path, 1, header[:1]).iloc[0, 0]
+                info["start"], info["end"] = _date_bounds(str(first), str(last))
+        elif kind == "parquet":
+            pf = parquet_reader.parquet_file(path)
+            header = pf.schema_arrow.names
+            info["columns"] = header
+            info["rows"] = pf.metadata.num_rows
+            tickers += [c[: -len("_Close")] for c in header if c.endswith("_Close")]
+            if header and info["rows"]:
+                # Column statistics from the footer; no data pages are read
+                stats = [
+                    pf.metadata.row_group(i).column(0).statistics
+                    for i in range(pf.num_row_groups)
+                ]
+                if all(s is not None and s.has_min_max for s in stats):
+                    info["start"], info["end"] = _date_bounds(
+                        str(min(s.min for s in stats)), str(max(s.max for s in stats))
+                    )
+        elif kind == "json":
+            data = json.loads(path.read_text())
+            if isinstance(data, dict):
+                info["columns"] = list(data)
+            elif isinstance(data, list):
+                info["rows"] = len(data)
+                if data and isinstance(data[0], dict):
+                    info["columns"] = list(data[0])
+        elif kind in ("md", "txt"):
+            info["rows"] = _count_lines(path)
+    except Exception as e:  # a malformed file is still listed
+        logger.debug("Could not describe %s: %s", path, e)
+    info["tickers"] = list(dict.fromkeys(tickers))
+    return info
+
+
+def describe_table(name: str, table) -> dict:
+    """Like :func:`describe`, for an Arrow table registered under output *name*."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    header = table.schema.names
+    info = {
+        "kind": Path(name).suffix.lower().lstrip("."),
+        "rows": table.num_rows,
+        "columns": header,
+        "start": None,
+        "end": None,
+    }
+    tickers = _tickers_from_name(name)
+    tickers += [c[: -len("_Close")] for c in header if c.endswith("_Close")]
+    if header and table.num_rows and pa.types.is_timestamp(table.schema.types[0]):
+        bounds = pc.min_max(table.column(0)).as_py()
+        info["start"], info["end"] = _date_bounds(
+            str(bounds["min"]), str(bounds["max"])
+        )
+    info["tickers"] = list(dict.fromkeys(tickers))
+    return info
+
+
+class OutputManifest:
+    """SQLite index of the files in an outputs directory."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        root: str | Path,
+        *,
+        rescan_after: int = 60,
+        is_dataset=None,
+    ):
+        self.path = Path(path)
+        self.root = Path(root)
+        self.rescan_after = rescan_after
+        # Names without a file that are still valid (registered datasets)
+        self.is_dataset = is_dataset or (lambda name: False)
+        self._local = threading.local()
+        self._scanned_at = 0.0
+        self._scan_lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _insert(self, name, info, tool, tickers, digest, stat) -> None:
+        names = list(dict.fromkeys([*(tickers or []), *info["tickers"]]))
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO outputs (name, kind, tickers, tool, rows, "
+                "columns, start, end, digest, size, mtime_ns, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    name,
+                    info["kind"],
+                    # Delimited on both sides so a ticker matches exactly
+                    f",{','.join(names)}," if names else "",
+                    tool,
+                    info["rows"],
+                    json.dumps(info["columns"]) if info["columns"] else None,
+                    info["start"],
+                    info["end"],
+                    digest,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    time.time(),
+                ),
+            )
+
+    def record(
+        self, path: str | Path, tool: str | None, tickers: list[str] | None = None
+    ) -> None:
+        """Index *path* (a file in the outputs directory) as produced by *tool*."""
+        path = Path(path)
+        stat = path.stat()
+        self._insert(
+            path.relative_to(self.root).as_posix(),
+            describe(path),
+            tool,
+            tickers,
+            file_digest(path),
+            stat,
+        )
+
+    def record_table(self, name, table, tool, tickers, digest, stat) -> None:
+        """Index the registered dataset *name* (see :mod:`tools.dataset_registry`),
+        which has no file in the outputs directory until it is materialized."""
+        self._insert(name, describe_table(name, table), tool, tickers, digest, stat)
+
+    def _files(self):
+        """Shared files at the top level and the files of every run workspace."""
+        from utils import RUNS_DIR
+
+        folders = [self.root]
+        runs = self.root / RUNS_DIR
+        if runs.is_dir():
+            folders += [d for d in runs.iterdir() if d.is_dir()]
+        for folder in folders:
+            for entry in folder.iterdir():
+                if (
+                    entry.is_file()
+                    and not entry.name.startswith(".")
+                    and entry.suffix != ".tmp"
+                ):
+                    yield entry.relative_to(self.root).as_posix(), entry
+
+    def sync(self) -> None:
+        """Reconcile the index with the directory: add, refresh and drop entries."""
+        known = {
+            row["name"]: (row["size"], row["mtime_ns"], row["tool"])
+            for row in self._conn().execute(
+                "SELECT name, size, mtime_ns, tool FROM outputs"
+            )
+        }
+        seen = set()
+        for name, entry in self._files():
+            seen.add(name)
+            try:
+                stat = entry.stat()
+                if name in known and known[name][:2] == (
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                ):
+                    continue
+                self.record(entry, known.get(name, (None, None, None))[2])
+            except OSError:
+                continue  # removed while scanning
+        gone = [
+            (name,)
+            for name in known
+            if name not in seen
+            and not (self.root / name).exists()
+            and not self.is_dataset(name)
+        ]
+        if gone:
+            conn = self._conn()
+            with conn:
+                conn.executemany("DELETE FROM outputs WHERE name = ?", gone)
+
+    def _maybe_sync(self) -> None:
+        with self._scan_lock:
+            if time.monotonic() - self._scanned_at < self.rescan_after:
+                return
+            self.sync()
+            self._scanned_at = time.monotonic()
+
+    def query(
+        self,
+        *,
+        kind: str | None = None,
+        ticker: str | None = None,
+        tool: str | None = None,
+        name_contains: str | None = None,
+        modified_after: float | None = None,
+        run_id: str | None = None,
+        limit: int = 200,
+    ) -> list[dict]:
+        """Matching entries, most recently modified first.
+
+        Shared files are always included; files of a run workspace only for
+        *run_id*, where they shadow shared files of the same name.
+        """
+        from utils import RUNS_DIR
+
+        self._maybe_sync()
+        # Shared files live at the top level, run files under runs/<run_id>/
+        clauses, args = ["instr(name, '/') = 0"], []
+        plain, plain_args = "name", []
+        if run_id:
+            prefix = f"{RUNS_DIR}/{run_id}/"
+            clauses = [
+                "((instr(name, '/') = 0 AND NOT EXISTS (SELECT 1 FROM outputs o "
+                "WHERE o.name = ? || outputs.name)) OR substr(name, 1, ?) = ?)"
+            ]
+            args = [prefix, len(prefix), prefix]
+            plain = "CASE WHEN instr(name, '/') = 0 THEN name ELSE substr(name, ?) END"
+            plain_args = [len(prefix) + 1]
+        if kind:
+            clauses.append("kind = ?")
+            args.append(kind.lower().lstrip("."))
+        if ticker:
+            clauses.append("tickers LIKE ?")
+            args.append(f"%,{ticker.upper()},%")
+        if tool:
+            clauses.append("tool = ?")
+            args.append(tool)
+        if name_contains:
+            # Match on the plain name, not the run workspace prefix
+            clauses.append(f"instr(lower({plain}), ?) > 0")
+            args += [*plain_args, name_contains.lower()]
+        if modified_after:
+            clauses.append("mtime_ns >= ?")
+            args.append(int(modified_after * 1e9))
+        where = " AND ".join(clauses)
+        rows = self._conn().execute(
+            f"SELECT * FROM outputs WHERE {where} ORDER BY mtime_ns DESC LIMIT ?",
+            (*args, limit),
+        )
+        return [self._entry(row) for row in rows]
+
+    @staticmethod
+    def _entry(row: sqlite3.Row) -> dict:
+        columns = json.loads(row["columns"]) if row["columns"] else None
+        entry = {
+            # Agents address run files by their plain name
+            "name": row["name"].rsplit("/", 1)[-1],
+            "type": row["kind"],
+            "tickers": [t for t in row["tickers"].split(",") if t],
+            "tool": row["tool"],
+            "rows": row["rows"],
+            "columns": columns[:MAX_COLUMNS] if columns else None,
+            "start": row["start"],
+            "end": row["end"],
+            "size": row["size"],
+            "modified": time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.localtime(row["mtime_ns"] / 1e9)
+            ),
+            "sha256": row["digest"][:16],
+        }
+        if columns and len(columns) > MAX_COLUMNS:
+            entry["column_count"] = len(columns)
+        return {k: v for k, v in entry.items() if v not in (None, [])}
+
+
+@functools.lru_cache(maxsize=None)
+def default_output_manifest() -> OutputManifest:
+    """Return the process-wide manifest of ``outputs/`` under the shared cache dir."""
+    from settings import DATASET_REGISTRY, OUTPUT_MANIFEST_RESCAN
+    from utils import cache_file, outputs_dir
+
+    is_dataset = None
+    if DATASET_REGISTRY:
+        from tools.dataset_registry import default_dataset_registry
+
+        is_dataset = default_dataset_registry().has
+    return OutputManifest(
+        cache_file("output_manifest.sqlite"),
+        outputs_dir(),
+        rescan_after=OUTPUT_MANIFEST_RESCAN,
+        is_dataset=is_dataset,
+    )
+
+
+def record_output(
+    path: str | Path, tool: str | None, tickers: list[str] | None = None
+) -> None:
+    """Record a file just written to ``outputs/``; indexing never fails the writer."""
+    try:
+        default_output_manifest().record(path, tool, tickers)
+    except Exception as e:
+        logger.warning("Could not index output %s: %s", path, e)
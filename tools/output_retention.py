@@ -0,0 +1,188 @@
+"""Retention policy for ``outputs/``.
+
+Run workspaces (``outputs/runs/<run_id>/``) and the files of the shared store
+are collected as units: those not used for longer than the maximum age are
+deleted first, then the least recently used ones until the directory is
+back under its size budget.  A unit counts as used when it was written or
+read (access times are bumped explicitly on read-through and on no-op
+writes, see :func:`utils.find_output` and :mod:`tools.blob_store`).  Nothing
+used within the minimum age is removed, which protects runs in progress in
+this or any other process.
+
+Collection runs on a daemon thread, at most once per interval per process.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from tools import blob_store
+
+logger = logging.getLogger(__name__)
+
+# Write-then-rename leftovers of crashed writers
+_TEMP_SUFFIXES = (".tmp", ".part")
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    max_age: float  # seconds since last use; 0 for no age limit
+    max_bytes: int  # 0 for no size budget
+    min_age: float  # seconds; units used more recently are always kept
+
+
+@dataclass
+class _Unit:
+    path: Path
+    last_used: float
+    size: int
+
+
+def _is_temp(path: Path) -> bool:
+    return path.suffix in _TEMP_SUFFIXES
+
+
+def _last_used(stat: os.stat_result) -> float:
+    return max(stat.st_atime, stat.st_mtime)
+
+
+def _units(root: Path, runs: Path, seen: set) -> list[_Unit]:
+    """Shared files and run workspaces, sizing each hard-linked inode once."""
+
+    def size(stat: os.stat_result) -> int:
+        key = (stat.st_dev, stat.st_ino)
+        if key in seen:
+            return 0
+        seen.add(key)
+        return stat.st_size
+
+    units = []
+    for entry in root.iterdir():
+        if entry.name.startswith(".") or _is_temp(entry) or not entry.is_file():
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        units.append(_Unit(entry, _last_used(stat), size(stat)))
+    if runs.is_dir():
+        for workspace in runs.iterdir():
+            if not workspace.is_dir():
+                continue
+            unit = _Unit(workspace, _last_used(workspace.stat()), 0)
+            for dirpath, _, files in os.walk(workspace):
+                for name in files:
+                    try:
+                        stat = os.stat(os.path.join(dirpath, name))
+                    except FileNotFoundError:
+                        continue  # written with rename-over or removed meanwhile
+                    unit.last_used = max(unit.last_used, _last_used(stat))
+                    unit.size += size(stat)
+            units.append(unit)
+    return units
+
+
+def _remove(unit: _Unit) -> None:
+    if unit.path.is_dir():
+        shutil.rmtree(unit.path, ignore_errors=True)
+    else:
+        unit.path.unlink(missing_ok=True)
+
+
+def collect(root: str | Path, policy: RetentionPolicy) -> dict:
+    """Apply *policy* to the outputs directory *root* and report what was freed."""
+    from utils import RUNS_DIR
+
+    root = Path(root)
+    now = time.time()
+    removed, freed = [], 0
+    for entry in root.iterdir():
+        try:
+            if _is_temp(entry) and now - entry.stat().st_mtime > policy.min_age:
+                entry.unlink()
+        except FileNotFoundError:
+            pass
+
+    units = sorted(
+        _units(root, root / RUNS_DIR, set()), key=lambda unit: unit.last_used
+    )
+    total = sum(unit.size for unit in units)
+    for unit in units:
+        age = now - unit.last_used
+        if age <= policy.min_age:
+            break  # sorted by last use: everything after is newer
+        expired = policy.max_age and age > policy.max_age
+        if expired or (policy.max_bytes and total > policy.max_bytes):
+            try:
+                _remove(unit)
+            except OSError as e:
+                logger.warning("Could not remove %s: %s", unit.path, e)
+                continue
+            removed.append(unit.path.relative_to(root).as_posix())
+            freed += unit.size
+            total -= unit.size
+    blob_store.prune(root)
+    return {"removed": removed, "bytes_freed": freed, "bytes_kept": total}
+
+
+_last_collection = 0.0
+_collection_lock = threading.Lock()
+
+
+def schedule_collection() -> None:
+    """Collect ``outputs/`` on a daemon thread unless that ran recently here."""
+    global _last_collection
+    from settings import (
+        OUTPUT_RETENTION_DAYS,
+        OUTPUT_RETENTION_INTERVAL,
+        OUTPUT_RETENTION_MAX_MB,
+        OUTPUT_RETENTION_MIN_AGE,
+    )
+
+    with _collection_lock:
+        now = time.monotonic()
+        if _last_collection and now - _last_collection < OUTPUT_RETENTION_INTERVAL:
+            return
+        _last_collection = now
+    policy = RetentionPolicy(
+        max_age=OUTPUT_RETENTION_DAYS * 86400,
+        max_bytes=OUTPUT_RETENTION_MAX_MB * 1024 * 1024,
+        min_age=OUTPUT_RETENTION_MIN_AGE,
+    )
+    threading.Thread(
+        target=_collect_in_background,
+        args=(policy,),
+        name="output-retention",
+        daemon=True,
+    ).start()
+
+
+def _collect_in_background(policy: RetentionPolicy) -> None:
+    from settings import DATASET_REGISTRY
+    from tools.output_manifest import default_output_manifest
+    from utils import outputs_dir
+
+    try:
+        result = collect(outputs_dir(), policy)
+        datasets = 0
+        if DATASET_REGISTRY and policy.max_age:
+            from tools.dataset_registry import default_dataset_registry
+
+            # Registered tables live in the cache dir and follow the age limit
+            datasets = default_dataset_registry().prune(policy.max_age)
+        if result["removed"] or datasets:
+            logger.info(
+                "Removed %d old outputs (%d bytes) and %d datasets",
+                len(result["removed"]),
+                result["bytes_freed"],
+                datasets,
+            )
+            default_output_manifest().sync()
+    except Exception as e:
+        logger.warning("Output retention failed: %s", e)
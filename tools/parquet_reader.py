@@ -0,0 +1,181 @@
+"""Memory-mapped access to Parquet outputs, mirroring :mod:`tools.csv_reader`.
+
+With ``OUTPUT_TABLE_FORMAT=parquet`` the Yahoo Finance tools write typed
+columnar files.  They are read memory-mapped, one row group or column at a
+time, so previews touch only the pages they return and nothing is parsed
+from text.  :func:`export_csv` converts a file for consumers that need CSV
+(the hosted Code Interpreter); exports are cached by content hash.
+
+Requires ``pyarrow``.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from tools.csv_reader import check_columns, parse_conditions
+from tools.upload_cache import file_digest
+
+
+def parquet_file(path: Path):
+    import pyarrow.parquet as pq
+
+    return pq.ParquetFile(path, memory_map=True)
+
+
+def read_header(path: Path) -> list[str]:
+    return list(parquet_file(path).schema_arrow.names)
+
+
+def read_schema(path: Path) -> dict[str, str]:
+    """Column name to Arrow type, from the file footer."""
+    schema = parquet_file(path).schema_arrow
+    return {field.name: str(field.type) for field in schema}
+
+
+def _to_pandas(table) -> pd.DataFrame:
+    return table.to_pandas().reset_index(drop=True)
+
+
+def _empty(pf, columns: list[str] | None) -> pd.DataFrame:
+    table = pf.schema_arrow.empty_table()
+    return _to_pandas(table.select(columns) if columns else table)
+
+
+def head(path: Path, n: int, columns: list[str] | None = None, start: int = 0):
+    """Rows ``start`` to ``start + n`` (0-based), reading only the row groups needed."""
+    import pyarrow as pa
+
+    pf = parquet_file(path)
+    check_columns(pf.schema_arrow.names, columns)
+    parts, offset, first = [], 0, None
+    for i in range(pf.num_row_groups):
+        size = pf.metadata.row_group(i).num_rows
+        if offset + size > start:
+            first = offset if first is None else first
+            parts.append(pf.read_row_group(i, columns=columns))
+            if offset + size >= start + n:
+                break
+        offset += size
+    if not parts:
+        return _empty(pf, columns)
+    return _to_pandas(pa.concat_tables(parts).slice(start - first, n))
+
+
+def tail(path: Path, n: int, columns: list[str] | None = None) -> pd.DataFrame:
+    import pyarrow as pa
+
+    pf = parquet_file(path)
+    check_columns(pf.schema_arrow.names, columns)
+    parts, rows = [], 0
+    for i in reversed(range(pf.num_row_groups)):
+        parts.insert(0, pf.read_row_group(i, columns=columns))
+        rows += parts[0].num_rows
+        if rows >= n:
+            break
+    if not parts:
+        return _empty(pf, columns)
+    table = pa.concat_tables(parts)
+    return _to_pandas(table.slice(max(table.num_rows - n, 0)))
+
+
+def filter_expression(schema, conditions):
+    """Combine ``(column, op, value)`` triples into a pyarrow filter expression."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    ops = {
+        ">=": lambda f, v: f >= v,
+        "<=": lambda f, v: f <= v,
+        "!=": lambda f, v: f != v,
+        "==": lambda f, v: f == v,
+        "=": lambda f, v: f == v,
+        ">": lambda f, v: f > v,
+        "<": lambda f, v: f < v,
+    }
+    expr = None
+    for column, op, value in conditions:
+        kind = schema.field(column).type
+        if pa.types.is_integer(kind) or pa.types.is_floating(kind):
+            target = pa.scalar(float(value)).cast(kind, safe=False)
+        elif pa.types.is_timestamp(kind) or pa.types.is_date(kind):
+            target = pa.scalar(pd.Timestamp(value), type=pa.timestamp("ns"))
+            target = target.cast(kind, safe=False)
+        else:
+            target = pa.scalar(value).cast(kind)
+        term = ops[op](pc.field(column), target)
+        expr = term if expr is None else expr & term
+    return expr
+
+
+def select(
+    path: Path,
+    where: str,
+    n: int,
+    columns: list[str] | None = None,
+    from_end: bool = False,
+) -> tuple[pd.DataFrame, int]:
+    """First (or last) *n* rows matching *where*, and the total number of matches."""
+    import pyarrow.parquet as pq
+
+    pf = parquet_file(path)
+    header = pf.schema_arrow.names
+    conditions = parse_conditions(where)
+    check_columns(header, (columns or []) + [c for c, _, _ in conditions])
+    table = pq.read_table(
+        path,
+        columns=columns,
+        filters=filter_expression(pf.schema_arrow, conditions),
+        memory_map=True,
+    )
+    matched = table.num_rows
+    table = table.slice(max(matched - n, 0)) if from_end else table.slice(0, n)
+    return _to_pandas(table), matched
+
+
+def column_summary(values) -> dict:
+    """Count, missing values, range and (numeric columns) mean and std of an Arrow column."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    entry = {"count": len(values) - values.null_count, "missing": values.null_count}
+    if not entry["count"]:
+        return {**entry, "min": None, "max": None}
+    kind = values.type
+    if pa.types.is_integer(kind) or pa.types.is_floating(kind):
+        std = pc.stddev(values, ddof=1).as_py() if entry["count"] > 1 else 0
+        entry.update(mean=round(pc.mean(values).as_py(), 6), std=round(std or 0.0, 6))
+    bounds = pc.min_max(values).as_py()
+    return {**entry, "min": bounds["min"], "max": bounds["max"]}
+
+
+def summarize(path: Path, columns: list[str] | None = None) -> dict:
+    """Per-column statistics, computed column by column on the mapped file."""
+    pf = parquet_file(path)
+    check_columns(pf.schema_arrow.names, columns)
+    out = {
+        name: column_summary(pf.read(columns=[name]).column(0))
+        for name in columns or pf.schema_arrow.names
+    }
+    return {"rows": pf.metadata.num_rows, "columns": out}
+
+
+def read_frame(path: Path) -> pd.DataFrame:
+    """The whole file as a DataFrame, decoded from the memory-mapped pages."""
+    return pd.read_parquet(path, memory_map=True)
+
+
+def export_csv(path: Path) -> Path:
+    """A CSV copy of *path* under the cache dir, written once per file content."""
+    from utils import cache_file
+
+    path = Path(path)
+    target = cache_file(f"csv_exports/{file_digest(path)[:32]}/{path.stem}.csv")
+    if not target.exists():
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.part")
+        read_frame(path).to_csv(tmp, index=False)
+        os.replace(tmp, target)
+    return target
@@ -0,0 +1,382 @@
+"""Portfolio optimization over price files in outputs/ with cvxpy.
+
+Mean-variance problems are built once per shape and constraint set with the
+expected returns, a covariance factor and the risk aversion as cvxpy
+``Parameter``s.  The compiled problem is cached, so new data or a sweep along
+the efficient frontier only updates parameter values and re-solves warm
+instead of recompiling.  Covariances are shrunk towards a scaled identity
+(Ledoit-Wolf) by default, which keeps weights stable with many assets and
+short histories.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import List
+
+import cvxpy as cp
+import numpy as np
+import pandas as pd
+from agents import function_tool
+from tools.quant_analytics import load_price_frame, save_analysis_csv, simple_returns
+from utils import compact_stem
+
+OBJECTIVES = ("max_sharpe", "min_variance", "mean_variance", "min_cvar", "risk_parity")
+
+# Weights below this (solver noise) are set to zero
+WEIGHT_TOLERANCE = 1e-4
+
+
+# ---------------------------------------------------------------------------
+# Estimation
+# ---------------------------------------------------------------------------
+
+
+def ledoit_wolf(returns: np.ndarray) -> tuple[np.ndarray, float]:
+    """Ledoit-Wolf shrinkage of the sample covariance towards a scaled identity.
+
+    Returns ``(covariance, shrinkage)`` where *shrinkage* is the weight given to
+    the identity target.
+    """
+    t, n = returns.shape
+    x = returns - returns.mean(axis=0)
+    sample = x.T @ x / t
+    mu = np.trace(sample) / n
+    target = mu * np.eye(n)
+    delta = np.sum((sample - target) ** 2)
+    x2 = x**2
+    beta = (np.sum(x2.T @ x2) / t - np.sum(sample**2)) / t
+    shrinkage = 0.0 if delta == 0 else min(beta, delta) / delta
+    return shrinkage * target + (1 - shrinkage) * sample, float(shrinkage)
+
+
+def covariance_factor(cov: np.ndarray) -> np.ndarray:
+    """Lower Cholesky factor of *cov*, jittered when it is only semi-definite."""
+    jitter = 0.0
+    scale = np.trace(cov) / cov.shape[0]
+    while True:
+        try:
+            return np.linalg.cholesky(cov + jitter * np.eye(cov.shape[0]))
+        except np.linalg.LinAlgError:
+            jitter = max(jitter * 10, scale * 1e-10)
+
+
+# ---------------------------------------------------------------------------
+# Cached problems
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class _MeanVariance:
+    """max mu'w - gamma/2 w'Σw with Σ = LL' over the fully invested set.
+
+    Solved in the equivalent form max (mu/gamma)'w - ½|L'w|² so that every
+    parameter enters affinely (DPP) and re-solves skip recompilation.
+    """
+
+    problem: cp.Problem
+    weights: cp.Variable
+    scaled_mu: cp.Parameter
+    factor: cp.Parameter
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def solve(self, mu: np.ndarray, gamma: float) -> np.ndarray:
+        self.scaled_mu.value = mu / gamma
+        self.problem.solve(warm_start=True)
+        if self.weights.value is None:
+            raise RuntimeError(f"Optimization failed: {self.problem.status}")
+        return self.weights.value.copy()
+
+
+def _weight_constraints(w: cp.Variable, long_only: bool, max_weight: float) -> list:
+    constraints = [cp.sum(w) == 1]
+    if long_only:
+        constraints.append(w >= 0)
+    if max_weight < 1:
+        constraints.append(cp.abs(w) <= max_weight)
+    return constraints
+
+
+@functools.lru_cache(maxsize=16)
+def _mean_variance_problem(
+    n_assets: int, long_only: bool, max_weight: float
+) -> _MeanVariance:
+    w = cp.Variable(n_assets)
+    scaled_mu = cp.Parameter(n_assets)
+    factor = cp.Parameter((n_assets, n_assets))
+    problem = cp.Problem(
+        cp.Maximize(scaled_mu @ w - cp.sum_squares(factor.T @ w) / 2),
+        _weight_constraints(w, long_only, max_weight),
+    )
+    return _MeanVariance(problem, w, scaled_mu, factor)
+
+
+@functools.lru_cache(maxsize=8)
+def _min_cvar_problem(
+    n_obs: int, n_assets: int, long_only: bool, max_weight: float, confidence: float
+) -> tuple[cp.Problem, cp.Variable, cp.Parameter, threading.Lock]:
+    """Rockafellar-Uryasev linear program over historical return scenarios."""
+    w = cp.Variable(n_assets)
+    var = cp.Variable()
+    excess = cp.Variable(n_obs, nonneg=True)
+    scenarios = cp.Parameter((n_obs, n_assets))
+    problem = cp.Problem(
+        cp.Minimize(var + cp.sum(excess) / ((1 - confidence) * n_obs)),
+        [excess >= -scenarios @ w - var]
+        + _weight_constraints(w, long_only, max_weight),
+    )
+    return problem, w, scenarios, threading.Lock()
+
+
+@functools.lru_cache(maxsize=16)
+def _max_sharpe_problem(
+    n_assets: int, long_only: bool, max_weight: float
+) -> tuple[cp.Problem, cp.Variable, cp.Parameter, cp.Parameter, threading.Lock]:
+    """Tangency portfolio as a QP in y = κw (κ ≥ 0).
+
+    min |L'y|² s.t. (mu - rf)'y = 1 and the weight constraints scaled by
+    κ = sum(y); the optimal weights are y / sum(y).
+    """
+    y = cp.Variable(n_assets)
+    kappa = cp.Variable(nonneg=True)
+    excess = cp.Parameter(n_assets)
+    factor = cp.Parameter((n_assets, n_assets))
+    constraints = [excess @ y == 1, cp.sum(y) == kappa]
+    if long_only:
+        constraints.append(y >= 0)
+    if max_weight < 1:
+        constraints.append(cp.abs(y) <= max_weight * kappa)
+    problem = cp.Problem(cp.Minimize(cp.sum_squares(factor.T @ y)), constraints)
+    return problem, y, excess, factor, threading.Lock()
+
+
+def max_sharpe(
+    excess: np.ndarray, factor: np.ndarray, long_only: bool, max_weight: float
+) -> np.ndarray | None:
+    """Weights with the highest Sharpe ratio given excess returns *excess*.
+
+    Returns None when no admissible portfolio has a positive excess return
+    (the problem is then infeasible or unbounded).
+    """
+    problem, y, excess_param, factor_param, lock = _max_sharpe_problem(
+        len(excess), long_only, max_weight
+    )
+    with lock:
+        excess_param.value = excess
+        factor_param.value = factor
+        problem.solve(warm_start=True)
+        if y.value is None:
+            return None
+        y = y.value.copy()
+    if y.sum() <= WEIGHT_TOLERANCE * np.abs(y).sum():
+        return None
+    return y / y.sum()
+
+
+def risk_parity(factor: np.ndarray) -> np.ndarray:
+    """Long-only weights with equal risk contributions.
+
+    Solves the convex problem min ½y'Σy - Σ log(y)/n and normalizes y.
+    """
+    n = factor.shape[0]
+    y = cp.Variable(n, pos=True)
+    cp.Problem(
+        cp.Minimize(cp.sum_squares(factor.T @ y) / 2 - cp.sum(cp.log(y)) / n)
+    ).solve()
+    if y.value is None:
+        raise RuntimeError("Risk parity optimization failed")
+    return y.value / y.value.sum()
+
+
+# ---------------------------------------------------------------------------
+# Agent tool
+# ---------------------------------------------------------------------------
+
+
+def _portfolio_stats(
+    w: np.ndarray, mu: np.ndarray, cov: np.ndarray, risk_free_rate: float
+) -> dict:
+    ret = float(mu @ w)
+    vol = float(np.sqrt(max(w @ cov @ w, 0.0)))
+    return {
+        "expected_return": round(ret, 6),
+        "volatility": round(vol, 6),
+        "sharpe": round((ret - risk_free_rate) / vol, 6) if vol > 0 else None,
+    }
+
+
+def _clean(w: np.ndarray) -> np.ndarray:
+    w = np.where(np.abs(w) < WEIGHT_TOLERANCE, 0.0, w)
+    return w / w.sum()
+
+
+@function_tool
+def optimize_portfolio(
+    files: List[str],
+    objective: str = "max_sharpe",
+    risk_aversion: float = 5.0,
+    long_only: bool = True,
+    max_weight: float = 1.0,
+    shrinkage: bool = True,
+    risk_free_rate: float = 0.0,
+    frontier_points: int = 25,
+    cvar_confidence: float = 0.95,
+    periods_per_year: int = 252,
+) -> str:
+    """Computes optimal portfolio weights and the efficient frontier for the tickers in the files.
+
+    Args:
+        files: Price files in outputs/ (single-ticker histories or batch price files).
+        objective: "max_sharpe" (tangency portfolio: highest Sharpe ratio under the
+            weight constraints),
+            "min_variance", "mean_variance" (maximize return - risk_aversion/2 * variance),
+            "min_cvar" (minimize historical conditional value-at-risk) or
+            "risk_parity" (equal risk contribution, long-only).
+        risk_aversion: Risk aversion for "mean_variance".
+        long_only: Disallow short positions.
+        max_weight: Largest absolute weight per asset (1.0 for no limit).
+        shrinkage: Shrink the covariance matrix (Ledoit-Wolf); recommended for many assets.
+        risk_free_rate: Annual risk-free rate as a decimal, for Sharpe ratios.
+        frontier_points: Points on the efficient frontier written to CSV (0 to skip).
+        cvar_confidence: Confidence level for "min_cvar" (e.g. 0.95).
+        periods_per_year: Bars per year used to annualize (252 for daily data).
+
+    Returns:
+        str: JSON with the weights, annualized expected return, volatility, Sharpe
+        ratio and risk contributions of the optimal portfolio, plus the names of
+        CSVs holding the weights and the efficient frontier.
+    """
+    try:
+        objective = objective.strip().lower()
+        if objective not in OBJECTIVES:
+            return json.dumps({"error": f"objective must be one of {list(OBJECTIVES)}"})
+        if not 0 <= frontier_points <= 200 or not 0.5 <= cvar_confidence < 1:
+            return json.dumps(
+                {
+                    "error": "frontier_points must be 0-200 and cvar_confidence in [0.5, 1)"
+                }
+            )
+
+        prices = load_price_frame(files)
+        tickers = list(prices.columns)
+        rets = simple_returns(prices.to_numpy())[1:]
+        rets = rets[~np.isnan(rets).any(axis=1)]
+        n = len(tickers)
+        if rets.shape[0] < max(30, n // 2):
+            return json.dumps(
+                {
+                    "error": "Too few overlapping returns for the number of assets",
+                    "observations": int(rets.shape[0]),
+                    "tickers": tickers,
+                }
+            )
+        if max_weight * n < 1 - 1e-9:
+            return json.dumps(
+                {"error": f"max_weight {max_weight} cannot fully invest {n} assets"}
+            )
+        max_weight = float(min(max_weight, 1.0))
+
+        mu = rets.mean(axis=0) * periods_per_year
+        if shrinkage:
+            cov, shrink = ledoit_wolf(rets)
+        else:
+            cov, shrink = np.atleast_2d(np.cov(rets, rowvar=False, ddof=1)), 0.0
+        cov = cov * periods_per_year
+        factor = covariance_factor(cov)
+
+        mv = _mean_variance_problem(n, long_only, max_weight)
+        frontier = []
+        cvar = None
+        w = None
+        if objective == "max_sharpe":
+            w = max_sharpe(mu - risk_free_rate, factor, long_only, max_weight)
+        with mv.lock:
+            mv.factor.value = factor
+            if frontier_points or (objective == "max_sharpe" and w is None):
+                # Sweep from near-minimum variance to near-maximum return,
+                # re-solving the same compiled problem warm
+                for gamma in np.logspace(3, -1, max(frontier_points, 50)):
+                    frontier.append(_clean(mv.solve(mu, gamma)))
+            if objective == "min_variance":
+                # Zero expected returns turn the objective into pure variance
+                w = mv.solve(np.zeros(n), 1.0)
+            elif objective == "mean_variance":
+                w = mv.solve(mu, risk_aversion)
+        if objective == "max_sharpe" and w is None:
+            # Nothing beats the risk-free rate: take the least bad frontier point
+            w = max(
+                frontier,
+                key=lambda x: _portfolio_stats(x, mu, cov, risk_free_rate)["sharpe"]
+                or -np.inf,
+            )
+        elif objective == "min_cvar":
+            problem, cw, scenarios, lock = _min_cvar_problem(
+                rets.shape[0], n, long_only, max_weight, cvar_confidence
+            )
+            with lock:
+                scenarios.value = rets
+                problem.solve(warm_start=True)
+                if cw.value is None:
+                    raise RuntimeError(f"Optimization failed: {problem.status}")
+                w = cw.value.copy()
+                cvar = float(problem.value)
+        elif objective == "risk_parity":
+            w = risk_parity(factor)
+        w = _clean(w)
+
+        contrib = w * (cov @ w)
+        contrib = contrib / contrib.sum()
+        stem = compact_stem(tickers)
+        weights_df = pd.DataFrame(
+            {"Weight": w, "RiskContribution": contrib, "ExpectedReturn": mu},
+            index=pd.Index(tickers, name="Ticker"),
+        )
+        weights_file = save_analysis_csv(
+            weights_df, f"{stem}_{objective}_weights.csv", tool="optimize_portfolio"
+        )
+
+        frontier_file = None
+        if frontier_points:
+            # Keep an evenly spaced subset of the sweep, dropping repeated corners
+            idx = np.unique(
+                np.linspace(0, len(frontier) - 1, frontier_points).round().astype(int)
+            )
+            rows = []
+            for i in idx:
+                stats = _portfolio_stats(frontier[i], mu, cov, risk_free_rate)
+                rows.append(
+                    {
+                        "Return": stats["expected_return"],
+                        "Volatility": stats["volatility"],
+                        "Sharpe": stats["sharpe"],
+                        **dict(zip(tickers, frontier[i].round(6))),
+                    }
+                )
+            frontier_df = pd.DataFrame(rows).drop_duplicates(subset=tickers)
+            frontier_df.index = pd.RangeIndex(len(frontier_df), name="Point")
+            frontier_file = save_analysis_csv(
+                frontier_df, f"{stem}_frontier.csv", tool="optimize_portfolio"
+            )
+
+        result = {
+            "weights_file": weights_file,
+            "frontier_file": frontier_file,
+            "objective": objective,
+            "observations": int(rets.shape[0]),
+            "covariance_shrinkage": round(shrink, 6),
+            "weights": {t: round(float(x), 6) for t, x in zip(tickers, w) if x != 0.0},
+            "risk_contributions": {
+                t: round(float(c), 6)
+                for t, c, x in zip(tickers, contrib, w)
+                if x != 0.0
+            },
+            **_portfolio_stats(w, mu, cov, risk_free_rate),
+        }
+        if cvar is not None:
+            result[f"cvar_{int(cvar_confidence * 100)}_daily"] = round(cvar, 6)
+        return json.dumps(result)
+    except Exception as e:
+        return json.dumps({"error": str(e), "files": files})
@@ -0,0 +1,185 @@
+"""Canonical, incrementally refreshed price histories per ticker and interval.
+
+Each (ticker, interval) pair is kept as one series on disk together with a
+small metadata record describing how far back it is complete and when it was
+last refreshed.  Requests for any ``period`` are answered by slicing that
+series; only bars newer than the last stored timestamp are fetched when the
+series is stale.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Columns yfinance reports as corporate actions.  A new dividend or split in a
+# delta fetch shifts every earlier adjusted price, so the series is refetched.
+ACTION_COLUMNS = ["Dividends", "Stock Splits"]
+
+_PERIOD_RE = re.compile(r"^(\d+)(d|mo|y)$")
+
+
+def period_start(period: str, now: pd.Timestamp | None = None) -> pd.Timestamp | None:
+    """Return the first timestamp covered by a yfinance *period* (None for "max")."""
+    now = (now or pd.Timestamp.now()).normalize()
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=now.year, month=1, day=1)
+    match = _PERIOD_RE.match(period)
+    if not match:
+        raise ValueError(f"Unsupported period: {period}")
+    n, unit = int(match.group(1)), match.group(2)
+    if unit == "d":
+        # yfinance counts trading days; leave room for weekends and holidays
+        return now - pd.Timedelta(days=2 * n + 4)
+    if unit == "mo":
+        return now - pd.DateOffset(months=n)
+    return now - pd.DateOffset(years=n)
+
+
+def _naive(df: pd.DataFrame) -> pd.DataFrame:
+    """Return *df* indexed by tz-naive exchange-local timestamps named Date."""
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.tz is not None:
+        df = df.tz_localize(None)
+    df.index.name = "Date"
+    return df
+
+
+class PriceHistoryStore:
+    """On-disk canonical OHLCV series, refreshed with delta fetches."""
+
+    def __init__(self, root: str | Path, *, refresh_after: int = 300):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.refresh_after = refresh_after
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _stem(self, ticker: str, interval: str) -> str:
+        return f"{ticker.strip().upper()}_{interval}"
+
+    def _paths(self, ticker: str, interval: str) -> tuple[Path, Path]:
+        stem = self._stem(ticker, interval)
+        return self.root / f"{stem}.pkl", self.root / f"{stem}.json"
+
+    def tickers(self) -> set[str]:
+        """Return every ticker with at least one stored series."""
+        return {p.stem.rsplit("_", 1)[0] for p in self.root.glob("*.pkl")}
+
+    def lock(self, ticker: str, interval: str) -> threading.Lock:
+        stem = self._stem(ticker, interval)
+        with self._locks_guard:
+            return self._locks.setdefault(stem, threading.Lock())
+
+    def load(self, ticker: str, interval: str) -> tuple[pd.DataFrame | None, dict]:
+        data_path, meta_path = self._paths(ticker, interval)
+        if not data_path.exists() or not meta_path.exists():
+            return None, {}
+        try:
+            return pd.read_pickle(data_path), json.loads(meta_path.read_text())
+        except Exception:
+            return None, {}
+
+    def _save(self, ticker: str, interval: str, df: pd.DataFrame, meta: dict) -> None:
+        data_path, meta_path = self._paths(ticker, interval)
+        # Write-then-rename so concurrent readers never see a partial file
+        tmp = data_path.with_suffix(f".{os.getpid()}.tmp")
+        df.to_pickle(tmp)
+        os.replace(tmp, data_path)
+        tmp = meta_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, meta_path)
+
+    # ------------------------------------------------------------------
+    # Refresh planning
+    # ------------------------------------------------------------------
+
+    def plan(
+        self, ticker: str, period: str, interval: str
+    ) -> tuple[str, pd.Timestamp | None]:
+        """Return ``(mode, start)`` describing what must be fetched.
+
+        *mode* is ``"fresh"`` (serve from disk), ``"delta"`` (fetch bars from
+        *start* onwards) or ``"full"`` (fetch the whole *period*).
+        """
+        df, meta = self.load(ticker, interval)
+        if df is None or df.empty or meta.get("needs_full"):
+            return "full", None
+        start = period_start(period)
+        covered_from = meta.get("covered_from")
+        if not meta.get("complete"):
+            if start is None or covered_from is None:
+                return "full", None
+            if start < pd.Timestamp(covered_from):
+                return "full", None
+        if time.time() - meta.get("fetched_at", 0) < self.refresh_after:
+            return "fresh", None
+        # Refetch the last stored bar as well: it may have been incomplete.
+        return "delta", df.index.max().normalize()
+
+    def update(
+        self, ticker: str, period: str, interval: str, mode: str, fetched: pd.DataFrame
+    ) -> bool:
+        """Merge *fetched* bars into the stored series.
+
+        Returns True when a full refetch is needed instead (the delta contained
+        a dividend or split, which changes earlier adjusted prices).
+        """
+        fetched = _naive(fetched.copy())
+        df, meta = self.load(ticker, interval)
+        now = time.time()
+        if mode == "full" or df is None:
+            start = period_start(period)
+            first = fetched.index.min() if not fetched.empty else None
+            covered = [t for t in (start, first) if t is not None]
+            meta = {
+                "complete": period == "max",
+                "covered_from": str(min(covered)) if covered else None,
+                "fetched_at": now,
+            }
+            self._save(ticker, interval, fetched.sort_index(), meta)
+            return False
+
+        if fetched.empty:
+            # No new bars (weekend, holiday or a throttled request); yfinance's
+            # empty frame has no DatetimeIndex, so keep the stored series as is
+            meta["fetched_at"] = now
+            self._save(ticker, interval, df, meta)
+            return False
+
+        last = df.index.max()
+        actions = fetched.loc[fetched.index > last].reindex(columns=ACTION_COLUMNS)
+        if actions.fillna(0).to_numpy().any():
+            meta["needs_full"] = True
+            self._save(ticker, interval, df, meta)
+            return True
+
+        merged = pd.concat([df, fetched])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        meta["fetched_at"] = now
+        self._save(ticker, interval, merged, meta)
+        return False
+
+    def slice(self, ticker: str, period: str, interval: str) -> pd.DataFrame:
+        """Return the stored bars covering *period*."""
+        df, _ = self.load(ticker, interval)
+        if df is None:
+            return pd.DataFrame()
+        match = _PERIOD_RE.match(period)
+        if match and match.group(2) == "d":
+            # Trading-day periods: keep the last N distinct session dates
+            dates = df.index.normalize().unique()[-int(match.group(1)) :]
+            return df[df.index.normalize().isin(dates)]
+        start = period_start(period)
+        return df if start is None else df[df.index >= start]
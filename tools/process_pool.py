@@ -0,0 +1,30 @@
+"""Shared process pool for CPU-bound analytics (simulations, model fits).
+
+Workers are started with the ``spawn`` method: the agent runtime has threads
+and open sockets that must not be inherited by a forked child.  Functions
+submitted to the pool should live in modules that are cheap to import (plain
+NumPy/pandas code, no agent or network clients).
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from settings import QUANT_PROCESS_WORKERS
+
+_pool: ProcessPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def process_pool() -> ProcessPoolExecutor:
+    """Return the process-wide pool, starting it on first use."""
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=QUANT_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
@@ -0,0 +1,425 @@
+"""Vectorized quant analytics over price files in outputs/.
+
+The common statistics the quant agent asks for (returns, rolling volatility,
+beta, Sharpe ratio, drawdowns, correlation) are computed here with NumPy on
+(time x ticker) arrays instead of round-tripping CSVs through the Code
+Interpreter.  ``load_price_frame`` understands every price file the Yahoo
+Finance tools write (single-ticker histories and the wide/long batch layouts)
+as well as two-column FRED downloads.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pandas as pd
+from agents import function_tool
+from tools import parquet_reader
+from tools.dataset_registry import open_dataset
+from tools.output_manifest import record_output
+from utils import compact_stem, find_output, output_file
+
+# ---------------------------------------------------------------------------
+# Price loading
+# ---------------------------------------------------------------------------
+
+# Parsed tables keyed by path, reused while the file's mtime and size are unchanged
+_frames: dict[Path, tuple[float, int, pd.DataFrame]] = {}
+_frames_lock = threading.Lock()
+
+_TZ_SUFFIX = re.compile(r"([+-]\d{2}:?\d{2}|Z)$")
+
+
+def _date_indexed(df: pd.DataFrame) -> pd.DataFrame:
+    date_col = "Date" if "Date" in df.columns else df.columns[0]
+    if isinstance(df[date_col].dtype, pd.DatetimeTZDtype):
+        dates = df[date_col].dt.tz_localize(None)
+    elif pd.api.types.is_datetime64_dtype(df[date_col]):
+        dates = df[date_col]  # typed timestamps from Parquet or Arrow
+    else:
+        # Keep exchange-local wall-clock times, as the price store does
+        dates = df[date_col].astype(str).str.replace(_TZ_SUFFIX, "", regex=True)
+    df = df.drop(columns=[date_col]).set_index(pd.to_datetime(dates))
+    df.index.name = "Date"
+    return df
+
+
+def _read_table(path: Path) -> pd.DataFrame:
+    stat = path.stat()
+    with _frames_lock:
+        cached = _frames.get(path)
+    if cached and cached[:2] == (stat.st_mtime, stat.st_size):
+        return cached[2]
+    if path.suffix.lower() == ".parquet":
+        df = parquet_reader.read_frame(path)
+    else:
+        df = pd.read_csv(path)
+    df = _date_indexed(df)
+    with _frames_lock:
+        _frames[path] = (stat.st_mtime, stat.st_size, df)
+    return df
+
+
+def _ticker_from_filename(name: str) -> str:
+    return Path(name).stem.split("_")[0].upper()
+
+
+def _load_table(name: str) -> pd.DataFrame:
+    """The Date-indexed table of output *name*, from the dataset registry or outputs/."""
+    table = open_dataset(name)
+    if table is not None:
+        # Numeric columns are views of the mapped Arrow buffers
+        return _date_indexed(table.to_pandas(split_blocks=True))
+    path = find_output(name)
+    if not path.exists():
+        raise FileNotFoundError(
+            f"File not found: {name}. Use list_output_files to see available files."
+        )
+    return _read_table(path)
+
+
+def load_price_frame(files: list[str], column: str = "Close") -> pd.DataFrame:
+    """Return a Date-indexed frame with one *column* series per ticker in *files*.
+
+    Files are read from outputs/.  Single-ticker histories are named after the
+    ticker prefix of the file name; batch files contribute every ticker they
+    hold.  A file with a single value column (e.g. a FRED download) is used
+    as-is under that column's name.
+    """
+    series = {}
+    for name in files:
+        df = _load_table(name)
+        wide = [c for c in df.columns if c.endswith(f"_{column}")]
+        if "Ticker" in df.columns and column in df.columns:
+            pivot = df.pivot_table(index=df.index, columns="Ticker", values=column)
+            series.update({str(t): pivot[t] for t in pivot.columns})
+        elif wide:
+            series.update({c[: -len(column) - 1]: df[c] for c in wide})
+        elif column in df.columns:
+            series[_ticker_from_filename(name)] = df[column]
+        elif len(df.columns) == 1:
+            series[str(df.columns[0])] = df[df.columns[0]]
+        else:
+            raise ValueError(
+                f"{name} has no '{column}' column; columns are {list(df.columns)}"
+            )
+    frame = pd.DataFrame(series).sort_index()
+    return frame[~frame.index.duplicated(keep="last")].astype(float)
+
+
+def load_series_frame(name: str) -> pd.DataFrame:
+    """Return every numeric column of output *name* as a Date-indexed frame.
+
+    Unlike :func:`load_price_frame` this takes any table, such as an aligned
+    multi-series FRED download (``Date,FEDFUNDS,DGS10``).
+    """
+    df = _load_table(name).select_dtypes("number")
+    if df.columns.empty:
+        raise ValueError(f"{name} has no numeric columns")
+    df = df.rename(columns=str).sort_index()
+    return df[~df.index.duplicated(keep="last")].astype(float)
+
+
+def save_analysis_csv(df: pd.DataFrame, file_name: str, tool: str | None = None) -> str:
+    path = output_file(file_name)
+    # Write-then-rename so readers never see a partial file
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    df.to_csv(tmp)
+    os.replace(tmp, path)
+    record_output(path, tool)
+    return file_name
+
+
+# ---------------------------------------------------------------------------
+# Vectorized statistics on (time x asset) arrays; NaN marks missing data
+# ---------------------------------------------------------------------------
+
+
+def simple_returns(prices: np.ndarray) -> np.ndarray:
+    """Period returns with a leading NaN row so the shape matches *prices*."""
+    out = np.full(prices.shape, np.nan)
+    out[1:] = prices[1:] / prices[:-1] - 1.0
+    return out
+
+
+def log_returns(prices: np.ndarray) -> np.ndarray:
+    out = np.full(prices.shape, np.nan)
+    out[1:] = np.log(prices[1:] / prices[:-1])
+    return out
+
+
+def rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    """Sample standard deviation over trailing *window* rows.
+
+    Computed from running sums in O(n); windows containing any NaN are NaN.
+    """
+    valid = ~np.isnan(x)
+    filled = np.where(valid, x, 0.0)
+    pad = np.zeros((1,) + x.shape[1:])
+    s1 = np.concatenate([pad, np.cumsum(filled, axis=0)])
+    s2 = np.concatenate([pad, np.cumsum(filled**2, axis=0)])
+    n = np.concatenate([pad, np.cumsum(valid, axis=0)])
+    out = np.full(x.shape, np.nan)
+    if window < 2 or x.shape[0] < window:
+        return out
+    w1 = s1[window:] - s1[:-window]
+    w2 = s2[window:] - s2[:-window]
+    count = n[window:] - n[:-window]
+    var = (w2 - w1**2 / window) / (window - 1)
+    std = np.sqrt(np.clip(var, 0.0, None))
+    out[window - 1 :] = np.where(count == window, std, np.nan)
+    return out
+
+
+def drawdowns(prices: np.ndarray) -> np.ndarray:
+    """Drawdown from the running peak (0 at new highs, negative below)."""
+    peaks = np.fmax.accumulate(prices, axis=0)
+    return prices / peaks - 1.0
+
+
+def annualized_stats(
+    returns: np.ndarray, periods_per_year: int, risk_free_rate: float = 0.0
+) -> dict[str, np.ndarray]:
+    """Annualized mean, volatility and Sharpe ratio per column."""
+    mean = np.nanmean(returns, axis=0) * periods_per_year
+    vol = np.nanstd(returns, axis=0, ddof=1) * np.sqrt(periods_per_year)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = (mean - risk_free_rate) / vol
+    return {"mean": mean, "volatility": vol, "sharpe": sharpe}
+
+
+def beta_to(
+    returns: np.ndarray, benchmark: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Beta and correlation of each column against *benchmark* (pairwise-complete)."""
+    bench = np.broadcast_to(benchmark[:, None], returns.shape)
+    mask = ~(np.isnan(returns) | np.isnan(bench))
+    n = mask.sum(axis=0)
+    r = np.where(mask, returns, 0.0)
+    b = np.where(mask, bench, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_mean = r.sum(axis=0) / n
+        b_mean = b.sum(axis=0) / n
+        rc = np.where(mask, r - r_mean, 0.0)
+        bc = np.where(mask, b - b_mean, 0.0)
+        cov = (rc * bc).sum(axis=0)
+        b_var = (bc**2).sum(axis=0)
+        r_var = (rc**2).sum(axis=0)
+        return cov / b_var, cov / np.sqrt(b_var * r_var)
+
+
+def correlation_matrix(returns: np.ndarray) -> np.ndarray:
+    """Pearson correlation over rows where every column is present."""
+    complete = returns[~np.isnan(returns).any(axis=1)]
+    if complete.shape[0] < 3:
+        return np.full((returns.shape[1], returns.shape[1]), np.nan)
+    return np.corrcoef(complete, rowvar=False)
+
+
+# ---------------------------------------------------------------------------
+# Agent tools
+# ---------------------------------------------------------------------------
+
+RESAMPLE_RULES = {"D": None, "W": "W-FRI", "M": "ME"}
+
+
+def _num(x) -> float | None:
+    return None if x is None or not np.isfinite(x) else round(float(x), 6)
+
+
+def _date(index: pd.DatetimeIndex, i: int) -> str:
+    return str(index[i].date())
+
+
+@function_tool
+def compute_return_statistics(
+    files: List[str],
+    benchmark: str = "",
+    risk_free_rate: float = 0.0,
+    periods_per_year: int = 252,
+) -> str:
+    """Computes returns, annualized volatility, Sharpe ratio, max drawdown and beta locally.
+
+    Args:
+        files: Price files in outputs/ (single-ticker histories or batch price files).
+        benchmark: Optional benchmark ticker (e.g. "SPY") for beta and correlation;
+            it must be one of the tickers in *files*.
+        risk_free_rate: Annual risk-free rate as a decimal (e.g. 0.045) for the Sharpe ratio.
+        periods_per_year: Bars per year (252 for daily, 52 weekly, 12 monthly).
+
+    Returns:
+        str: JSON with per-ticker statistics and the name of a CSV holding the
+        period returns and drawdowns ({T}_Return, {T}_Drawdown columns).
+    """
+    try:
+        prices = load_price_frame(files)
+        benchmark = benchmark.strip().upper()
+        if benchmark and benchmark not in prices.columns:
+            return json.dumps(
+                {
+                    "error": f"Benchmark {benchmark} not found in files",
+                    "tickers": list(prices.columns),
+                }
+            )
+        values = prices.to_numpy()
+        rets = simple_returns(values)
+        dd = drawdowns(values)
+        stats = annualized_stats(rets, periods_per_year, risk_free_rate)
+        if benchmark:
+            betas, corrs = beta_to(rets, rets[:, prices.columns.get_loc(benchmark)])
+
+        summary = {}
+        for j, ticker in enumerate(prices.columns):
+            valid = np.flatnonzero(~np.isnan(values[:, j]))
+            if valid.size < 2:
+                summary[ticker] = {"error": "fewer than two prices"}
+                continue
+            first, last = valid[0], valid[-1]
+            trough = int(np.nanargmin(dd[:, j]))
+            peak = int(np.nanargmax(values[: trough + 1, j]))
+            summary[ticker] = {
+                "start": _date(prices.index, first),
+                "end": _date(prices.index, last),
+                "observations": int(valid.size),
+                "total_return": _num(values[last, j] / values[first, j] - 1),
+                "annualized_return": _num(stats["mean"][j]),
+                "annualized_volatility": _num(stats["volatility"][j]),
+                "sharpe": _num(stats["sharpe"][j]),
+                "max_drawdown": _num(dd[trough, j]),
+                "max_drawdown_peak": _date(prices.index, peak),
+                "max_drawdown_trough": _date(prices.index, trough),
+            }
+            if benchmark:
+                summary[ticker]["beta"] = _num(betas[j])
+                summary[ticker]["correlation_to_benchmark"] = _num(corrs[j])
+
+        out = pd.concat(
+            [
+                pd.DataFrame(
+                    rets, index=prices.index, columns=prices.columns
+                ).add_suffix("_Return"),
+                pd.DataFrame(dd, index=prices.index, columns=prices.columns).add_suffix(
+                    "_Drawdown"
+                ),
+            ],
+            axis=1,
+        )
+        file_name = save_analysis_csv(
+            out,
+            f"{compact_stem(list(prices.columns))}_return_stats.csv",
+            tool="compute_return_statistics",
+        )
+        return json.dumps(
+            {"file": file_name, "benchmark": benchmark or None, "statistics": summary}
+        )
+    except Exception as e:
+        return json.dumps({"error": str(e), "files": files})
+
+
+@function_tool
+def compute_rolling_volatility(
+    files: List[str], window: int = 21, periods_per_year: int = 252
+) -> str:
+    """Computes annualized rolling volatility of returns for every ticker in the files.
+
+    Args:
+        files: Price files in outputs/ (single-ticker histories or batch price files).
+        window: Rolling window in bars (21 ≈ one month of trading days).
+        periods_per_year: Bars per year used to annualize (252 for daily data).
+
+    Returns:
+        str: JSON with latest/mean/min/max volatility per ticker (and where the
+        latest value ranks historically) plus the name of a CSV with the
+        rolling series ({T}_Volatility columns).
+    """
+    try:
+        if window < 2:
+            return json.dumps({"error": "window must be at least 2"})
+        prices = load_price_frame(files)
+        vol = rolling_std(simple_returns(prices.to_numpy()), window) * np.sqrt(
+            periods_per_year
+        )
+        summary = {}
+        for j, ticker in enumerate(prices.columns):
+            col = vol[:, j]
+            valid = np.flatnonzero(~np.isnan(col))
+            if valid.size == 0:
+                summary[ticker] = {"error": f"fewer than {window + 1} prices"}
+                continue
+            latest = col[valid[-1]]
+            summary[ticker] = {
+                "latest": _num(latest),
+                "latest_date": _date(prices.index, valid[-1]),
+                "mean": _num(np.nanmean(col)),
+                "min": _num(np.nanmin(col)),
+                "max": _num(np.nanmax(col)),
+                "latest_percentile": _num(np.mean(col[valid] <= latest)),
+            }
+        out = pd.DataFrame(vol, index=prices.index, columns=prices.columns)
+        file_name = save_analysis_csv(
+            out.add_suffix("_Volatility"),
+            f"{compact_stem(list(prices.columns))}_rolling_vol_{window}.csv",
+            tool="compute_rolling_volatility",
+        )
+        return json.dumps({"file": file_name, "window": window, "volatility": summary})
+    except Exception as e:
+        return json.dumps({"error": str(e), "files": files})
+
+
+@function_tool
+def compute_correlation_matrix(files: List[str], frequency: str = "D") -> str:
+    """Computes the correlation matrix of returns across all tickers in the files.
+
+    Args:
+        files: Price files in outputs/ (single-ticker histories, batch price files
+            or FRED downloads).
+        frequency: Return frequency: "D" (as stored), "W" (weekly) or "M" (monthly).
+            Prices are sampled at period end before computing returns.
+
+    Returns:
+        str: JSON with the correlation matrix, the overlapping date range used,
+        and the name of a CSV holding the matrix.
+    """
+    try:
+        frequency = frequency.strip().upper()
+        if frequency not in RESAMPLE_RULES:
+            return json.dumps(
+                {"error": f"Invalid frequency '{frequency}'. Use D, W or M"}
+            )
+        prices = load_price_frame(files)
+        if RESAMPLE_RULES[frequency]:
+            prices = prices.resample(RESAMPLE_RULES[frequency]).last()
+        rets = simple_returns(prices.to_numpy())
+        corr = correlation_matrix(rets)
+        complete = np.flatnonzero(~np.isnan(rets).any(axis=1))
+        if complete.size < 3:
+            return json.dumps(
+                {
+                    "error": "Fewer than 3 overlapping observations",
+                    "tickers": list(prices.columns),
+                }
+            )
+        matrix = pd.DataFrame(corr, index=prices.columns, columns=prices.columns)
+        file_name = save_analysis_csv(
+            matrix,
+            f"{compact_stem(list(prices.columns))}_correlation_{frequency}.csv",
+            tool="compute_correlation_matrix",
+        )
+        return json.dumps(
+            {
+                "file": file_name,
+                "frequency": frequency,
+                "observations": int(complete.size),
+                "start": _date(prices.index, complete[0]),
+                "end": _date(prices.index, complete[-1]),
+                "matrix": matrix.round(4).to_dict(),
+            }
+        )
+    except Exception as e:
+        return json.dumps({"error": str(e), "files": files})
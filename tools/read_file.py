@@ -1,44 +1,150 @@
 import json
-import pandas as pd
+from typing import List, Optional
+
 from agents import function_tool
-from utils import output_file
+from tools import arrow_reader, csv_reader, parquet_reader, text_reader
+from tools.dataset_registry import open_dataset
+from utils import find_output
 from pathlib import Path
 
 
+def _read_table_preview(
+    reader,
+    path: Path,
+    filename: str,
+    n_rows: int,
+    position: str,
+    start_row: Optional[int],
+    columns: Optional[List[str]],
+    where: str,
+    summary: bool,
+) -> dict:
+    if summary:
+        return {"file": filename, "summary": reader.summarize(path, columns)}
+    position = position.strip().lower()
+    if position not in ("head", "tail"):
+        raise ValueError("position must be 'head' or 'tail'")
+    result = {"file": filename}
+    if where:
+        df, matched = reader.select(
+            path, where, n_rows, columns, from_end=position == "tail"
+        )
+        result["rows_matched"] = matched
+    elif start_row is not None:
+        df = reader.head(path, n_rows, columns, start=max(start_row, 0))
+    elif position == "head":
+        df = reader.head(path, n_rows, columns)
+    else:
+        df = reader.tail(path, n_rows, columns)
+    result["columns"] = reader.read_header(path)
+    result["preview_markdown"] = df.to_markdown(index=False)
+    return result
+
+
+def _read_text(
+    path: Path,
+    filename: str,
+    n_rows: int,
+    start_row: Optional[int],
+    section: str,
+    outline: bool,
+) -> dict:
+    if outline:
+        return {"file": filename, "outline": text_reader.outline(path)}
+    if section:
+        found = text_reader.read_section(path, section)
+        if found is None:
+            return {
+                "error": f"No heading matching '{section}'",
+                "file": filename,
+                "headings": [h["title"] for h in text_reader.outline(path)["headings"]],
+            }
+        content, where = found
+        return {"file": filename, "section": section, **where, "content": content}
+    if start_row is not None:
+        start = max(start_row, 0)
+        content, more = text_reader.read_lines(path, start, n_rows)
+        return {
+            "file": filename,
+            "start_line": start,
+            "content": content,
+            "next_start_row": start + n_rows if more else None,
+        }
+    with open(path, "r", encoding="utf-8") as f:
+        return {"file": filename, "content": f.read()}
+
+
 @function_tool
-def read_file(filename: str, n_rows: int = 10) -> str:
+def read_file(
+    filename: str,
+    n_rows: int = 10,
+    position: str = "tail",
+    start_row: Optional[int] = None,
+    columns: Optional[List[str]] = None,
+    where: str = "",
+    summary: bool = False,
+    section: str = "",
+    outline: bool = False,
+) -> str:
     """
     Read and preview the contents of a file from the outputs directory.
 
-    Supports reading CSV, Markdown (.md), and plain text (.txt) files. For CSV files, returns a preview of the last `n_rows` as a Markdown table. For Markdown and text files, returns the full text content. For unsupported file types, returns an error message.
+    Supports reading CSV, Parquet, Markdown (.md), and plain text (.txt) files. For CSV and Parquet files, returns a preview of `n_rows` rows (the last rows by default) as a Markdown table, optionally restricted to some columns or to rows matching a filter, or per-column summary statistics; large files are never loaded whole. For Markdown and text files, returns the full text content, or only an outline of the headings, one section, or a range of lines. For unsupported file types, returns an error message.
 
     Args:
-        filename: The name of the file to read, relative to the outputs directory. Supported extensions: .csv, .md, .txt.
-        n_rows: The number of rows to preview for CSV files (default: 10).
+        filename: The name of the file to read, relative to the outputs directory. Supported extensions: .csv, .parquet, .md, .txt.
+        n_rows: The number of rows to preview for CSV/Parquet files (default: 10). Parquet files take the same options as CSV files below.
+        position: "tail" (last rows, default) or "head" (first rows) for CSV previews.
+        start_row: For CSV files, preview `n_rows` rows starting at this 0-based row instead. For Markdown/text files, return `n_rows` lines starting at this 0-based line.
+        columns: For CSV files, only include these columns.
+        where: For CSV files, only include rows matching simple conditions joined with "and", e.g. "Close > 100 and Date >= 2024-01-01".
+        summary: For CSV files, return row count and per-column count, missing values, min, max, mean and standard deviation instead of rows.
+        section: For Markdown/text files, return only the section under the first heading containing this text (including its subsections).
+        outline: For Markdown/text files, return only the headings with their line numbers and section sizes.
 
     Returns:
         str: A JSON string containing either:
-            - For CSV: {"file": filename, "preview_markdown": "<markdown table>"}
-            - For Markdown/Text: {"file": filename, "content": "<text content>"}
+            - For CSV/Parquet: {"file": filename, "columns": [...], "preview_markdown": "<markdown table>"} (plus "rows_matched" with `where`)
+            - For CSV with summary: {"file": filename, "summary": {"rows": n, "columns": {...}}}
+            - For Markdown/Text: {"file": filename, "content": "<text content>"} (with `start_row`, also "start_line" and "next_start_row", null at the end of the file)
+            - For Markdown/Text with section: {"file": filename, "section": ..., "line": n, "lines": n, "content": "<section text>"}
+            - For Markdown/Text with outline: {"file": filename, "outline": {"lines": n, "chars": n, "headings": [{"level", "title", "line", "lines", "chars"}, ...]}}
             - For errors: {"error": "<error message>", "file": filename}
     """
-    path = output_file(filename, make_parents=False)
-    if not path.exists():
-        return json.dumps({"error": "file not found", "file": filename})
-
     suffix = Path(filename).suffix.lower()
-    if suffix == ".csv":
+    # Registered datasets are previewed from their mapped buffers, without a file
+    table = open_dataset(filename) if suffix in (".csv", ".parquet") else None
+    if table is not None:
+        reader, path = arrow_reader, table
+    else:
+        path = find_output(filename)
+        if not path.exists():
+            return json.dumps({"error": "file not found", "file": filename})
+        reader = parquet_reader if suffix == ".parquet" else csv_reader
+
+    if suffix in (".csv", ".parquet"):
         try:
-            df = pd.read_csv(path).tail(n_rows)
-            table_md = df.to_markdown(index=False)
-            return json.dumps({"file": filename, "preview_markdown": table_md})
+            return json.dumps(
+                _read_table_preview(
+                    reader,
+                    path,
+                    filename,
+                    n_rows,
+                    position,
+                    start_row,
+                    columns,
+                    where,
+                    summary,
+                ),
+                default=str,
+            )
         except Exception as e:
             return json.dumps({"error": str(e), "file": filename})
     elif suffix == ".md" or suffix == ".txt":
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                content = f.read()
-            return json.dumps({"file": filename, "content": content})
+            return json.dumps(
+                _read_text(path, filename, n_rows, start_row, section, outline)
+            )
         except Exception as e:
             return json.dumps({"error": str(e), "file": filename})
     else:
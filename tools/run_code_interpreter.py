@@ -1,15 +1,35 @@
+import asyncio
+import functools
 import json
-import os
+import random
 import re
-import requests
+import shutil
+
 from agents import function_tool
-from openai import OpenAI
-from utils import output_file, repo_path
-from settings import CODE_INTERPRETER_MODEL
+from openai import AsyncOpenAI, BadRequestError, NotFoundError
+from tools.output_manifest import record_output
+from utils import current_run_id, find_output, output_file, repo_path
+from settings import (
+    CODE_INTERPRETER_BACKEND,
+    CODE_INTERPRETER_BACKOFF,
+    CODE_INTERPRETER_CONTAINER_IDLE_MINUTES,
+    CODE_INTERPRETER_MAX_RETRIES,
+    CODE_INTERPRETER_MODEL,
+    CODE_INTERPRETER_UPLOAD_TTL,
+    CODE_INTERPRETER_UPLOAD_WORKERS,
+    LOCAL_CODE_ATTEMPTS,
+)
+from tools import parquet_reader
+from tools.code_interpreter_containers import container_pool
+from tools.local_code_runner import default_local_runner
+from tools.upload_cache import REMOTE_GRACE, default_upload_cache, file_digest
 
 PROMPT_PATH = repo_path("prompts/code_interpreter.md")
 with open(PROMPT_PATH, "r", encoding="utf-8") as f:
     CODE_INTERPRETER_INSTRUCTIONS = f.read()
+LOCAL_CODE_INSTRUCTIONS = repo_path("prompts/local_code_interpreter.md").read_text(
+    encoding="utf-8"
+)
 
 
 def code_interpreter_error_handler(ctx, error):
@@ -23,10 +43,209 @@ def code_interpreter_error_handler(ctx, error):
     )
 
 
+@functools.lru_cache(maxsize=None)
+def upload_cache():
+    """Return the process-wide upload cache (created on first use)."""
+    return default_upload_cache()
+
+
+async def upload_input_files(client, paths, *, refresh: bool = False) -> list[str]:
+    """Return OpenAI file ids for *paths*, uploading only files not already cached.
+
+    Uploads that are needed run concurrently; expired cache entries (and the
+    remote files behind them) are cleaned up afterwards.  ``refresh=True``
+    ignores the cache and uploads every file again.
+    """
+    cache = upload_cache()
+    digests = await asyncio.gather(
+        *(asyncio.to_thread(file_digest, path) for path in paths)
+    )
+    file_ids = [
+        None if refresh else cache.get(digest, path.name)
+        for digest, path in zip(digests, paths)
+    ]
+    # Remote copies outlive the cache entry; OpenAI accepts 1 hour to 30 days
+    expires_after = {
+        "anchor": "created_at",
+        "seconds": min(max(CODE_INTERPRETER_UPLOAD_TTL + REMOTE_GRACE, 3600), 2592000),
+    }
+    slots = asyncio.Semaphore(CODE_INTERPRETER_UPLOAD_WORKERS)
+
+    async def _upload(i):
+        async with slots:
+            uploaded = await client.files.create(
+                file=paths[i], purpose="user_data", expires_after=expires_after
+            )
+        cache.put(digests[i], paths[i].name, uploaded.id, paths[i].stat().st_size)
+        file_ids[i] = uploaded.id
+
+    async def _delete(file_id):
+        try:
+            await client.files.delete(file_id)
+        except Exception:  # already expired or deleted remotely
+            pass
+
+    await asyncio.gather(
+        *(_upload(i) for i, file_id in enumerate(file_ids) if file_id is None)
+    )
+    await asyncio.gather(*(_delete(file_id) for file_id in cache.pop_expired()))
+    return file_ids
+
+
+# 400 errors about an uploaded file or container that no longer exists remotely
+_GONE = r"(not found|expired|does not exist|no such|deleted)"
+_MISSING_REMOTE = re.compile(
+    rf"(file|container).*{_GONE}|{_GONE}.*(file|container)", re.I
+)
+
+
+def _missing_remote(error: BadRequestError) -> bool:
+    """Whether *error* refers to a missing input file or container (vs a permanent 400)."""
+    text = " ".join(str(x) for x in (error.code, error.param, error.message) if x)
+    return bool(_MISSING_REMOTE.search(text))
+
+
+async def _backoff(attempt: int) -> None:
+    """Sleep with exponential back-off and jitter before retry number *attempt*."""
+    delay = CODE_INTERPRETER_BACKOFF * 2 ** (attempt - 1)
+    await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+
+async def _csv_inputs(request: str, abs_paths) -> tuple[str, list]:
+    """Swap Parquet inputs for cached CSV exports and tell the model about it."""
+    exports = {
+        path: await asyncio.to_thread(parquet_reader.export_csv, path)
+        for path in abs_paths
+        if path.suffix.lower() == ".parquet"
+    }
+    if not exports:
+        return request, abs_paths
+    renamed = ", ".join(f"{src.name} as {dst.name}" for src, dst in exports.items())
+    request += f"\n\nParquet inputs are provided in CSV form: {renamed}."
+    return request, [exports.get(path, path) for path in abs_paths]
+
+
+async def _run_cloud(request: str, abs_paths) -> tuple[str, list[str]]:
+    """Run *request* in OpenAI's hosted Code Interpreter."""
+    # Parquet is exported to CSV only here, where the files leave this machine
+    request, abs_paths = await _csv_inputs(request, abs_paths)
+    # Containers are reused by later calls in the same research run, so data
+    # loaded by an earlier analysis stays in memory.
+    pool = container_pool(
+        AsyncOpenAI, current_run_id(), CODE_INTERPRETER_CONTAINER_IDLE_MINUTES
+    )
+    client = pool.client
+    # Files already uploaded with identical contents are reused by id
+    file_ids = await upload_input_files(client, abs_paths)
+
+    attempt = 0
+    while True:
+        try:
+            async with pool.acquire(file_ids) as container:
+                resp = await client.responses.create(
+                    model=CODE_INTERPRETER_MODEL,
+                    tools=[{"type": "code_interpreter", "container": container.id}],
+                    instructions=CODE_INTERPRETER_INSTRUCTIONS,
+                    input=request,
+                    temperature=0,
+                )
+                output_text = resp.output_text
+                # Stream any new files to outputs/ concurrently
+                downloaded_files = await pool.download_new_files(container, output_file)
+            break  # Success
+        except Exception as e:
+            if isinstance(e, BadRequestError) and not _missing_remote(e):
+                raise  # Bad model, parameter or input: retrying cannot help
+            attempt += 1
+            if attempt >= CODE_INTERPRETER_MAX_RETRIES:
+                raise
+            if isinstance(e, (NotFoundError, BadRequestError)):
+                # A cached upload may have been removed remotely; upload afresh
+                file_ids = await upload_input_files(client, abs_paths, refresh=True)
+            await _backoff(attempt)
+    return output_text, downloaded_files
+
+
+# ---------------------------------------------------------------------------
+# Local backend: the model writes a script, a local worker process runs it
+# ---------------------------------------------------------------------------
+
+
+@functools.lru_cache(maxsize=None)
+def local_runner():
+    """Return the process-wide local code runner (workers start on first use)."""
+    return default_local_runner()
+
+
+def _describe_inputs(paths) -> str:
+    """Name, size and (for text files) the first lines of each input file."""
+    parts = []
+    for path in paths:
+        header = f"- {path.name} ({path.stat().st_size} bytes)"
+        if path.suffix.lower() == ".parquet":
+            head = parquet_reader.head(path, 5).to_string(index=False)
+            dtypes = ", ".join(
+                f"{c}: {t}" for c, t in parquet_reader.read_schema(path).items()
+            )
+            header += f", Parquet ({dtypes}), first rows:\n```\n{head}\n```"
+        elif path.suffix.lower() in (".csv", ".txt", ".json", ".md"):
+            with path.open("r", encoding="utf-8", errors="replace") as f:
+                head = "".join(line for _, line in zip(range(6), f))
+            header += f", first lines:\n```\n{head.rstrip()}\n```"
+        parts.append(header)
+    return "\n".join(parts)
+
+
+def _extract_code(text: str) -> str:
+    match = re.search(r"```(?:python|py)?\s*\n(.*?)```", text, re.DOTALL)
+    code = match.group(1) if match else text
+    # Scripts written for the hosted interpreter address /mnt/data explicitly
+    return code.replace("/mnt/data/", "")
+
+
+async def _run_local(request: str, abs_paths) -> tuple[str, list[str]]:
+    """Have the model write a script for *request* and run it in a local worker.
+
+    A script that raises is sent back to the model with its traceback, up to
+    ``LOCAL_CODE_ATTEMPTS`` scripts in total.
+    """
+    client = AsyncOpenAI()
+    runner = local_runner()
+    prompt = f"Request:\n{request}\n\nInput files:\n{_describe_inputs(abs_paths)}"
+    code, error = None, None
+    for _ in range(LOCAL_CODE_ATTEMPTS):
+        if code is not None:
+            prompt += (
+                f"\n\nYour previous script failed:\n```python\n{code}\n```\n"
+                f"Error:\n{error}\nReturn a corrected script."
+            )
+        resp = await client.responses.create(
+            model=CODE_INTERPRETER_MODEL,
+            instructions=LOCAL_CODE_INSTRUCTIONS,
+            input=prompt,
+            temperature=0,
+        )
+        code = _extract_code(resp.output_text)
+        result, workdir = await asyncio.to_thread(runner.run, code, abs_paths)
+        try:
+            if result["ok"]:
+                files = []
+                for name in result["files"]:
+                    out_path = output_file(name)
+                    shutil.move(workdir / name, out_path)
+                    files.append(str(out_path))
+                return result["stdout"], files
+            error = result["error"]
+        finally:
+            runner.cleanup(workdir)
+    raise ValueError(f"The generated analysis code failed: {error}")
+
+
 @function_tool(failure_error_function=code_interpreter_error_handler)
-def run_code_interpreter(request: str, input_files: list[str]) -> str:
+async def run_code_interpreter(request: str, input_files: list[str]) -> str:
     """
-    Executes a quantitative analysis request using OpenAI's Code Interpreter (cloud).
+    Executes a quantitative analysis request using OpenAI's Code Interpreter (cloud),
+    or local worker processes when ``CODE_INTERPRETER_BACKEND`` is "local".
 
     Args:
         request (str): A clear, quantitative analysis request describing the specific computation, statistical analysis, or visualization to perform on the provided data.
@@ -55,76 +274,24 @@ def run_code_interpreter(request: str, input_files: list[str]) -> str:
             "'input_files' must be a non-empty list of file paths (strings) relative to outputs/."
         )
 
-    client = OpenAI()
-    file_ids = []
+    abs_paths = []
     for file_path in input_files:
-        abs_path = output_file(file_path, make_parents=False)
+        abs_path = find_output(file_path)
         if not abs_path.exists():
             raise ValueError(
                 f"File not found: {file_path}. "
                 "Use the list_output_files tool to see which files exist, "
                 "and the read_file tool to see the contents of CSV files."
             )
-        with abs_path.open("rb") as f:
-            uploaded = client.files.create(file=f, purpose="user_data")
-            file_ids.append(uploaded.id)
+        abs_paths.append(abs_path)
 
-    instructions = CODE_INTERPRETER_INSTRUCTIONS
+    if CODE_INTERPRETER_BACKEND == "local":
+        output_text, downloaded_files = await _run_local(request, abs_paths)
+    else:
+        output_text, downloaded_files = await _run_cloud(request, abs_paths)
 
-    MAX_RETRIES = 3
-    attempt = 0
-    while True:
-        try:
-            resp = client.responses.create(
-                model=CODE_INTERPRETER_MODEL,
-                tools=[
-                    {
-                        "type": "code_interpreter",
-                        "container": {"type": "auto", "file_ids": file_ids},
-                    }
-                ],
-                instructions=instructions,
-                input=request,
-                temperature=0,
-            )
-            break  # Success
-        except Exception as e:
-            attempt += 1
-            if attempt >= MAX_RETRIES:
-                raise
-            # Simple back-off; could be enhanced.
-            continue
-
-    output_text = resp.output_text
-    # Extract container_id
-    raw = resp.model_dump() if hasattr(resp, "model_dump") else resp.__dict__
-    container_id = None
-    if "output" in raw:
-        for item in raw["output"]:
-            if item.get("type") == "code_interpreter_call" and "container_id" in item:
-                container_id = item["container_id"]
-
-    # Download any new files
-    downloaded_files = []
-    if container_id:
-        api_key = os.environ["OPENAI_API_KEY"]
-        url = f"https://api.openai.com/v1/containers/{container_id}/files"
-        headers = {"Authorization": f"Bearer {api_key}"}
-        resp_files = requests.get(url, headers=headers)
-        resp_files.raise_for_status()
-        files = resp_files.json().get("data", [])
-        for f in files:
-            # Only download files not from user (i.e., generated)
-            if f["source"] != "user":
-                filename = f.get("path", "").split("/")[-1]
-                cfile_id = f["id"]
-                url_download = f"https://api.openai.com/v1/containers/{container_id}/files/{cfile_id}/content"
-                resp_download = requests.get(url_download, headers=headers)
-                resp_download.raise_for_status()
-                out_path = output_file(filename)
-                with open(out_path, "wb") as out:
-                    out.write(resp_download.content)
-                downloaded_files.append(str(out_path))
+    for path in downloaded_files:
+        await asyncio.to_thread(record_output, path, "run_code_interpreter")
 
     # If no files were downloaded, raise error with <reason> tag if present
     if not downloaded_files:
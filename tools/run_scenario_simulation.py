@@ -0,0 +1,181 @@
+import json
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from agents import function_tool
+from settings import MC_CHUNK_PATHS, QUANT_PROCESS_WORKERS
+from tools.monte_carlo import SimulationSpec, simulate
+from tools.process_pool import process_pool
+from tools.quant_analytics import save_analysis_csv, beta_to, load_price_frame
+from utils import compact_stem
+
+PERCENTILES = [5, 25, 50, 75, 95]
+
+
+def _rate_overlay(
+    prices: pd.DataFrame, rate_series_file: str, shock_bps: float, steps: int
+) -> tuple[np.ndarray, dict]:
+    """Per-step log-return shift implied by a rate shock of *shock_bps*.
+
+    Each asset's sensitivity is the beta of its log returns to changes in the
+    rate series, measured between consecutive observations of the series (so
+    monthly series are not diluted by forward-filled days).  The shock's
+    impact on log price is spread evenly over the horizon.
+    """
+    rates = load_price_frame([rate_series_file]).iloc[:, 0].dropna()
+    at_obs = prices.reindex(rates.index, method="ffill")
+    log_r = np.log(at_obs / at_obs.shift(1)).to_numpy()
+    changes = rates.diff().to_numpy()
+    betas, _ = beta_to(log_r, changes)
+    betas = np.nan_to_num(betas)
+    impact = betas * shock_bps / 100.0  # series are quoted in percent
+    return impact / steps, {
+        "series": str(rates.name),
+        "shock_bps": shock_bps,
+        "sensitivity_per_pp": {
+            t: round(float(b), 6) for t, b in zip(prices.columns, betas)
+        },
+        "log_price_impact": {
+            t: round(float(i), 6) for t, i in zip(prices.columns, impact)
+        },
+    }
+
+
+@function_tool
+def run_scenario_simulation(
+    files: List[str],
+    weights: Optional[List[float]] = None,
+    model: str = "gbm",
+    n_paths: int = 10000,
+    horizon_days: int = 252,
+    seed: int = 42,
+    block_size: int = 5,
+    rate_series_file: str = "",
+    rate_shock_bps: float = 0.0,
+) -> str:
+    """Runs a Monte Carlo simulation of correlated price paths for a portfolio.
+
+    Args:
+        files: Price files in outputs/ (single-ticker histories or batch price files).
+        weights: Portfolio weights per ticker in file order; equal weights if omitted.
+        model: "gbm" (correlated normal log returns with historical mean and
+            covariance) or "bootstrap" (resampled blocks of historical return days).
+        n_paths: Number of simulated paths (up to 100000).
+        horizon_days: Trading days to simulate.
+        seed: Random seed; the same inputs and seed give the same result.
+        block_size: Days per resampled block for the bootstrap model.
+        rate_series_file: Optional FRED file in outputs/ (e.g. "DGS10_...csv") for a
+            rate-shock overlay; each asset's historical sensitivity to changes in the
+            series scales the shock.
+        rate_shock_bps: Rate shock in basis points (e.g. 100 for +1pp) applied
+            gradually over the horizon.
+
+    Returns:
+        str: JSON with terminal portfolio percentiles, probability of loss, VaR/CVaR
+        at 95%, per-ticker terminal return percentiles, and the name of a CSV with
+        the portfolio percentile bands per day.
+    """
+    try:
+        model = model.strip().lower()
+        if model not in ("gbm", "bootstrap"):
+            return json.dumps({"error": "model must be 'gbm' or 'bootstrap'"})
+        if not 1 <= n_paths <= 100000 or horizon_days < 1:
+            return json.dumps(
+                {"error": "n_paths must be 1-100000 and horizon_days positive"}
+            )
+
+        prices = load_price_frame(files).dropna()
+        if len(prices) < 30:
+            return json.dumps(
+                {
+                    "error": "Fewer than 30 overlapping prices across the files",
+                    "tickers": list(prices.columns),
+                }
+            )
+        tickers = list(prices.columns)
+        w = (
+            np.full(len(tickers), 1.0 / len(tickers))
+            if not weights
+            else np.array(weights, dtype=float)
+        )
+        if w.shape[0] != len(tickers):
+            return json.dumps(
+                {"error": f"Expected {len(tickers)} weights for {tickers}"}
+            )
+        w = w / w.sum()
+
+        history = np.diff(np.log(prices.to_numpy()), axis=0)
+        spec = SimulationSpec(
+            model=model, steps=horizon_days, weights=w, block_size=block_size
+        )
+        if model == "gbm":
+            cov = np.atleast_2d(np.cov(history, rowvar=False))
+            # Small jitter keeps nearly collinear assets (e.g. GOOG/GOOGL) factorable
+            cov += np.eye(len(tickers)) * 1e-12
+            spec.mean = history.mean(axis=0)
+            spec.chol = np.linalg.cholesky(cov)
+        else:
+            spec.history = history
+
+        overlay_info = None
+        if rate_series_file and rate_shock_bps:
+            spec.overlay, overlay_info = _rate_overlay(
+                prices, rate_series_file, rate_shock_bps, horizon_days
+            )
+
+        executor = process_pool() if QUANT_PROCESS_WORKERS > 1 else None
+        portfolio, terminal = simulate(
+            spec, n_paths, seed=seed, chunk_paths=MC_CHUNK_PATHS, executor=executor
+        )
+
+        bands = np.percentile(portfolio, PERCENTILES, axis=0).T
+        band_df = pd.DataFrame(
+            bands,
+            index=pd.RangeIndex(1, horizon_days + 1, name="Day"),
+            columns=[f"P{p}" for p in PERCENTILES],
+        )
+        band_df["Mean"] = portfolio.mean(axis=0)
+        file_name = save_analysis_csv(
+            band_df,
+            f"{compact_stem(tickers)}_{model}_{n_paths}x{horizon_days}_scenarios.csv",
+            tool="run_scenario_simulation",
+        )
+
+        final = portfolio[:, -1] - 1.0
+        var95 = -np.percentile(final, 5)
+        tail = final[final <= -var95]
+        asset_pct = np.percentile(terminal - 1.0, PERCENTILES, axis=0)
+        return json.dumps(
+            {
+                "file": file_name,
+                "model": model,
+                "tickers": tickers,
+                "weights": [round(float(x), 6) for x in w],
+                "paths": n_paths,
+                "horizon_days": horizon_days,
+                "history": {
+                    "start": str(prices.index[0].date()),
+                    "end": str(prices.index[-1].date()),
+                    "days": int(history.shape[0]),
+                },
+                "portfolio_return_percentiles": {
+                    f"P{p}": round(float(v), 6)
+                    for p, v in zip(PERCENTILES, np.percentile(final, PERCENTILES))
+                },
+                "expected_return": round(float(final.mean()), 6),
+                "probability_of_loss": round(float((final < 0).mean()), 6),
+                "var_95": round(float(var95), 6),
+                "cvar_95": round(float(-tail.mean()), 6) if tail.size else None,
+                "ticker_return_percentiles": {
+                    t: {
+                        f"P{p}": round(float(asset_pct[i, j]), 6)
+                        for i, p in enumerate(PERCENTILES)
+                    }
+                    for j, t in enumerate(tickers)
+                },
+                "rate_shock": overlay_info,
+            }
+        )
+    except Exception as e:
+        return json.dumps({"error": str(e), "files": files})
@@ -0,0 +1,88 @@
+"""Partial reads of Markdown and text files for ``read_file``.
+
+Reports and section drafts grow with every run; agents usually need one
+section or a quick look at the structure, not the whole document.  Files are
+streamed line by line, so only the requested part is held in memory.
+"""
+
+from __future__ import annotations
+
+import itertools
+import re
+from pathlib import Path
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+
+
+def _lines(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        yield from f
+
+
+def _headings(path: Path):
+    """Yield ``(line_no, level, title, line_chars)`` for every line; level is 0
+    for lines that are not headings (including lines inside code fences)."""
+    in_fence = False
+    for i, line in enumerate(_lines(path)):
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else _HEADING.match(line)
+        if match:
+            yield i, len(match.group(1)), match.group(2), len(line)
+        else:
+            yield i, 0, None, len(line)
+
+
+def outline(path: Path) -> dict:
+    """Headings with their line number and the size of the section under them.
+
+    A section runs until the next heading of the same or a higher level, so
+    sizes include subsections.
+    """
+    sections, open_ = [], []
+    total_lines = total_chars = 0
+    for i, level, title, chars in _headings(path):
+        total_lines, total_chars = i + 1, total_chars + chars
+        if level:
+            while open_ and open_[-1]["level"] >= level:
+                open_.pop()
+            entry = {"level": level, "title": title, "line": i, "lines": 0, "chars": 0}
+            sections.append(entry)
+            open_.append(entry)
+        for entry in open_:
+            entry["lines"] += 1
+            entry["chars"] += chars
+    return {"lines": total_lines, "chars": total_chars, "headings": sections}
+
+
+def read_section(path: Path, heading: str) -> tuple[str, dict] | None:
+    """Text of the first section whose heading contains *heading* (case-insensitive)."""
+    wanted = heading.strip().lstrip("#").strip().lower()
+    parts, level, start = [], None, None
+    with open(path, "r", encoding="utf-8") as f:
+        in_fence = False
+        for i, line in enumerate(f):
+            if _FENCE.match(line):
+                in_fence = not in_fence
+            match = None if in_fence else _HEADING.match(line)
+            if level is None:
+                if match and wanted in match.group(2).lower():
+                    level, start = len(match.group(1)), i
+                    parts.append(line)
+                continue
+            if match and len(match.group(1)) <= level:
+                break
+            parts.append(line)
+    if level is None:
+        return None
+    return "".join(parts), {"line": start, "lines": len(parts)}
+
+
+def read_lines(path: Path, start: int, count: int) -> tuple[str, bool]:
+    """Lines ``start`` to ``start + count`` (0-based) and whether more follow."""
+    lines = _lines(path)
+    chunk = list(itertools.islice(lines, start, start + count + 1))
+    more = len(chunk) > count
+    lines.close()
+    return "".join(chunk[:count]), more
@@ -0,0 +1,116 @@
+"""In-memory index of known-good and known-bad ticker symbols.
+
+Answers "does this ticker exist?" without a network request.  Results learned
+from real fetches are persisted to a small JSON file (shared by every MCP
+server process) with separate expiry for positive and negative entries.
+Symbols from a local symbol list are treated as permanently valid.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+
+def normalise(ticker: str) -> str:
+    return ticker.strip().upper()
+
+
+def read_symbol_list(path: str | Path) -> list[str]:
+    """Read symbols from a text file (one per line) or a CSV with a Symbol column."""
+    path = Path(path)
+    if not path.is_file():
+        logger.warning(f"Ticker symbol list {path} not found; skipping seed")
+        return []
+    lines = path.read_text(encoding="utf-8").splitlines()
+    if not lines:
+        return []
+    header = [h.strip().lower() for h in lines[0].split(",")]
+    if "symbol" in header:
+        col = header.index("symbol")
+        return [
+            parts[col]
+            for parts in (line.split(",") for line in lines[1:])
+            if len(parts) > col and parts[col].strip()
+        ]
+    return [
+        line.split(",")[0]
+        for line in lines
+        if line.strip() and not line.startswith("#")
+    ]
+
+
+class TickerIndex:
+    """Cached ticker existence checks with expiry."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        valid_ttl: int,
+        invalid_ttl: int,
+        seed_symbols: Iterable[str] = (),
+    ):
+        self.path = Path(path)
+        self.valid_ttl = valid_ttl
+        self.invalid_ttl = invalid_ttl
+        self._seed = {normalise(s) for s in seed_symbols if s and s.strip()}
+        # ticker -> (valid, expires_at)
+        self._entries: dict[str, tuple[bool, float]] = {}
+        self._mtime = 0.0
+        self._lock = threading.Lock()
+        self._reload()
+
+    def _reload(self) -> None:
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            raw = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        self._entries.update({t: (bool(v), float(exp)) for t, (v, exp) in raw.items()})
+        self._mtime = mtime
+
+    def _persist(self) -> None:
+        now = time.time()
+        live = {t: e for t, e in self._entries.items() if e[1] > now}
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(live))
+        os.replace(tmp, self.path)
+        self._mtime = self.path.stat().st_mtime
+
+    def lookup(self, ticker: str) -> bool | None:
+        """Return True/False if the ticker's existence is known, else None."""
+        ticker = normalise(ticker)
+        if ticker in self._seed:
+            return True
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is None or entry[1] <= time.time():
+                # Another server process may have learned about it meanwhile
+                self._reload()
+                entry = self._entries.get(ticker)
+            if entry is None or entry[1] <= time.time():
+                return None
+            return entry[0]
+
+    def record(self, ticker: str, valid: bool) -> None:
+        ticker = normalise(ticker)
+        if valid and ticker in self._seed:
+            return
+        ttl = self.valid_ttl if valid else self.invalid_ttl
+        with self._lock:
+            self._reload()
+            self._entries[ticker] = (valid, time.time() + ttl)
+            self._persist()
@@ -0,0 +1,112 @@
+"""Content-addressed cache of files uploaded for the Code Interpreter.
+
+Maps ``(sha256 of the file contents, file name)`` to the OpenAI ``file_id`` it
+was uploaded as, so repeated code interpreter calls over the same CSVs reuse
+the earlier upload instead of sending the bytes again.  The name is part of
+the key because the container exposes each upload under its original name.
+
+Entries expire after a fixed TTL.  Uploads are created with a remote expiry a
+little later than that, and expired entries are deleted from OpenAI by the
+caller, so stale files do not accumulate in the account.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    digest TEXT NOT NULL,
+    name TEXT NOT NULL,
+    file_id TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    uploaded_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (digest, name)
+);
+"""
+
+# Remote files outlive their cache entry by this much (seconds), so a file id
+# handed out just before expiry is still valid while the call runs.
+REMOTE_GRACE = 3600
+
+
+def file_digest(path: str | Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class UploadCache:
+    """SQLite-backed ``(digest, name) -> file_id`` map with expiry."""
+
+    def __init__(self, path: str | Path, *, ttl: int = 86400):
+        self.path = Path(path)
+        self.ttl = ttl
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, digest: str, name: str) -> str | None:
+        """Return the cached file id for *digest* / *name* if it has not expired."""
+        row = (
+            self._conn()
+            .execute(
+                "SELECT file_id FROM uploads "
+                "WHERE digest = ? AND name = ? AND expires_at > ?",
+                (digest, name, time.time()),
+            )
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def put(self, digest: str, name: str, file_id: str, size: int) -> None:
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO uploads "
+                "(digest, name, file_id, size, uploaded_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, name, file_id, size, now, now + self.ttl),
+            )
+
+    def pop_expired(self) -> list[str]:
+        """Remove expired entries and return their file ids for remote deletion."""
+        conn = self._conn()
+        now = time.time()
+        with conn:
+            expired = [
+                file_id
+                for (file_id,) in conn.execute(
+                    "SELECT file_id FROM uploads WHERE expires_at <= ?", (now,)
+                ).fetchall()
+            ]
+            conn.execute("DELETE FROM uploads WHERE expires_at <= ?", (now,))
+        return expired
+
+
+def default_upload_cache() -> UploadCache:
+    """Return a cache configured from ``settings.py`` under the shared cache dir."""
+    from settings import CODE_INTERPRETER_UPLOAD_TTL
+    from utils import cache_file
+
+    return UploadCache(
+        cache_file("code_interpreter_uploads.sqlite"),
+        ttl=CODE_INTERPRETER_UPLOAD_TTL,
+    )
@@ -1,5 +1,7 @@
 import json
+import os
 from agents import function_tool
+from tools.output_manifest import record_output
 from utils import output_file
 
 
@@ -9,6 +11,10 @@ def write_markdown(filename: str, content: str) -> str:
     if not filename.endswith(".md"):
         filename += ".md"
     path = output_file(filename)
-    with open(path, "w", encoding="utf-8") as f:
+    # Write-then-rename so readers never see a partial file
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.part")
+    with open(tmp_path, "w", encoding="utf-8") as f:
         f.write(content)
+    os.replace(tmp_path, path)
+    record_output(path, "write_markdown")
     return json.dumps({"file": filename})
@@ -0,0 +1,197 @@
+"""Shared HTTP session, rate limiting and bounded execution for Yahoo Finance calls.
+
+yfinance is synchronous, so the MCP tools run it on worker threads.  This
+module provides:
+
+* ``ThrottledSession`` – one pooled HTTP session handed to every ``yf.Ticker``
+  and ``yf.download`` call.  Each request passes through a token-bucket rate
+  limiter and a per-host concurrency cap, and checks whether the tool call it
+  belongs to has been cancelled.
+* ``YahooExecutor`` – a bounded thread pool that runs tool functions with a
+  timeout.  A timed-out call is cancelled cooperatively: its next HTTP request
+  (or rate-limiter wait) raises ``YahooCallCancelled`` so the worker thread
+  is released instead of running on in the background.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+try:  # yfinance prefers curl_cffi (browser TLS impersonation) when available
+    from curl_cffi import requests as _http  # type: ignore
+
+    _SESSION_KWARGS = {"impersonate": "chrome"}
+except ImportError:  # pragma: no cover – fallback backend
+    import requests as _http  # type: ignore
+
+    _SESSION_KWARGS = {}
+
+logger = logging.getLogger(__name__)
+
+
+class YahooCallCancelled(RuntimeError):
+    """Raised inside a worker thread once its tool call has timed out."""
+
+
+class _CallState:
+    def __init__(self, name: str):
+        self.name = name
+        self.cancelled = threading.Event()
+        self.finished = False
+        self.orphaned = False  # still running in its worker after the caller gave up
+
+    def check(self) -> None:
+        if self.cancelled.is_set():
+            raise YahooCallCancelled(f"{self.name} was cancelled after timing out")
+
+
+# The tool call running in the current worker thread (if any)
+_current_call: contextvars.ContextVar[_CallState | None] = contextvars.ContextVar(
+    "yahoo_current_call", default=None
+)
+
+
+def _check_cancelled() -> None:
+    state = _current_call.get()
+    if state is not None:
+        state.check()
+
+
+class TokenBucket:
+    """Thread-safe token bucket: *rate* tokens per second, up to *burst* stored."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            _check_cancelled()
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            # Sleep in short slices so cancellation is noticed promptly
+            time.sleep(min(wait, 0.25))
+
+
+class ThrottledSession(_http.Session):
+    """HTTP session that rate-limits and caps per-host concurrency for every request."""
+
+    def __init__(self, *, rate_limiter: TokenBucket, max_per_host: int, **kwargs):
+        super().__init__(**{**_SESSION_KWARGS, **kwargs})
+        self._rate_limiter = rate_limiter
+        self._host_slots: dict[str, threading.BoundedSemaphore] = defaultdict(
+            lambda: threading.BoundedSemaphore(max_per_host)
+        )
+        self._host_slots_lock = threading.Lock()
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(str(url)).hostname or ""
+        with self._host_slots_lock:
+            return self._host_slots[host]
+
+    def request(self, method, url, *args, **kwargs):
+        self._rate_limiter.acquire()
+        slot = self._slot(url)
+        while not slot.acquire(timeout=0.25):
+            _check_cancelled()
+        try:
+            _check_cancelled()
+            return super().request(method, url, *args, **kwargs)
+        finally:
+            slot.release()
+
+
+class YahooExecutor:
+    """Bounded thread pool with timeouts, cooperative cancellation and accounting."""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="yahoo"
+        )
+        self._lock = threading.Lock()
+        self._counts = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "cancelled_in_worker": 0,
+            "running": 0,
+            "running_after_timeout": 0,
+        }
+
+    def _bump(self, **deltas: int) -> None:
+        with self._lock:
+            for key, delta in deltas.items():
+                self._counts[key] += delta
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"max_workers": self.max_workers, **self._counts}
+
+    def _invoke(self, state: _CallState, func, args):
+        _current_call.set(state)
+        self._bump(running=1)
+        try:
+            result = func(*args)
+        except YahooCallCancelled:
+            self._bump(cancelled_in_worker=1)
+            raise
+        except Exception:
+            self._bump(failed=1)
+            raise
+        else:
+            self._bump(completed=1)
+            return result
+        finally:
+            with self._lock:
+                state.finished = True
+                self._counts["running"] -= 1
+                if state.orphaned:
+                    self._counts["running_after_timeout"] -= 1
+
+    async def run(self, func, *args, timeout: float):
+        """Run ``func(*args)`` on the pool, cancelling it if *timeout* elapses."""
+        state = _CallState(getattr(func, "__name__", "yahoo call"))
+        ctx = contextvars.copy_context()
+        self._bump(submitted=1)
+        cfuture = self._pool.submit(ctx.run, self._invoke, state, func, args)
+        afuture = asyncio.wrap_future(cfuture)
+        # Retrieve late results/errors of abandoned calls so they are not logged as unhandled
+        afuture.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            return await asyncio.wait_for(asyncio.shield(afuture), timeout=timeout)
+        except asyncio.TimeoutError:
+            state.cancelled.set()
+            # Never started: drop it from the queue.  Otherwise the worker stops
+            # at its next HTTP request; count it until it actually returns.
+            if not cfuture.cancel():
+                with self._lock:
+                    if not state.finished:
+                        state.orphaned = True
+                        self._counts["running_after_timeout"] += 1
+            self._bump(timed_out=1)
+            logger.warning(
+                f"{state.name} timed out after {timeout}s; stats={self.stats()}"
+            )
+            raise
@@ -1,17 +1,47 @@
+import sys
+import io
 import json
-import uuid
 import asyncio
 import logging
+from contextlib import ExitStack
 import pandas as pd
 import yfinance as yf
 from enum import Enum
 from pathlib import Path
 from mcp.server.fastmcp import FastMCP
 
-
 # Helper to ensure outputs dir exists and return path (repo root)
 _REPO_ROOT = Path(__file__).resolve().parent.parent
 
+# Allow `tools.*` / `settings` imports when launched as `python tools/yahoo_finance_mcp.py`
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+from settings import (  # noqa: E402
+    DATASET_REGISTRY,
+    MARKET_CACHE_TTLS,
+    OUTPUT_TABLE_FORMAT,
+    TICKER_INDEX_INVALID_TTL,
+    TICKER_INDEX_VALID_TTL,
+    TICKER_SYMBOLS_FILE,
+    YAHOO_MAX_PER_HOST,
+    YAHOO_MAX_WORKERS,
+    YAHOO_RATE_BURST,
+    YAHOO_RATE_LIMIT,
+    YAHOO_TOOL_TIMEOUT,
+)
+from tools import blob_store, dataset_registry  # noqa: E402
+from tools.market_cache import default_market_cache  # noqa: E402
+from tools.output_manifest import record_output  # noqa: E402
+from tools.price_store import PriceHistoryStore  # noqa: E402
+from tools.ticker_index import TickerIndex, read_symbol_list  # noqa: E402
+from tools.yahoo_client import (  # noqa: E402
+    ThrottledSession,
+    TokenBucket,
+    YahooExecutor,
+)
+from utils import cache_dir, cache_file, compact_stem, repo_path  # noqa: E402
+
 # Single shared outputs folder at the repository root
 OUTPUTS_DIR = _REPO_ROOT / "outputs"
 
@@ -20,35 +50,174 @@ OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
 
 logger = logging.getLogger(__name__)
 
+# Persistent cache shared by every server process (see tools/market_cache.py)
+market_cache = default_market_cache()
+
+# Canonical per-ticker price histories refreshed with delta fetches
+price_store = PriceHistoryStore(
+    cache_dir() / "prices", refresh_after=MARKET_CACHE_TTLS["quotes"]
+)
+
+# Ticker existence answered in-memory; seeded from the symbol list and the price store
+ticker_index = TickerIndex(
+    cache_file("ticker_index.json"),
+    valid_ttl=TICKER_INDEX_VALID_TTL,
+    invalid_ttl=TICKER_INDEX_INVALID_TTL,
+    seed_symbols=[
+        *(
+            read_symbol_list(repo_path(TICKER_SYMBOLS_FILE))
+            if TICKER_SYMBOLS_FILE
+            else []
+        ),
+        *price_store.tickers(),
+    ],
+)
+
+
+# One pooled, rate-limited HTTP session for every yfinance request in this process
+yahoo_session = ThrottledSession(
+    rate_limiter=TokenBucket(YAHOO_RATE_LIMIT, YAHOO_RATE_BURST),
+    max_per_host=YAHOO_MAX_PER_HOST,
+)
+
+# Bounded worker pool for the synchronous yfinance calls
+yahoo_executor = YahooExecutor(YAHOO_MAX_WORKERS)
+
+
+def _yf_ticker(ticker):
+    return yf.Ticker(ticker, session=yahoo_session)
+
+
+async def _run_tool(func, *args, timeout_error, timeout=YAHOO_TOOL_TIMEOUT):
+    """Run a sync tool on the Yahoo executor, mapping failures to error JSON."""
+    try:
+        return await yahoo_executor.run(func, *args, timeout=timeout)
+    except asyncio.TimeoutError:
+        return json.dumps({"error": timeout_error})
+    except Exception as e:
+        return json.dumps({"error": str(e)})
+
+
+class TickerNotFoundError(LookupError):
+    """Raised inside a fetch when Yahoo Finance does not know the ticker."""
+
+
+def _is_empty_result(result):
+    if result is None:
+        return True
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return result.empty
+    if isinstance(result, dict):
+        # Unknown symbols yield a near-empty info dict rather than an error
+        return len(result) <= 1
+    if isinstance(result, (list, tuple)):
+        return len(result) == 0
+    return False
+
+
+def _fetch_validated(ticker, fetch):
+    """Fetch data for *ticker*, validating the symbol as part of the same request.
+
+    *fetch* is a `yf.Ticker` attribute name or a callable taking the `yf.Ticker`.
+    Known tickers skip validation entirely; for unknown ones the existence
+    check (`isin`) is only issued when the fetch itself comes back empty or
+    fails, since only then is it ambiguous.
+    """
+    known = ticker_index.lookup(ticker)
+    if known is False:
+        raise TickerNotFoundError(ticker)
+    company = _yf_ticker(ticker)
+    try:
+        result = fetch(company) if callable(fetch) else getattr(company, fetch)
+    except Exception:
+        if known is None and company.isin is None:
+            ticker_index.record(ticker, False)
+            raise TickerNotFoundError(ticker)
+        raise
+    if known is None:
+        valid = not _is_empty_result(result) or company.isin is not None
+        ticker_index.record(ticker, valid)
+        if not valid:
+            raise TickerNotFoundError(ticker)
+    return result
+
+
+def _ticker_not_found(ticker):
+    logger.error(f"Company ticker {ticker} not found.")
+    return json.dumps({"error": f"Company ticker {ticker} not found."})
+
+
+def _cached_fetch(tool, data_type, fetch, **params):
+    """Serve *tool* / *params* from the market cache, calling *fetch* on a miss."""
+    return market_cache.get_or_fetch(tool, data_type, fetch, **params)
+
+
 # ---------------------------------------------------------------------------
 # Helper: write DataFrame to <repo>/outputs and strip any timezone info
 # ---------------------------------------------------------------------------
 
 
 def _strip_tz(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
-    for col in out.select_dtypes(include=["datetimetz"]).columns:
+    tz_columns = df.select_dtypes(include=["datetimetz"]).columns
+    if tz_columns.empty:
+        return df
+    # Shallow copy: only the converted columns are new
+    out = df.copy(deep=False)
+    for col in tz_columns:
         out[col] = out[col].dt.tz_localize(None)
     return out
 
 
-def save_df_to_csv(df, base_name):
+def _serialize(df: pd.DataFrame, base_name: str) -> tuple[str, bytes]:
+    """Encode *df* in ``OUTPUT_TABLE_FORMAT``; returns ``(suffix, payload)``."""
+    if OUTPUT_TABLE_FORMAT == "parquet":
+        buffer = io.BytesIO()
+        try:
+            df.rename(columns=str).to_parquet(buffer, index=False)
+            return ".parquet", buffer.getvalue()
+        except (ImportError, ValueError, TypeError, NotImplementedError) as e:
+            # No pyarrow, or columns Arrow cannot type (mixed objects)
+            logger.warning("Writing %s as CSV instead of Parquet: %s", base_name, e)
+    return ".csv", df.to_csv(index=False).encode()
+
+
+def _register(df, base_name, overwrite, tool, tickers):
+    """Register *df* in the dataset registry; returns the output path or None."""
+    suffix = ".parquet" if OUTPUT_TABLE_FORMAT == "parquet" else ".csv"
+    try:
+        table = dataset_registry.to_table(df)
+    except (ImportError, ValueError, TypeError, NotImplementedError) as e:
+        logger.warning("Writing %s as a file instead of a dataset: %s", base_name, e)
+        return None
+    name, _ = dataset_registry.default_dataset_registry().put(
+        table, f"{base_name}{suffix}", tool=tool, tickers=tickers, overwrite=overwrite
+    )
+    return OUTPUTS_DIR / name
+
+
+def save_dataframe(df, base_name, overwrite=False, tool=None, tickers=None):
     df_clean = _strip_tz(df)
-    file_path = OUTPUTS_DIR / f"{base_name}.csv"
-    if file_path.exists():
-        unique_id = uuid.uuid4().hex[:8]
-        file_path = OUTPUTS_DIR / f"{base_name}_{unique_id}.csv"
-    df_clean.to_csv(file_path, index=False)
+    if DATASET_REGISTRY:
+        # No file is written until a tool needs one (see utils.find_output)
+        file_path = _register(df_clean, base_name, overwrite, tool, tickers)
+        if file_path is not None:
+            return str(file_path), list(df_clean.columns)
+    suffix, payload = _serialize(df_clean, base_name)
+    # Identical data maps to the existing file; nothing is rewritten
+    file_path, written = blob_store.store(
+        OUTPUTS_DIR, base_name, suffix, payload, overwrite=overwrite
+    )
+    if written:
+        record_output(file_path, tool, tickers)
     return str(file_path), list(df_clean.columns)
 
 
-def save_json_to_file(data, base_name):
-    file_path = OUTPUTS_DIR / f"{base_name}.json"
-    if file_path.exists():
-        unique_id = uuid.uuid4().hex[:8]
-        file_path = OUTPUTS_DIR / f"{base_name}_{unique_id}.json"
-    with open(file_path, "w") as f:
-        json.dump(data, f, indent=2)
+def save_json_to_file(data, base_name, tool=None, tickers=None):
+    file_path, written = blob_store.store(
+        OUTPUTS_DIR, base_name, ".json", json.dumps(data, indent=2).encode()
+    )
+    if written:
+        record_output(file_path, tool, tickers)
     # Schema: for dict, top-level keys; for list, type of first element or 'list'; else type
     if isinstance(data, dict):
         schema = list(data.keys())
@@ -95,6 +264,7 @@ This server is used to get information about a given ticker symbol from yahoo fi
 
 Available tools:
 - get_historical_stock_prices: Get historical stock prices for a given ticker symbol from yahoo finance. Include the following information: Date, Open, High, Low, Close, Volume, Adj Close.
+- get_historical_stock_prices_batch: Get historical stock prices for several ticker symbols in one request, aligned on a common date index and saved as a single file.
 - get_stock_info: Get stock information for a given ticker symbol from yahoo finance. Include the following information: Stock Price & Trading Info, Company Information, Financial Metrics, Earnings & Revenue, Margins & Returns, Dividends, Balance Sheet, Ownership, Analyst Coverage, Risk Metrics, Other.
 - get_yahoo_finance_news: Get news for a given ticker symbol from yahoo finance.
 - get_stock_actions: Get stock dividends and stock splits for a given ticker symbol from yahoo finance.
@@ -110,18 +280,44 @@ PREVIEW_ROWS = 20
 
 
 # --- Tool: get_historical_stock_prices ---
+def _load_price_history(ticker, period, interval):
+    """Return *period* of bars for *ticker*, fetching only what the store lacks."""
+    with price_store.lock(ticker, interval):
+        mode, start = price_store.plan(ticker, period, interval)
+        if mode == "delta":
+            logger.info(f"Delta refresh of {ticker} {interval} bars from {start}")
+            fetched = _yf_ticker(ticker).history(start=start, interval=interval)
+            if price_store.update(ticker, period, interval, mode, fetched):
+                mode = "full"
+        if mode == "full":
+            fetched = _fetch_validated(
+                ticker,
+                lambda company: company.history(period=period, interval=interval),
+            )
+            if fetched.empty:
+                return fetched
+            price_store.update(ticker, period, interval, mode, fetched)
+        return price_store.slice(ticker, period, interval)
+
+
 def get_historical_stock_prices_sync(ticker, period, interval):
     logger.info(
         f"Called get_historical_stock_prices_sync: ticker={ticker}, period={period}, interval={interval}"
     )
-    company = yf.Ticker(ticker)
-    if company.isin is None:
-        logger.error(f"Company ticker {ticker} not found.")
-        return json.dumps({"error": f"Company ticker {ticker} not found."})
-    hist_data = company.history(period=period, interval=interval)
+    try:
+        hist_data = _load_price_history(ticker, period, interval)
+    except TickerNotFoundError:
+        return _ticker_not_found(ticker)
     hist_data = hist_data.reset_index(names="Date")
+    # Stable name: the file is a slice of the canonical series, so refresh it in place
     file_base = f"{ticker}_{period}_{interval}_historical"
-    file_path, schema = save_df_to_csv(hist_data, file_base)
+    file_path, schema = save_dataframe(
+        hist_data,
+        file_base,
+        overwrite=True,
+        tool="get_historical_stock_prices",
+        tickers=[ticker],
+    )
     preview_json = hist_data.head(PREVIEW_ROWS).to_json(
         orient="records", date_format="iso"
     )
@@ -138,29 +334,159 @@ def get_historical_stock_prices_sync(ticker, period, interval):
 async def get_historical_stock_prices(
     ticker: str, period: str = "1mo", interval: str = "1d"
 ) -> str:
-    loop = asyncio.get_running_loop()
-    try:
-        return await asyncio.wait_for(
-            loop.run_in_executor(
-                None, get_historical_stock_prices_sync, ticker, period, interval
-            ),
-            timeout=30,
+    return await _run_tool(
+        get_historical_stock_prices_sync,
+        ticker,
+        period,
+        interval,
+        timeout_error="Timeout fetching historical stock prices",
+    )
+
+
+# --- Tool: get_historical_stock_prices_batch ---
+def _download(tickers, **kwargs):
+    """One vectorized yfinance request; returns {ticker: DataFrame} for tickers with data."""
+    raw = yf.download(
+        tickers,
+        group_by="column",
+        auto_adjust=True,
+        actions=True,
+        threads=True,
+        progress=False,
+        multi_level_index=True,
+        session=yahoo_session,
+        **kwargs,
+    )
+    frames = {}
+    if raw is None or raw.empty:
+        return frames
+    for t in tickers:
+        if t in raw.columns.get_level_values("Ticker"):
+            frame = raw.xs(t, level="Ticker", axis=1).dropna(how="all")
+            if not frame.empty:
+                frames[t] = frame
+    return frames
+
+
+def _load_price_histories(tickers, period, interval):
+    """Batched counterpart of `_load_price_history`: one download per refresh mode."""
+    with ExitStack() as stack:
+        for t in tickers:
+            stack.enter_context(price_store.lock(t, interval))
+        plans = {t: price_store.plan(t, period, interval) for t in tickers}
+        full = [t for t, (mode, _) in plans.items() if mode == "full"]
+        delta = [t for t, (mode, _) in plans.items() if mode == "delta"]
+        if delta:
+            start = min(plans[t][1] for t in delta)
+            fetched = _download(delta, start=start, interval=interval)
+            for t in delta:
+                if t in fetched and price_store.update(
+                    t, period, interval, "delta", fetched[t]
+                ):
+                    full.append(t)
+        if full:
+            fetched = _download(full, period=period, interval=interval)
+            for t, frame in fetched.items():
+                price_store.update(t, period, interval, "full", frame)
+        return {t: price_store.slice(t, period, interval) for t in tickers}
+
+
+def get_historical_stock_prices_batch_sync(tickers, period, interval, layout="wide"):
+    logger.info(
+        f"Called get_historical_stock_prices_batch_sync: tickers={tickers}, period={period}, interval={interval}, layout={layout}"
+    )
+    if layout not in ["wide", "long"]:
+        return json.dumps({"error": "Invalid layout. Please use 'wide' or 'long'."})
+    tickers = sorted({t.strip().upper() for t in tickers if t and t.strip()})
+    if not tickers:
+        return json.dumps({"error": "Please provide at least one ticker symbol."})
+
+    known = {t: ticker_index.lookup(t) for t in tickers}
+    frames = _load_price_histories(
+        [t for t in tickers if known[t] is not False], period, interval
+    )
+    found = [t for t in frames if not frames[t].empty]
+    missing = [t for t in tickers if t not in found]
+    for t in found:
+        if known[t] is None:
+            ticker_index.record(t, True)
+    if not found:
+        return json.dumps({"error": f"No price data found for tickers {tickers}."})
+
+    if layout == "wide":
+        df = pd.concat(
+            {
+                f"{t}_{field}": frames[t][field]
+                for t in found
+                for field in ["Close", "Volume"]
+            },
+            axis=1,
         )
-    except asyncio.TimeoutError:
-        return json.dumps({"error": "Timeout fetching historical stock prices"})
-    except Exception as e:
-        return json.dumps({"error": str(e)})
+        df = df.dropna(how="all").reset_index(names="Date")
+    else:
+        df = pd.concat({t: frames[t] for t in found}, names=["Ticker", "Date"])
+        df = df.reset_index()
+        df = df[
+            ["Date", "Ticker"] + [c for c in df.columns if c not in ("Date", "Ticker")]
+        ]
+
+    file_base = f"{compact_stem(found)}_{period}_{interval}_{layout}_historical"
+    file_path, schema = save_dataframe(
+        df,
+        file_base,
+        overwrite=True,
+        tool="get_historical_stock_prices_batch",
+        tickers=found,
+    )
+    preview_json = df.head(PREVIEW_ROWS).to_json(orient="records", date_format="iso")
+    logger.info(f"Returning batch historical data for {found}")
+    return json.dumps(
+        {
+            "file_path": file_path,
+            "schema": schema,
+            "tickers": found,
+            "missing_tickers": missing,
+            "rows": len(df),
+            "start": str(df["Date"].min()),
+            "end": str(df["Date"].max()),
+            "preview": json.loads(preview_json),
+        }
+    )
+
+
+@yfinance_server.tool(
+    name="get_historical_stock_prices_batch",
+    description="""Get historical stock prices for several ticker symbols at once (one batched request), aligned on a common date index and written to a single CSV. Prefer this over repeated get_historical_stock_prices calls when comparing tickers, e.g. a stock against SPY and QQQ.\nArgs:\n    tickers: list[str]\n        The ticker symbols, e.g. [\"GOOGL\", \"SPY\", \"QQQ\"]\n    period : str\n        Valid periods: 1d,5d,1mo,3mo,6mo,1y,2y,5y,10y,ytd,max\n        Default is \"1mo\"\n    interval : str\n        Valid intervals: 1m,2m,5m,15m,30m,60m,90m,1h,1d,5d,1wk,1mo,3mo\n        Default is \"1d\"\n    layout : str\n        \"wide\" (default): one row per date with <TICKER>_Close and <TICKER>_Volume columns.\n        \"long\": one row per date and ticker with Ticker, Open, High, Low, Close, Volume columns.\n""",
+)
+async def get_historical_stock_prices_batch(
+    tickers: list[str], period: str = "1mo", interval: str = "1d", layout: str = "wide"
+) -> str:
+    return await _run_tool(
+        get_historical_stock_prices_batch_sync,
+        tickers,
+        period,
+        interval,
+        layout,
+        timeout_error="Timeout fetching batch historical stock prices",
+        timeout=2 * YAHOO_TOOL_TIMEOUT,
+    )
 
 
 # --- Tool: get_stock_info ---
 def get_stock_info_sync(ticker):
     logger.info(f"Called get_stock_info_sync: ticker={ticker}")
-    company = yf.Ticker(ticker)
-    if company.isin is None:
-        logger.error(f"Company ticker {ticker} not found.")
-        return json.dumps({"error": f"Company ticker {ticker} not found."})
-    info = company.info
-    file_path, schema, preview = save_json_to_file(info, f"{ticker}_stock_info")
+    try:
+        info = _cached_fetch(
+            "get_stock_info",
+            "quotes",
+            lambda: _fetch_validated(ticker, "info"),
+            ticker=ticker,
+        )
+    except TickerNotFoundError:
+        return _ticker_not_found(ticker)
+    file_path, schema, preview = save_json_to_file(
+        info, f"{ticker}_stock_info", tool="get_stock_info", tickers=[ticker]
+    )
     logger.info(f"Returning stock info for {ticker}")
     return json.dumps({"file_path": file_path, "schema": schema, "preview": preview})
 
@@ -170,26 +496,23 @@ def get_stock_info_sync(ticker):
     description="""Get stock information for a given ticker symbol from yahoo finance. Include the following information:\nStock Price & Trading Info, Company Information, Financial Metrics, Earnings & Revenue, Margins & Returns, Dividends, Balance Sheet, Ownership, Analyst Coverage, Risk Metrics, Other.\n\nArgs:\n    ticker: str\n        The ticker symbol of the stock to get information for, e.g. \"AAPL\"\n""",
 )
 async def get_stock_info(ticker: str) -> str:
-    loop = asyncio.get_running_loop()
-    try:
-        return await asyncio.wait_for(
-            loop.run_in_executor(None, get_stock_info_sync, ticker), timeout=30
-        )
-    except asyncio.TimeoutError:
-        return json.dumps({"error": "Timeout fetching stock info"})
-    except Exception as e:
-        return json.dumps({"error": str(e)})
+    return await _run_tool(
+        get_stock_info_sync, ticker, timeout_error="Timeout fetching stock info"
+    )
 
 
 # --- Tool: get_yahoo_finance_news ---
 def get_yahoo_finance_news_sync(ticker):
     logger.info(f"Called get_yahoo_finance_news_sync: ticker={ticker}")
-    company = yf.Ticker(ticker)
-    if company.isin is None:
-        logger.error(f"Company ticker {ticker} not found.")
-        return json.dumps({"error": f"Company ticker {ticker} not found."})
     try:
-        news = company.news
+        news = _cached_fetch(
+            "get_yahoo_finance_news",
+            "news",
+            lambda: _fetch_validated(ticker, "news"),
+            ticker=ticker,
+        )
+    except TickerNotFoundError:
+        return _ticker_not_found(ticker)
     except Exception as e:
         logger.error(f"Error getting news for {ticker}: {e}")
         return json.dumps({"error": f"Error: getting news for {ticker}: {e}"})
@@ -213,7 +536,9 @@ def get_yahoo_finance_news_sync(ticker):
         return json.dumps(
             {"error": f"No news found for company that searched with {ticker} ticker."}
         )
-    file_path, schema, preview = save_json_to_file(news_list, f"{ticker}_news")
+    file_path, schema, preview = save_json_to_file(
+        news_list, f"{ticker}_news", tool="get_yahoo_finance_news", tickers=[ticker]
+    )
     logger.info(f"Returning news for {ticker}")
     return json.dumps({"file_path": file_path, "schema": schema, "preview": preview})
 
@@ -223,28 +548,28 @@ def get_yahoo_finance_news_sync(ticker):
     description="""Get news for a given ticker symbol from yahoo finance.\n\nArgs:\n    ticker: str\n        The ticker symbol of the stock to get news for, e.g. \"AAPL\"\n""",
 )
 async def get_yahoo_finance_news(ticker: str) -> str:
-    loop = asyncio.get_running_loop()
-    try:
-        return await asyncio.wait_for(
-            loop.run_in_executor(None, get_yahoo_finance_news_sync, ticker), timeout=30
-        )
-    except asyncio.TimeoutError:
-        return json.dumps({"error": "Timeout fetching news"})
-    except Exception as e:
-        return json.dumps({"error": str(e)})
+    return await _run_tool(
+        get_yahoo_finance_news_sync, ticker, timeout_error="Timeout fetching news"
+    )
 
 
 # --- Tool: get_stock_actions ---
 def get_stock_actions_sync(ticker):
     logger.info(f"Called get_stock_actions_sync: ticker={ticker}")
     try:
-        company = yf.Ticker(ticker)
+        actions_df = _cached_fetch(
+            "get_stock_actions",
+            "actions",
+            lambda: _yf_ticker(ticker).actions,
+            ticker=ticker,
+        )
     except Exception as e:
         logger.error(f"Error getting stock actions for {ticker}: {e}")
         return json.dumps({"error": f"Error: getting stock actions for {ticker}: {e}"})
-    actions_df = company.actions
     actions_df = actions_df.reset_index(names="Date")
-    file_path, schema = save_df_to_csv(actions_df, f"{ticker}_actions")
+    file_path, schema = save_dataframe(
+        actions_df, f"{ticker}_actions", tool="get_stock_actions", tickers=[ticker]
+    )
     preview_json = actions_df.head(PREVIEW_ROWS).to_json(
         orient="records", date_format="iso"
     )
@@ -259,15 +584,9 @@ def get_stock_actions_sync(ticker):
     description="""Get stock dividends and stock splits for a given ticker symbol from yahoo finance.\n\nArgs:\n    ticker: str\n        The ticker symbol of the stock to get stock actions for, e.g. \"AAPL\"\n""",
 )
 async def get_stock_actions(ticker: str) -> str:
-    loop = asyncio.get_running_loop()
-    try:
-        return await asyncio.wait_for(
-            loop.run_in_executor(None, get_stock_actions_sync, ticker), timeout=30
-        )
-    except asyncio.TimeoutError:
-        return json.dumps({"error": "Timeout fetching stock actions"})
-    except Exception as e:
-        return json.dumps({"error": str(e)})
+    return await _run_tool(
+        get_stock_actions_sync, ticker, timeout_error="Timeout fetching stock actions"
+    )
 
 
 # --- Tool: get_financial_statement ---
@@ -275,31 +594,31 @@ def get_financial_statement_sync(ticker, financial_type):
     logger.info(
         f"Called get_financial_statement_sync: ticker={ticker}, financial_type={financial_type}"
     )
-    company = yf.Ticker(ticker)
-    if company.isin is None:
-        logger.error(f"Company ticker {ticker} not found.")
-        return json.dumps({"error": f"Company ticker {ticker} not found."})
-    if financial_type == FinancialType.income_stmt:
-        financial_statement = company.income_stmt
-    elif financial_type == FinancialType.quarterly_income_stmt:
-        financial_statement = company.quarterly_income_stmt
-    elif financial_type == FinancialType.balance_sheet:
-        financial_statement = company.balance_sheet
-    elif financial_type == FinancialType.quarterly_balance_sheet:
-        financial_statement = company.quarterly_balance_sheet
-    elif financial_type == FinancialType.cashflow:
-        financial_statement = company.cashflow
-    elif financial_type == FinancialType.quarterly_cashflow:
-        financial_statement = company.quarterly_cashflow
-    else:
+    # Enum values double as the `yf.Ticker` attribute names
+    if financial_type not in [t.value for t in FinancialType]:
         logger.error(f"Invalid financial type {financial_type} for {ticker}.")
         return json.dumps(
             {
                 "error": f"Error: invalid financial type {financial_type}. Please use one of the following: {list(FinancialType)}."
             }
         )
+    try:
+        financial_statement = _cached_fetch(
+            "get_financial_statement",
+            "statements",
+            lambda: _fetch_validated(ticker, financial_type),
+            ticker=ticker,
+            financial_type=financial_type,
+        )
+    except TickerNotFoundError:
+        return _ticker_not_found(ticker)
     df = financial_statement.transpose().reset_index(names="date")
-    file_path, schema = save_df_to_csv(df, f"{ticker}_{financial_type}")
+    file_path, schema = save_dataframe(
+        df,
+        f"{ticker}_{financial_type}",
+        tool="get_financial_statement",
+        tickers=[ticker],
+    )
     preview_json = df.head(PREVIEW_ROWS).to_json(orient="records", date_format="iso")
     logger.info(f"Returning financial statement for {ticker}, type={financial_type}")
     return json.dumps(
@@ -312,18 +631,12 @@ def get_financial_statement_sync(ticker, financial_type):
     description="""Get financial statement for a given ticker symbol from yahoo finance. You can choose from the following financial statement types: income_stmt, quarterly_income_stmt, balance_sheet, quarterly_balance_sheet, cashflow, quarterly_cashflow.\n\nArgs:\n    ticker: str\n        The ticker symbol of the stock to get financial statement for, e.g. \"AAPL\"\n    financial_type: str\n        The type of financial statement to get. You can choose from the following financial statement types: income_stmt, quarterly_income_stmt, balance_sheet, quarterly_balance_sheet, cashflow, quarterly_cashflow.\n""",
 )
 async def get_financial_statement(ticker: str, financial_type: str) -> str:
-    loop = asyncio.get_running_loop()
-    try:
-        return await asyncio.wait_for(
-            loop.run_in_executor(
-                None, get_financial_statement_sync, ticker, financial_type
-            ),
-            timeout=30,
-        )
-    except asyncio.TimeoutError:
-        return json.dumps({"error": "Timeout fetching financial statement"})
-    except Exception as e:
-        return json.dumps({"error": str(e)})
+    return await _run_tool(
+        get_financial_statement_sync,
+        ticker,
+        financial_type,
+        timeout_error="Timeout fetching financial statement",
+    )
 
 
 # --- Tool: get_holder_info ---
@@ -331,31 +644,30 @@ def get_holder_info_sync(ticker, holder_type):
     logger.info(
         f"Called get_holder_info_sync: ticker={ticker}, holder_type={holder_type}"
     )
-    company = yf.Ticker(ticker)
-    if company.isin is None:
-        logger.error(f"Company ticker {ticker} not found.")
-        return json.dumps({"error": f"Company ticker {ticker} not found."})
-    if holder_type == HolderType.major_holders:
-        df = company.major_holders.reset_index(names="metric")
-    elif holder_type == HolderType.institutional_holders:
-        df = company.institutional_holders
-    elif holder_type == HolderType.mutualfund_holders:
-        df = company.mutualfund_holders
-    elif holder_type == HolderType.insider_transactions:
-        df = company.insider_transactions
-    elif holder_type == HolderType.insider_purchases:
-        df = company.insider_purchases
-    elif holder_type == HolderType.insider_roster_holders:
-        df = company.insider_roster_holders
-    else:
+    # Enum values double as the `yf.Ticker` attribute names
+    if holder_type not in [t.value for t in HolderType]:
         logger.error(f"Invalid holder type {holder_type} for {ticker}.")
         return json.dumps(
             {
                 "error": f"Error: invalid holder type {holder_type}. Please use one of the following: {list(HolderType)}."
             }
         )
+    try:
+        df = _cached_fetch(
+            "get_holder_info",
+            "holders",
+            lambda: _fetch_validated(ticker, holder_type),
+            ticker=ticker,
+            holder_type=holder_type,
+        )
+    except TickerNotFoundError:
+        return _ticker_not_found(ticker)
+    if holder_type == HolderType.major_holders:
+        df = df.reset_index(names="metric")
     df = df.reset_index() if df.index.name or df.index.names else df
-    file_path, schema = save_df_to_csv(df, f"{ticker}_{holder_type}")
+    file_path, schema = save_dataframe(
+        df, f"{ticker}_{holder_type}", tool="get_holder_info", tickers=[ticker]
+    )
     preview_json = df.head(PREVIEW_ROWS).to_json(orient="records", date_format="iso")
     logger.info(f"Returning holder info for {ticker}, type={holder_type}")
     return json.dumps(
@@ -368,28 +680,35 @@ def get_holder_info_sync(ticker, holder_type):
     description="""Get holder information for a given ticker symbol from yahoo finance. You can choose from the following holder types: major_holders, institutional_holders, mutualfund_holders, insider_transactions, insider_purchases, insider_roster_holders.\n\nArgs:\n    ticker: str\n        The ticker symbol of the stock to get holder information for, e.g. \"AAPL\"\n    holder_type: str\n        The type of holder information to get. You can choose from the following holder types: major_holders, institutional_holders, mutualfund_holders, insider_transactions, insider_purchases, insider_roster_holders.\n""",
 )
 async def get_holder_info(ticker: str, holder_type: str) -> str:
-    loop = asyncio.get_running_loop()
-    try:
-        return await asyncio.wait_for(
-            loop.run_in_executor(None, get_holder_info_sync, ticker, holder_type),
-            timeout=30,
-        )
-    except asyncio.TimeoutError:
-        return json.dumps({"error": "Timeout fetching holder info"})
-    except Exception as e:
-        return json.dumps({"error": str(e)})
+    return await _run_tool(
+        get_holder_info_sync,
+        ticker,
+        holder_type,
+        timeout_error="Timeout fetching holder info",
+    )
 
 
 # --- Tool: get_option_expiration_dates ---
+def _option_expiration_dates(ticker):
+    return _cached_fetch(
+        "get_option_expiration_dates",
+        "options",
+        lambda: list(_fetch_validated(ticker, "options")),
+        ticker=ticker,
+    )
+
+
 def get_option_expiration_dates_sync(ticker):
     logger.info(f"Called get_option_expiration_dates_sync: ticker={ticker}")
-    company = yf.Ticker(ticker)
-    if company.isin is None:
-        logger.error(f"Company ticker {ticker} not found.")
-        return json.dumps({"error": f"Company ticker {ticker} not found."})
-    dates = list(company.options)
+    try:
+        dates = _option_expiration_dates(ticker)
+    except TickerNotFoundError:
+        return _ticker_not_found(ticker)
     file_path, schema, preview = save_json_to_file(
-        dates, f"{ticker}_option_expiration_dates"
+        dates,
+        f"{ticker}_option_expiration_dates",
+        tool="get_option_expiration_dates",
+        tickers=[ticker],
     )
     logger.info(f"Returning option expiration dates for {ticker}")
     return json.dumps({"file_path": file_path, "schema": schema, "preview": preview})
@@ -400,16 +719,11 @@ def get_option_expiration_dates_sync(ticker):
     description="""Fetch the available options expiration dates for a given ticker symbol.\n\nArgs:\n    ticker: str\n        The ticker symbol of the stock to get option expiration dates for, e.g. \"AAPL\"\n""",
 )
 async def get_option_expiration_dates(ticker: str) -> str:
-    loop = asyncio.get_running_loop()
-    try:
-        return await asyncio.wait_for(
-            loop.run_in_executor(None, get_option_expiration_dates_sync, ticker),
-            timeout=30,
-        )
-    except asyncio.TimeoutError:
-        return json.dumps({"error": "Timeout fetching option expiration dates"})
-    except Exception as e:
-        return json.dumps({"error": str(e)})
+    return await _run_tool(
+        get_option_expiration_dates_sync,
+        ticker,
+        timeout_error="Timeout fetching option expiration dates",
+    )
 
 
 # --- Tool: get_option_chain ---
@@ -417,11 +731,11 @@ def get_option_chain_sync(ticker, expiration_date, option_type):
     logger.info(
         f"Called get_option_chain_sync: ticker={ticker}, expiration_date={expiration_date}, option_type={option_type}"
     )
-    company = yf.Ticker(ticker)
-    if company.isin is None:
-        logger.error(f"Company ticker {ticker} not found.")
-        return json.dumps({"error": f"Company ticker {ticker} not found."})
-    if expiration_date not in company.options:
+    try:
+        expiration_dates = _option_expiration_dates(ticker)
+    except TickerNotFoundError:
+        return _ticker_not_found(ticker)
+    if expiration_date not in expiration_dates:
         logger.error(f"No options available for {ticker} on date {expiration_date}.")
         return json.dumps(
             {
@@ -433,10 +747,19 @@ def get_option_chain_sync(ticker, expiration_date, option_type):
         return json.dumps(
             {"error": "Invalid option type. Please use 'calls' or 'puts'."}
         )
-    option_chain = company.option_chain(expiration_date)
-    df = option_chain.calls if option_type == "calls" else option_chain.puts
-    file_path, schema = save_df_to_csv(
-        df, f"{ticker}_{expiration_date}_{option_type}_options"
+    df = _cached_fetch(
+        "get_option_chain",
+        "options",
+        lambda: getattr(_yf_ticker(ticker).option_chain(expiration_date), option_type),
+        ticker=ticker,
+        expiration_date=expiration_date,
+        option_type=option_type,
+    )
+    file_path, schema = save_dataframe(
+        df,
+        f"{ticker}_{expiration_date}_{option_type}_options",
+        tool="get_option_chain",
+        tickers=[ticker],
     )
     preview_json = df.head(PREVIEW_ROWS).to_json(orient="records", date_format="iso")
     logger.info(
@@ -452,18 +775,13 @@ def get_option_chain_sync(ticker, expiration_date, option_type):
     description="""Fetch the option chain for a given ticker symbol, expiration date, and option type.\n\nArgs:\n    ticker: str\n        The ticker symbol of the stock to get option chain for, e.g. \"AAPL\"\n    expiration_date: str\n        The expiration date for the options chain (format: 'YYYY-MM-DD')\n    option_type: str\n        The type of option to fetch ('calls' or 'puts')\n""",
 )
 async def get_option_chain(ticker: str, expiration_date: str, option_type: str) -> str:
-    loop = asyncio.get_running_loop()
-    try:
-        return await asyncio.wait_for(
-            loop.run_in_executor(
-                None, get_option_chain_sync, ticker, expiration_date, option_type
-            ),
-            timeout=30,
-        )
-    except asyncio.TimeoutError:
-        return json.dumps({"error": "Timeout fetching option chain"})
-    except Exception as e:
-        return json.dumps({"error": str(e)})
+    return await _run_tool(
+        get_option_chain_sync,
+        ticker,
+        expiration_date,
+        option_type,
+        timeout_error="Timeout fetching option chain",
+    )
 
 
 # --- Tool: get_recommendations ---
@@ -471,15 +789,23 @@ def get_recommendations_sync(ticker, recommendation_type, months_back=12):
     logger.info(
         f"Called get_recommendations_sync: ticker={ticker}, recommendation_type={recommendation_type}, months_back={months_back}"
     )
-    company = yf.Ticker(ticker)
-    if company.isin is None:
-        logger.error(f"Company ticker {ticker} not found.")
-        return json.dumps({"error": f"Company ticker {ticker} not found."})
     try:
         if recommendation_type == RecommendationType.recommendations:
-            df = company.recommendations
+            df = _cached_fetch(
+                "get_recommendations",
+                "recommendations",
+                lambda: _fetch_validated(ticker, "recommendations"),
+                ticker=ticker,
+                recommendation_type=recommendation_type,
+            )
         elif recommendation_type == RecommendationType.upgrades_downgrades:
-            upgrades_downgrades = company.upgrades_downgrades.reset_index()
+            upgrades_downgrades = _cached_fetch(
+                "get_recommendations",
+                "recommendations",
+                lambda: _fetch_validated(ticker, "upgrades_downgrades"),
+                ticker=ticker,
+                recommendation_type=recommendation_type,
+            ).reset_index()
             cutoff_date = pd.Timestamp.now() - pd.DateOffset(months=months_back)
             upgrades_downgrades = upgrades_downgrades[
                 upgrades_downgrades["GradeDate"] >= cutoff_date
@@ -497,8 +823,11 @@ def get_recommendations_sync(ticker, recommendation_type, months_back=12):
                 {"error": f"Invalid recommendation type {recommendation_type}."}
             )
         df = df.reset_index() if df.index.name or df.index.names else df
-        file_path, schema = save_df_to_csv(
-            df, f"{ticker}_{recommendation_type}_recommendations"
+        file_path, schema = save_dataframe(
+            df,
+            f"{ticker}_{recommendation_type}_recommendations",
+            tool="get_recommendations",
+            tickers=[ticker],
         )
         preview_json = df.head(PREVIEW_ROWS).to_json(
             orient="records", date_format="iso"
@@ -527,21 +856,30 @@ def get_recommendations_sync(ticker, recommendation_type, months_back=12):
 async def get_recommendations(
     ticker: str, recommendation_type: str, months_back: int = 12
 ) -> str:
-    loop = asyncio.get_running_loop()
-    try:
-        return await asyncio.wait_for(
-            loop.run_in_executor(
-                None, get_recommendations_sync, ticker, recommendation_type, months_back
-            ),
-            timeout=30,
-        )
-    except asyncio.TimeoutError:
-        return json.dumps({"error": "Timeout fetching recommendations"})
-    except Exception as e:
-        return json.dumps({"error": str(e)})
+    return await _run_tool(
+        get_recommendations_sync,
+        ticker,
+        recommendation_type,
+        months_back,
+        timeout_error="Timeout fetching recommendations",
+    )
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Yahoo Finance MCP server")
+    parser.add_argument(
+        "--transport", choices=["stdio", "streamable-http"], default="stdio"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
     # Initialize and run the server
-    print("Starting Yahoo Finance MCP server...")
-    yfinance_server.run(transport="stdio")
+    print("Starting Yahoo Finance MCP server...", file=sys.stderr)
+    if args.transport == "streamable-http":
+        # Long-lived server shared by every agent, run and Streamlit session
+        yfinance_server.settings.host = args.host
+        yfinance_server.settings.port = args.port
+    yfinance_server.run(transport=args.transport)
@@ -3,7 +3,17 @@ from __future__ import annotations
 """Shared utilities for the multi-agent investment workflow."""
 
 from pathlib import Path
+import atexit
+import contextvars
+import functools
+import hashlib
 import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
 
 # ---------------------------------------------------------------------------
 # Global disclaimer for all agents
@@ -27,6 +37,10 @@ def repo_path(rel: str | Path) -> Path:
     return (ROOT_DIR / rel).resolve()
 
 
+# Sub-folder of outputs/ holding one workspace per research run
+RUNS_DIR = "runs"
+
+
 def outputs_dir() -> Path:
     """Return the global `outputs/` folder, creating it if needed."""
     out = repo_path("outputs")
@@ -34,6 +48,56 @@ def outputs_dir() -> Path:
     return out
 
 
+def cache_dir() -> Path:
+    """Return the persistent cache folder (``settings.CACHE_DIR``), creating it if needed."""
+    from settings import CACHE_DIR
+
+    out = repo_path(CACHE_DIR)
+    out.mkdir(parents=True, exist_ok=True)
+    return out
+
+
+def cache_file(name: str | Path) -> Path:
+    """Return an absolute Path under the cache folder, creating parent folders."""
+    final = cache_dir() / name
+    final.parent.mkdir(parents=True, exist_ok=True)
+    return final
+
+
+def compact_stem(names: list[str], max_names: int = 4) -> str:
+    """Join *names* for use in a file name, abbreviating long lists.
+
+    Up to *max_names* are joined with underscores; longer lists keep the first
+    two plus a count and a short digest of the full list so they stay distinct.
+    """
+    if len(names) <= max_names:
+        return "_".join(names)
+    digest = hashlib.sha1(",".join(names).encode()).hexdigest()[:6]
+    return f"{names[0]}_{names[1]}_plus{len(names) - 2}_{digest}"
+
+
+# ---------------------------------------------------------------------------
+# Research runs
+# ---------------------------------------------------------------------------
+
+# Identifier of the research run the current task (and its tool calls) belong to
+_current_run: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "current_run", default=None
+)
+
+
+def begin_run() -> str:
+    """Start a new research run in the current context and return its id."""
+    run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    _current_run.set(run_id)
+    return run_id
+
+
+def current_run_id() -> str | None:
+    """Return the id of the research run in progress, if any."""
+    return _current_run.get()
+
+
 # ---------------------------------------------------------------------------
 # Prompt loader
 # ---------------------------------------------------------------------------
@@ -41,9 +105,14 @@ def outputs_dir() -> Path:
 PROMPTS_DIR: Path = repo_path("prompts")
 
 
+@functools.lru_cache(maxsize=None)
+def _read_prompt(name: str) -> str:
+    return (PROMPTS_DIR / name).read_text()
+
+
 def load_prompt(name: str, **subs) -> str:
     """Load a Markdown prompt template and substitute <PLACEHOLDERS>."""
-    content = (PROMPTS_DIR / name).read_text()
+    content = _read_prompt(name)
     for key, val in subs.items():
         content = content.replace(f"<{key}>", str(val))
     return content
@@ -54,8 +123,49 @@ def load_prompt(name: str, **subs) -> str:
 # ---------------------------------------------------------------------------
 
 
-def output_file(name: str | Path, *, make_parents: bool = True) -> Path:
-    """Return an absolute Path under the shared outputs/ directory.
+def _relative_output(name: str | Path) -> Path:
+    path = Path(name)
+    # Strip leading "outputs/" if present
+    if path.parts and path.parts[0] == "outputs":
+        path = Path(*path.parts[1:])
+    return path
+
+
+def shared_output_name(name: str | Path) -> str | None:
+    """*name* as a file name directly in the shared outputs/ directory, or None.
+
+    Accepts bare and "outputs/"-prefixed names as well as absolute paths,
+    such as the ``file_path`` the Yahoo Finance tools return.
+    """
+    path = Path(name)
+    if path.is_absolute():
+        return path.name if path.parent == outputs_dir() else None
+    path = _relative_output(path)
+    return path.name if len(path.parts) == 1 else None
+
+
+def run_dir(run_id: str | None = None) -> Path | None:
+    """Return the workspace of research run *run_id* (default: the current run).
+
+    Each run writes its artifacts (reports, analyses, charts) to
+    ``outputs/runs/<run_id>/`` so concurrent runs never overwrite each other's
+    files.  Returns ``None`` outside a research run.
+    """
+    run_id = run_id or current_run_id()
+    if run_id is None:
+        return None
+    return outputs_dir() / RUNS_DIR / run_id
+
+
+def output_file(
+    name: str | Path, *, make_parents: bool = True, shared: bool = False
+) -> Path:
+    """Return an absolute Path to write *name* to.
+
+    Inside a research run the path is in the run's workspace (see
+    :func:`run_dir`); outside one, or with *shared* (data fetched from
+    external sources, common to every run), it is in the shared outputs/
+    directory.  Use :func:`find_output` to locate an existing file.
 
     If *name* already starts with the string "outputs/", that prefix is removed
     to avoid accidentally nesting a second outputs folder (e.g.
@@ -67,11 +177,8 @@ def output_file(name: str | Path, *, make_parents: bool = True) -> Path:
     if path.is_absolute():
         return path
 
-    # Strip leading "outputs/" if present
-    if path.parts and path.parts[0] == "outputs":
-        path = Path(*path.parts[1:])
-
-    final = outputs_dir() / path
+    workspace = None if shared else run_dir()
+    final = (workspace or outputs_dir()) / _relative_output(path)
 
     if make_parents:
         final.parent.mkdir(parents=True, exist_ok=True)
@@ -79,6 +186,41 @@ def output_file(name: str | Path, *, make_parents: bool = True) -> Path:
     return final
 
 
+def find_output(name: str | Path) -> Path:
+    """Return the path of an existing output *name*, reading through to the shared store.
+
+    The current run's workspace is searched first, then the shared outputs/
+    directory.  Files found in the shared store are marked as used (their
+    access time is bumped) so retention keeps them while runs depend on
+    them.  A table held in the dataset registry is written out on first
+    request.  When the file exists nowhere, the workspace path is returned.
+    """
+    path = Path(name)
+    if path.is_absolute():
+        return path if path.exists() else _materialize(path) or path
+    own = output_file(path, make_parents=False)
+    if own.exists():
+        return own
+    common = outputs_dir() / _relative_output(path)
+    try:
+        os.utime(common, ns=(time.time_ns(), common.stat().st_mtime_ns))
+    except OSError:
+        return _materialize(path) or own
+    return common
+
+
+def _materialize(name: Path) -> Path | None:
+    """Write a table registered in the dataset registry to the shared store."""
+    from settings import DATASET_REGISTRY
+
+    shared = shared_output_name(name) if DATASET_REGISTRY else None
+    if shared is None:
+        return None
+    from tools.dataset_registry import default_dataset_registry
+
+    return default_dataset_registry().materialize(shared)
+
+
 # ---------------------------------------------------------------------------
 # Agent helper utilities (prompt composition, shared MCP server, env checks)
 # ---------------------------------------------------------------------------
@@ -92,20 +234,106 @@ def compose_agent_prompt(prompt_file: str, **subs) -> str:
 
 
 def make_yahoo_mcp_server():
-    """Return a pre-configured Yahoo Finance MCPServerStdio instance."""
+    """Return a pre-configured Yahoo Finance MCP server client.
+
+    Uses a stdio subprocess by default, or the long-lived local HTTP server when
+    ``YAHOO_MCP_TRANSPORT=http``.  Agents should normally use
+    :func:`shared_yahoo_mcp_server` instead of creating their own.
+    """
     from agents.mcp import (
         MCPServerStdio,
+        MCPServerStreamableHttp,
     )  # local import to avoid heavy dependency at import time
-    from settings import YAHOO_MCP_TIMEOUT
+    from settings import YAHOO_MCP_TIMEOUT, YAHOO_MCP_TRANSPORT
+
+    if YAHOO_MCP_TRANSPORT == "http":
+        return MCPServerStreamableHttp(
+            params={
+                "url": ensure_yahoo_mcp_http_server(),
+                "timeout": YAHOO_MCP_TIMEOUT,
+                "sse_read_timeout": YAHOO_MCP_TIMEOUT,
+            },
+            name="yahoo-finance",
+            client_session_timeout_seconds=YAHOO_MCP_TIMEOUT,
+            cache_tools_list=True,
+        )
 
     server_path = str(repo_path("tools/yahoo_finance_mcp.py"))
     return MCPServerStdio(
         params={"command": "python", "args": [server_path]},
+        name="yahoo-finance",
         client_session_timeout_seconds=YAHOO_MCP_TIMEOUT,
         cache_tools_list=True,
     )
 
 
+_shared_yahoo_server = None
+_shared_yahoo_lock = threading.Lock()
+
+
+def shared_yahoo_mcp_server():
+    """Return the single Yahoo Finance MCP server client shared by all agents."""
+    global _shared_yahoo_server
+    with _shared_yahoo_lock:
+        if _shared_yahoo_server is None:
+            _shared_yahoo_server = make_yahoo_mcp_server()
+        return _shared_yahoo_server
+
+
+_yahoo_http_process: subprocess.Popen | None = None
+_yahoo_http_lock = threading.Lock()
+
+
+def _port_open(host: str, port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(0.2)
+        return sock.connect_ex((host, port)) == 0
+
+
+def ensure_yahoo_mcp_http_server(startup_timeout: float = 30) -> str:
+    """Return the URL of the local Yahoo Finance MCP HTTP server, starting it if needed.
+
+    A server already listening on ``YAHOO_MCP_HOST:YAHOO_MCP_PORT`` (for example
+    one started by another Streamlit worker) is reused as-is.  A server started
+    here lives until this Python process exits.
+    """
+    global _yahoo_http_process
+    from settings import YAHOO_MCP_HOST, YAHOO_MCP_PORT, YAHOO_MCP_URL
+
+    if YAHOO_MCP_URL:
+        return YAHOO_MCP_URL
+    url = f"http://{YAHOO_MCP_HOST}:{YAHOO_MCP_PORT}/mcp"
+    with _yahoo_http_lock:
+        if _port_open(YAHOO_MCP_HOST, YAHOO_MCP_PORT):
+            return url
+        if _yahoo_http_process is None or _yahoo_http_process.poll() is not None:
+            _yahoo_http_process = subprocess.Popen(
+                [
+                    sys.executable,
+                    str(repo_path("tools/yahoo_finance_mcp.py")),
+                    "--transport",
+                    "streamable-http",
+                    "--host",
+                    YAHOO_MCP_HOST,
+                    "--port",
+                    str(YAHOO_MCP_PORT),
+                ]
+            )
+            atexit.register(_yahoo_http_process.terminate)
+        deadline = time.monotonic() + startup_timeout
+        while not _port_open(YAHOO_MCP_HOST, YAHOO_MCP_PORT):
+            if _yahoo_http_process.poll() is not None:
+                raise RuntimeError(
+                    "Yahoo Finance MCP HTTP server exited during startup"
+                )
+            if time.monotonic() > deadline:
+                raise TimeoutError(
+                    "Yahoo Finance MCP HTTP server did not start in time"
+                )
+            time.sleep(0.1)
+    return url
+
+
 def ensure_env_vars(vars_: list[str]):
     """Raise an error if any of *vars_* env variables are missing."""
     missing = [v for v in vars_ if not os.environ.get(v)]
@@ -121,9 +349,19 @@ __all__ = [
     "ROOT_DIR",
     "repo_path",
     "outputs_dir",
+    "cache_dir",
+    "cache_file",
+    "begin_run",
+    "current_run_id",
     "load_prompt",
     "output_file",
+    "find_output",
+    "shared_output_name",
+    "run_dir",
+    "compact_stem",
     "compose_agent_prompt",
     "make_yahoo_mcp_server",
+    "shared_yahoo_mcp_server",
+    "ensure_yahoo_mcp_http_server",
     "ensure_env_vars",
 ]